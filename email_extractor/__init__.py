@@ -2,21 +2,34 @@
 Email Extractor - A comprehensive email extraction tool with anti-bot protection
 """
 
-from .spider import EmailSpider
-from .core.models import EmailResult
-from .core.filters import DomainFilter
-from .core.extractor import EmailExtractor
-from .utils.anti_bot import AntiBot
-from .search.global_search import GlobalSearchEngine
-from .exporters.database import DatabaseManager
+import importlib
 
 __version__ = "1.0.0"
-__all__ = [
-    'EmailSpider',
-    'EmailResult', 
-    'DomainFilter',
-    'EmailExtractor',
-    'AntiBot',
-    'GlobalSearchEngine',
-    'DatabaseManager'
-]
\ No newline at end of file
+
+# Public name -> defining module; each is imported on first access, so an
+# export or archive ingest never loads the crawler's HTTP and search stack
+_EXPORTS = {
+    'EmailSpider': '.spider',
+    'ShardedCrawler': '.sharded',
+    'ArchiveIngester': '.ingest',
+    'EmailResult': '.core.models',
+    'DomainFilter': '.core.filters',
+    'EmailExtractor': '.core.extractor',
+    'AntiBot': '.utils.anti_bot',
+    'GlobalSearchEngine': '.search.global_search',
+    'DatabaseManager': '.exporters.database',
+    'BaseStorage': '.exporters.base',
+    'create_storage': '.exporters.storage',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,188 @@
+import os
+import re
+import gzip
+import zlib
+import mmap
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+import logging
+
+# Not utils.transport: reading archives must not import requests
+from ..utils.content_types import is_text_content_type
+
+logger = logging.getLogger(__name__)
+
+WARC_SUFFIXES = ('.warc', '.warc.gz')
+HTML_SUFFIXES = ('.html', '.htm', '.xhtml')
+
+# Only these records carry page bodies; request, metadata, revisit etc. are skipped
+PAGE_RECORD_TYPES = ('response', 'resource')
+
+# "Save page as" markers that keep the original address of an HTML file
+SAVED_FROM_PATTERN = re.compile(rb'<!--\s*saved from url=\(\d+\)\s*(\S+?)\s*-->', re.IGNORECASE)
+CANONICAL_PATTERN = re.compile(
+    rb'<link[^>]+rel=["\']?canonical["\']?[^>]+href=["\']([^"\']+)["\']', re.IGNORECASE)
+CHARSET_PATTERN = re.compile(r'charset=["\']?([\w-]+)', re.IGNORECASE)
+
+def is_warc(path: str) -> bool:
+    return path.lower().endswith(WARC_SUFFIXES)
+
+def is_html(path: str) -> bool:
+    return path.lower().endswith(HTML_SUFFIXES)
+
+def iter_archive_files(paths: Iterable[str]) -> Iterator[str]:
+    """Expand files and directories into the WARC and HTML files below them"""
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    if is_warc(filename) or is_html(filename):
+                        yield os.path.join(dirpath, filename)
+        elif os.path.isfile(path):
+            yield path
+        else:
+            logger.warning(f"Archive path not found: {path}")
+
+def _parse_header_block(block: bytes) -> Dict[str, str]:
+    headers = {}
+    for line in block.split(b'\n'):
+        name, sep, value = line.partition(b':')
+        if sep:
+            headers[name.strip().lower().decode('latin-1')] = value.strip().decode('utf-8', 'replace')
+    return headers
+
+def iter_warc_stream(stream: BinaryIO) -> Iterator[Tuple[Dict[str, str], bytes]]:
+    """Read (headers, block) records in order from a plain or gzip-decoded WARC stream"""
+    while True:
+        line = stream.readline()
+        if not line:
+            return
+        if not line.strip():
+            # The blank lines closing the previous record
+            continue
+        if not line.startswith(b'WARC/'):
+            raise ValueError(f"Expected a WARC record, got {line[:40]!r}")
+
+        header_lines = []
+        while True:
+            line = stream.readline()
+            if not line.strip():
+                break
+            header_lines.append(line)
+        headers = _parse_header_block(b''.join(header_lines))
+        yield headers, stream.read(int(headers.get('content-length', 0)))
+
+def scan_warc_offsets(buf, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, str], int, int]]:
+    """Walk an uncompressed WARC in memory: (record start, headers, block start, block end)"""
+    # Only the header lines are touched; blocks are skipped by Content-Length,
+    # so on a memory-mapped file their pages are never read here
+    stop = len(buf) if stop is None else stop
+    pos = start
+    while pos < stop:
+        record = buf.find(b'WARC/', pos, stop)
+        if record < 0:
+            return
+        header_end = buf.find(b'\r\n\r\n', record)
+        if header_end < 0:
+            raise ValueError(f"Truncated WARC header at offset {record}")
+        headers = _parse_header_block(buf[record:header_end])
+        block_start = header_end + 4
+        block_end = block_start + int(headers.get('content-length', 0))
+        yield record, headers, block_start, block_end
+        pos = block_end
+
+def split_warc(buf, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Cut an uncompressed WARC into record-aligned (start, stop) byte ranges"""
+    ranges = []
+    range_start = 0
+    for _, _, _, block_end in scan_warc_offsets(buf):
+        if block_end - range_start >= chunk_bytes:
+            ranges.append((range_start, block_end))
+            range_start = block_end
+    if range_start < len(buf):
+        ranges.append((range_start, len(buf)))
+    return ranges
+
+def _decode_content(body: bytes, encoding: str) -> Optional[bytes]:
+    encoding = encoding.lower()
+    try:
+        if encoding in ('gzip', 'x-gzip'):
+            return gzip.decompress(body)
+        if encoding == 'deflate':
+            # Servers send both zlib-wrapped and raw deflate under this name
+            wbits = zlib.MAX_WBITS if body[:1] == b'\x78' else -zlib.MAX_WBITS
+            return zlib.decompress(body, wbits)
+    except (OSError, EOFError, zlib.error):
+        # Truncated captures decompress only partially; not worth salvaging
+        return None
+    return body
+
+def page_from_record(headers: Dict[str, str], block: bytes) -> Optional[Tuple[str, bytes, Optional[str]]]:
+    """(target URI, body, content type) of a WARC record holding a text page, else None"""
+    if headers.get('warc-type') not in PAGE_RECORD_TYPES:
+        return None
+    uri = headers.get('warc-target-uri', '').strip('<>')
+    if not uri:
+        return None
+
+    content_type = headers.get('content-type')
+    if headers['warc-type'] == 'response' and content_type and content_type.startswith('application/http'):
+        split = block.find(b'\r\n\r\n')
+        if split < 0:
+            return None
+        http_headers = _parse_header_block(block[:split])
+        body = block[split + 4:]
+        content_type = http_headers.get('content-type')
+        encoding = http_headers.get('content-encoding')
+        if encoding and encoding.lower() != 'identity':
+            body = _decode_content(body, encoding)
+            if body is None:
+                return None
+    else:
+        body = block
+
+    if not is_text_content_type(content_type):
+        return None
+    return uri, body, content_type
+
+def decode_text(body, content_type: Optional[str] = None) -> str:
+    """Decode a page body with its declared charset, falling back to UTF-8"""
+    match = CHARSET_PATTERN.search(content_type or '')
+    if match:
+        try:
+            return str(body, match.group(1), 'replace')
+        except LookupError:
+            pass
+    # str() decodes bytes and mapped files alike
+    return str(body, 'utf-8', 'replace')
+
+def iter_warc_pages(path: str) -> Iterator[Tuple[str, bytes, Optional[str]]]:
+    """Pages of a gzip WARC, decompressed as a stream (records are gzip members)"""
+    with gzip.open(path, 'rb') as stream:
+        for headers, block in iter_warc_stream(stream):
+            page = page_from_record(headers, block)
+            if page:
+                yield page
+
+def iter_mapped_warc_pages(buf, start: int, stop: int) -> Iterator[Tuple[str, bytes, Optional[str]]]:
+    """Pages of one record-aligned range of a memory-mapped WARC"""
+    for _, headers, block_start, block_end in scan_warc_offsets(buf, start, stop):
+        page = page_from_record(headers, buf[block_start:block_end])
+        if page:
+            yield page
+
+def html_source_url(path: str, head: bytes) -> str:
+    """Original URL of a saved HTML page, or its file:// URI"""
+    for pattern in (SAVED_FROM_PATTERN, CANONICAL_PATTERN):
+        match = pattern.search(head)
+        if match:
+            return match.group(1).decode('utf-8', 'replace')
+    return Path(path).resolve().as_uri()
+
+def map_file(path: str) -> Optional[mmap.mmap]:
+    """Read-only map of a file; None for empty files, which cannot be mapped"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
@@ -1,7 +1,8 @@
 import re
 from typing import Set
 import logging
-from bs4 import BeautifulSoup
+
+from ..utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -49,18 +50,25 @@ class EmailExtractor:
         
         # Method 2: Extract from mailto links
         mailto_emails = self._extract_mailto_emails(content)
-        emails.update(mailto_emails)
         
         # Method 3: Extract obfuscated emails
         obfuscated_emails = self._extract_obfuscated_emails(content)
-        emails.update(obfuscated_emails)
         
         # Method 4: Extract from JavaScript
         js_emails = self._extract_js_emails(content)
+        
+        # Counted per strategy before merging, so overlaps show up as well
+        for strategy, found in (('regex', emails), ('mailto', mailto_emails),
+                                ('obfuscated', obfuscated_emails), ('javascript', js_emails)):
+            if found:
+                metrics.inc('emails_found_total', len(found), strategy=strategy)
+        emails.update(mailto_emails)
+        emails.update(obfuscated_emails)
         emails.update(js_emails)
         
+        # Per-address hits are counted in emails_found_total, not logged
         if emails:
-            logger.info(f"Found {len(emails)} emails from {source_url}")
+            logger.debug("Found %d emails from %s", len(emails), source_url, extra={'sample': True})
             
         return emails
     
@@ -69,6 +77,7 @@ class EmailExtractor:
         emails = set()
         
         try:
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(content, 'html.parser')
             mailto_links = soup.find_all('a', href=re.compile(r'^mailto:', re.IGNORECASE))
             
@@ -79,9 +88,8 @@ class EmailExtractor:
                     email = email_match.group(1).lower()
                     if self._should_include_email(email):
                         emails.add(email)
-                        logger.info(f"Found mailto email: {email}")
         except Exception as e:
-            logger.debug(f"Error parsing mailto links: {e}")
+            logger.debug("Error parsing mailto links: %s", e)
             
         return emails
     
@@ -96,7 +104,6 @@ class EmailExtractor:
                     email = f"{match[0]}@{match[1]}.{match[2]}".lower()
                     if self._should_include_email(email):
                         emails.add(email)
-                        logger.info(f"Found obfuscated email: {email}")
         
         return emails
     
@@ -116,7 +123,6 @@ class EmailExtractor:
                 email = email.lower()
                 if self._should_include_email(email):
                     emails.add(email)
-                    logger.info(f"Found JS email: {email}")
         
         return emails
     
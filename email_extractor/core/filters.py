@@ -2,6 +2,8 @@ import logging
 from urllib.parse import urlparse
 from typing import Set
 
+from ..utils.metrics import metrics
+
 logger = logging.getLogger(__name__)
 
 class DomainFilter:
@@ -40,16 +42,18 @@ class DomainFilter:
             # Check for excluded domain patterns
             for excluded in self.excluded_domains:
                 if excluded in domain:
-                    logger.info(f"Excluded domain: {domain} (pattern: {excluded})")
+                    metrics.inc('urls_filtered_total', reason='pattern')
+                    logger.debug("Excluded domain: %s (pattern: %s)", domain, excluded, extra={'sample': True})
                     return False
                     
             # Check for excluded keywords in domain
             for keyword in self.excluded_keywords:
                 if keyword in domain:
-                    logger.info(f"Excluded domain: {domain} (keyword: {keyword})")
+                    metrics.inc('urls_filtered_total', reason='keyword')
+                    logger.debug("Excluded domain: %s (keyword: %s)", domain, keyword, extra={'sample': True})
                     return False
                     
             return True
         except Exception as e:
-            logger.error(f"Error checking domain {url}: {e}")
+            logger.error("Error checking domain %s: %s", url, e)
             return False
\ No newline at end of file
@@ -0,0 +1,200 @@
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Task states
+PENDING = 'pending'      # not searched yet
+SEARCHED = 'searched'    # search results recorded, URLs being fetched
+DONE = 'done'
+
+# URL states
+URL_PENDING = 'pending'
+URL_EXTRACTED = 'extracted'
+URL_FAILED = 'failed'
+
+class CrawlFrontier:
+    """Durable record of (country, keyword) tasks and their URLs, so a crawl can resume"""
+
+    def __init__(self, db_path: str = "frontier.db", checkpoint_interval: int = 100):
+        self.db_path = db_path
+        self.checkpoint_interval = max(checkpoint_interval, 1)
+        self.lock = threading.Lock()
+        self._uncommitted = 0
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                country_code TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                status TEXT NOT NULL,
+                url_count INTEGER NOT NULL DEFAULT 0,
+                email_count INTEGER NOT NULL DEFAULT 0,
+                searched_at INTEGER,
+                finished_at INTEGER,
+                run_id TEXT,
+                PRIMARY KEY (country_code, keyword)
+            )
+        ''')
+        if 'run_id' not in {row[1] for row in self.conn.execute('PRAGMA table_info(tasks)')}:
+            self.conn.execute('ALTER TABLE tasks ADD COLUMN run_id TEXT')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS task_urls (
+                country_code TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                url TEXT NOT NULL,
+                state TEXT NOT NULL,
+                failure_reason TEXT,
+                email_count INTEGER NOT NULL DEFAULT 0,
+                updated_at INTEGER,
+                PRIMARY KEY (country_code, keyword, url)
+            )
+        ''')
+        self.conn.commit()
+
+    def reset(self):
+        """Forget all progress (a fresh, non-resumed crawl)"""
+        with self.lock:
+            self.conn.execute('DELETE FROM task_urls')
+            self.conn.execute('DELETE FROM tasks')
+            self.conn.commit()
+            self._uncommitted = 0
+
+    def plan(self, tasks: List[Tuple[str, str]]):
+        """Register every (country, keyword) task not already known"""
+        with self.lock:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO tasks (country_code, keyword, status) VALUES (?, ?, ?)',
+                [(country_code, keyword, PENDING) for country_code, keyword in tasks])
+            self.conn.commit()
+
+    def renew_task(self, keyword: str, country_code: str, run_id: str) -> bool:
+        """Tie a task to run_id, forgetting progress recorded for another run; True if some was dropped"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT run_id FROM tasks WHERE country_code = ? AND keyword = ?',
+                (country_code, keyword)).fetchone()
+            if row is not None and row[0] == run_id:
+                return False
+            self.conn.execute('DELETE FROM task_urls WHERE country_code = ? AND keyword = ?',
+                              (country_code, keyword))
+            self.conn.execute('''
+                INSERT INTO tasks (country_code, keyword, status, run_id) VALUES (?, ?, ?, ?)
+                ON CONFLICT(country_code, keyword) DO UPDATE SET
+                    status = excluded.status, url_count = 0, email_count = 0,
+                    searched_at = NULL, finished_at = NULL, run_id = excluded.run_id
+            ''', (country_code, keyword, PENDING, run_id))
+            self.conn.commit()
+            self._uncommitted = 0
+        return row is not None
+
+    def task_status(self, keyword: str, country_code: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT status FROM tasks WHERE country_code = ? AND keyword = ?',
+                (country_code, keyword)).fetchone()
+        return row[0] if row else None
+
+    def record_search(self, keyword: str, country_code: str, urls: List[str]):
+        """Store a task's search results; committed at once since searches are the costly step"""
+        with self.lock:
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO task_urls (country_code, keyword, url, state)
+                VALUES (?, ?, ?, ?)
+            ''', [(country_code, keyword, url, URL_PENDING) for url in urls])
+            self.conn.execute('''
+                INSERT INTO tasks (country_code, keyword, status, url_count, searched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(country_code, keyword) DO UPDATE SET
+                    status = excluded.status,
+                    url_count = excluded.url_count,
+                    searched_at = excluded.searched_at
+            ''', (country_code, keyword, SEARCHED, len(urls), int(time.time())))
+            self.conn.commit()
+            self._uncommitted = 0
+
+    def add_urls(self, keyword: str, country_code: str, urls: List[str]) -> List[str]:
+        """Append URLs to a task as they stream in; returns those not fetched in an earlier run"""
+        with self.lock:
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO task_urls (country_code, keyword, url, state)
+                VALUES (?, ?, ?, ?)
+            ''', [(country_code, keyword, url, URL_PENDING) for url in urls])
+            self.conn.execute('''
+                UPDATE tasks SET status = ?, url_count = url_count + ?,
+                                 searched_at = COALESCE(searched_at, ?)
+                WHERE country_code = ? AND keyword = ?
+            ''', (SEARCHED, len(urls), int(time.time()), country_code, keyword))
+            self.conn.commit()
+            self._uncommitted = 0
+            fetched = set()
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                fetched.update(row[0] for row in self.conn.execute(f'''
+                    SELECT url FROM task_urls
+                    WHERE country_code = ? AND keyword = ? AND state != ?
+                      AND url IN ({','.join('?' * len(chunk))})
+                ''', (country_code, keyword, URL_PENDING, *chunk)))
+        return [url for url in urls if url not in fetched]
+
+    def pending_urls(self, keyword: str, country_code: str) -> List[str]:
+        """URLs of a searched task that were not fetched before the last checkpoint"""
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT url FROM task_urls
+                WHERE country_code = ? AND keyword = ? AND state = ?
+            ''', (country_code, keyword, URL_PENDING)).fetchall()
+        return [row[0] for row in rows]
+
+    def mark_urls(self, keyword: str, country_code: str,
+                  outcomes: List[Tuple[str, int, Optional[str]]]) -> bool:
+        """Record (url, email_count, failure_reason) outcomes; returns True when a checkpoint is due"""
+        now = int(time.time())
+        with self.lock:
+            self.conn.executemany('''
+                INSERT INTO task_urls (country_code, keyword, url, state, failure_reason,
+                                       email_count, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(country_code, keyword, url) DO UPDATE SET
+                    state = excluded.state,
+                    failure_reason = excluded.failure_reason,
+                    email_count = excluded.email_count,
+                    updated_at = excluded.updated_at
+            ''', [(country_code, keyword, url, URL_FAILED if reason else URL_EXTRACTED,
+                   reason, email_count, now) for url, email_count, reason in outcomes])
+            self._uncommitted += len(outcomes)
+            return self._uncommitted >= self.checkpoint_interval
+
+    def checkpoint(self):
+        """Make recorded progress durable"""
+        with self.lock:
+            if self._uncommitted:
+                logger.debug(f"Checkpoint: {self._uncommitted} URL updates")
+            self.conn.commit()
+            self._uncommitted = 0
+
+    def complete_task(self, keyword: str, country_code: str):
+        with self.lock:
+            self.conn.execute('''
+                UPDATE tasks
+                SET status = ?, finished_at = ?,
+                    email_count = (SELECT COALESCE(SUM(email_count), 0) FROM task_urls
+                                   WHERE country_code = tasks.country_code AND keyword = tasks.keyword)
+                WHERE country_code = ? AND keyword = ?
+            ''', (DONE, int(time.time()), country_code, keyword))
+            self.conn.commit()
+            self._uncommitted = 0
+
+    def progress(self) -> Dict[str, int]:
+        """Number of tasks in each state"""
+        with self.lock:
+            return dict(self.conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
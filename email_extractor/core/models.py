@@ -1,11 +1,230 @@
-from dataclasses import dataclass
-from typing import List, Set, Dict
+import sys
+import time
+from array import array
+from typing import List, Set, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+from urllib.parse import urlparse
 
-@dataclass
-class EmailResult:
+from ..utils.latency import registered_domain
+
+def format_timestamp(epoch: int) -> str:
+    """Format an epoch timestamp (UTC) for exports"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(epoch))
+
+class EmailResult(NamedTuple):
+    """Immutable, dict-free result; one is built per email per page"""
     email: str
     domain: str
     source_url: str
     keyword: str
     country_code: str
-    extracted_at: str
\ No newline at end of file
+    extracted_at: int  # epoch seconds, formatted only on export
+
+    @classmethod
+    def create(cls, email: str, source_url: str, keyword: str, country_code: str,
+               extracted_at: Optional[int] = None) -> 'EmailResult':
+        """Build a single result, sharing the strings repeated across many results"""
+        return cls.from_page((email,), source_url, keyword, country_code, extracted_at)[0]
+
+    @classmethod
+    def from_page(cls, emails: Iterable[str], source_url: str, keyword: str, country_code: str,
+                  extracted_at: Optional[int] = None) -> List['EmailResult']:
+        """Build the results for one page with a single timestamp and interned labels"""
+        if extracted_at is None:
+            extracted_at = int(time.time())
+        keyword = sys.intern(keyword)
+        country_code = sys.intern(country_code)
+        intern = sys.intern
+        new = tuple.__new__
+        return [
+            new(cls, (email, intern(email[email.rindex('@') + 1:]), source_url,
+                      keyword, country_code, extracted_at))
+            for email in emails
+        ]
+
+    @property
+    def extracted_at_str(self) -> str:
+        return format_timestamp(self.extracted_at)
+
+class FetchOutcome(NamedTuple):
+    """One processed URL in the fetch ledger"""
+    url: str
+    host: str
+    domain: str
+    keyword: str
+    country_code: str
+    outcome: str  # ok, cached, not_modified or the failure class
+    status: int  # HTTP status, 0 without a response
+    bytes: int
+    fetch_ms: int
+    extract_ms: int
+    emails: int
+    fetched_at: int
+
+    @classmethod
+    def create(cls, url: str, keyword: str, country_code: str, outcome: str, status: int = 0,
+               body_bytes: int = 0, fetch_seconds: float = 0.0, extract_seconds: float = 0.0,
+               emails: int = 0) -> 'FetchOutcome':
+        host = urlparse(url).netloc.lower()
+        return cls(url, host, registered_domain(host), keyword, country_code, outcome, status,
+                   body_bytes, int(fetch_seconds * 1000), int(extract_seconds * 1000), emails,
+                   int(time.time()))
+
+class ResultBatch:
+    """Results for one keyword/country held as parallel arrays"""
+    # Keyword and country are stored once per batch; rows point into a shared
+    # URL table. Slices are views over the same arrays (no copying).
+    __slots__ = ('keyword', 'country_code', '_emails', '_domains', '_url_ids',
+                 '_seen_at', '_urls', '_start', '_stop')
+
+    def __init__(self, keyword: str, country_code: str):
+        self.keyword = sys.intern(keyword)
+        self.country_code = sys.intern(country_code)
+        self._emails: List[str] = []
+        self._domains: List[str] = []
+        self._url_ids = array('l')
+        self._seen_at = array('q')
+        self._urls: List[str] = []
+        self._start = 0
+        self._stop: Optional[int] = None  # None marks an owning (appendable) batch
+
+    @classmethod
+    def from_page(cls, emails: Iterable[str], source_url: str, keyword: str, country_code: str,
+                  extracted_at: Optional[int] = None) -> 'ResultBatch':
+        batch = cls(keyword, country_code)
+        batch.add_page(source_url, emails, extracted_at)
+        return batch
+
+    @classmethod
+    def concat(cls, batches: Iterable['ResultBatch'], keyword: str, country_code: str) -> 'ResultBatch':
+        merged = cls(keyword, country_code)
+        for batch in batches:
+            merged.extend(batch)
+        return merged
+
+    def _check_owner(self):
+        if self._stop is not None:
+            raise ValueError("Cannot append to a ResultBatch slice")
+
+    def _bounds(self):
+        return self._start, len(self._emails) if self._stop is None else self._stop
+
+    def add_page(self, source_url: str, emails: Iterable[str], extracted_at: Optional[int] = None):
+        """Append the emails found on one page"""
+        self._check_owner()
+        if extracted_at is None:
+            extracted_at = int(time.time())
+        intern = sys.intern
+        url_id = len(self._urls)
+        added = 0
+        for email in emails:
+            self._emails.append(email)
+            self._domains.append(intern(email[email.rindex('@') + 1:]))
+            added += 1
+        if added:
+            self._urls.append(source_url)
+            self._url_ids.extend([url_id] * added)
+            self._seen_at.extend([extracted_at] * added)
+
+    def extend(self, other: 'ResultBatch'):
+        """Merge another batch for the same keyword and country into this one"""
+        self._check_owner()
+        if other.keyword != self.keyword or other.country_code != self.country_code:
+            raise ValueError(f"Cannot merge results for {other.keyword!r}/{other.country_code} "
+                             f"into {self.keyword!r}/{self.country_code}")
+        start, stop = other._bounds()
+        if start == stop:
+            return
+        # Only copy the URLs the other batch's rows actually reference
+        remap = {}
+        for url_id in other._url_ids[start:stop]:
+            if url_id not in remap:
+                remap[url_id] = len(self._urls)
+                self._urls.append(other._urls[url_id])
+        self._emails.extend(other._emails[start:stop])
+        self._domains.extend(other._domains[start:stop])
+        self._url_ids.extend(remap[url_id] for url_id in other._url_ids[start:stop])
+        self._seen_at.extend(other._seen_at[start:stop])
+
+    def dedup(self) -> 'ResultBatch':
+        """Return a new batch keeping only the first row for each email"""
+        deduped = ResultBatch(self.keyword, self.country_code)
+        seen: Set[str] = set()
+        url_map: Dict[int, int] = {}
+        start, stop = self._bounds()
+        for i in range(start, stop):
+            email = self._emails[i]
+            if email in seen:
+                continue
+            seen.add(email)
+            url_id = self._url_ids[i]
+            if url_id not in url_map:
+                url_map[url_id] = len(deduped._urls)
+                deduped._urls.append(self._urls[url_id])
+            deduped._emails.append(email)
+            deduped._domains.append(self._domains[i])
+            deduped._url_ids.append(url_map[url_id])
+            deduped._seen_at.append(self._seen_at[i])
+        return deduped
+
+    def compact(self) -> 'ResultBatch':
+        """Owning copy of a slice, so it pickles without its parent's arrays"""
+        if self._stop is None:
+            return self
+        return ResultBatch.concat((self,), self.keyword, self.country_code)
+
+    @property
+    def emails(self) -> List[str]:
+        start, stop = self._bounds()
+        return self._emails[start:stop]
+
+    @property
+    def source_urls(self) -> List[str]:
+        return self._urls
+
+    def __len__(self) -> int:
+        start, stop = self._bounds()
+        return stop - start
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        start, stop = self._bounds()
+        if isinstance(index, slice):
+            first, last, step = index.indices(stop - start)
+            if step != 1:
+                raise ValueError("ResultBatch slices must be contiguous")
+            view = ResultBatch.__new__(ResultBatch)
+            view.keyword = self.keyword
+            view.country_code = self.country_code
+            view._emails = self._emails
+            view._domains = self._domains
+            view._url_ids = self._url_ids
+            view._seen_at = self._seen_at
+            view._urls = self._urls
+            view._start = start + first
+            view._stop = start + max(first, last)
+            return view
+        if index < 0:
+            index += stop - start
+        if not 0 <= index < stop - start:
+            raise IndexError("ResultBatch index out of range")
+        i = start + index
+        return EmailResult(self._emails[i], self._domains[i], self._urls[self._url_ids[i]],
+                           self.keyword, self.country_code, self._seen_at[i])
+
+    def rows(self) -> Iterator[Tuple[str, str, str, str, str, int]]:
+        """Yield storage rows in EmailResult field order without building objects"""
+        start, stop = self._bounds()
+        keyword, country_code, urls = self.keyword, self.country_code, self._urls
+        for i in range(start, stop):
+            yield (self._emails[i], self._domains[i], urls[self._url_ids[i]],
+                   keyword, country_code, self._seen_at[i])
+
+    def __iter__(self) -> Iterator[EmailResult]:
+        new = tuple.__new__
+        for row in self.rows():
+            yield new(EmailResult, row)
+
+    def __repr__(self) -> str:
+        return f"ResultBatch(keyword={self.keyword!r}, country_code={self.country_code!r}, rows={len(self)})"
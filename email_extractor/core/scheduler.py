@@ -0,0 +1,130 @@
+import time
+import random
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+class YieldScheduler:
+    """Order and budget (country, keyword) tasks by the new addresses they produced in past runs"""
+
+    # Yield is new (not previously stored) addresses per fetch and per second of
+    # search plus extraction. Tasks with little history are pulled toward the
+    # overall average, and a share of picks is random so low scorers get re-tried.
+
+    def __init__(self, db_path: str = "task_yield.db", exploration: float = 0.1, min_share: float = 0.2,
+                 decay: float = 0.7, prior_fetches: float = 20, prior_seconds: float = 60,
+                 seed: Optional[int] = None):
+        self.db_path = db_path
+        self.exploration = exploration
+        self.min_share = min_share
+        self.decay = decay
+        self.prior_fetches = prior_fetches
+        self.prior_seconds = prior_seconds
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+        # Shared by sharded worker processes, which only ever add to the totals
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS task_yield (
+                country_code TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                fetches REAL NOT NULL DEFAULT 0,
+                seconds REAL NOT NULL DEFAULT 0,
+                new_emails REAL NOT NULL DEFAULT 0,
+                updated_at INTEGER,
+                PRIMARY KEY (country_code, keyword)
+            )
+        ''')
+        self.conn.commit()
+
+    def start_run(self):
+        """Fade earlier runs' totals so the scores follow recent yield"""
+        with self.lock:
+            self.conn.execute('UPDATE task_yield SET fetches = fetches * ?, seconds = seconds * ?, '
+                              'new_emails = new_emails * ?', (self.decay, self.decay, self.decay))
+            self.conn.commit()
+
+    def record(self, keyword: str, country_code: str, fetches: int = 0, seconds: float = 0.0,
+               new_emails: int = 0):
+        """Add a task's work and new addresses; the writer process may report addresses separately"""
+        with self.lock:
+            self.conn.execute('''
+                INSERT INTO task_yield (country_code, keyword, fetches, seconds, new_emails, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(country_code, keyword) DO UPDATE SET
+                    fetches = fetches + excluded.fetches,
+                    seconds = seconds + excluded.seconds,
+                    new_emails = new_emails + excluded.new_emails,
+                    updated_at = excluded.updated_at
+            ''', (country_code, keyword, fetches, seconds, new_emails, int(time.time())))
+            self.conn.commit()
+
+    def _history(self) -> Tuple[Dict[Tuple[str, str], Tuple[float, float, float]], float, float]:
+        """Totals per (country, keyword), and the overall new addresses per fetch and per second"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT country_code, keyword, fetches, seconds, new_emails FROM task_yield').fetchall()
+        history = {(country_code, keyword): (fetches, seconds, new_emails)
+                   for country_code, keyword, fetches, seconds, new_emails in rows}
+        fetches = sum(row[0] for row in history.values())
+        seconds = sum(row[1] for row in history.values())
+        new_emails = sum(row[2] for row in history.values())
+        return history, new_emails / fetches if fetches else 0.0, new_emails / seconds if seconds else 0.0
+
+    def _rates(self, totals: Tuple[float, float, float], per_fetch: float,
+               per_second: float) -> Tuple[float, float]:
+        # Each task starts from prior_fetches / prior_seconds worth of the overall average
+        fetches, seconds, new_emails = totals
+        return ((new_emails + per_fetch * self.prior_fetches) / (fetches + self.prior_fetches),
+                (new_emails + per_second * self.prior_seconds) / (seconds + self.prior_seconds))
+
+    def rank(self, tasks: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """(country, keyword) tasks, best expected new addresses per second first"""
+        history, per_fetch, per_second = self._history()
+        if not history:
+            # Nothing to go on yet: keep the given order
+            return list(tasks)
+        no_history = (0.0, 0.0, 0.0)
+        scores = {task: self._rates(history.get(task, no_history), per_fetch, per_second)[1]
+                  for task in tasks}
+        # Stable sort: ties (tasks never crawled) keep their given order
+        remaining = sorted(tasks, key=lambda task: -scores[task])
+        ordered = []
+        while remaining:
+            pick = 0
+            if self.exploration and self.random.random() < self.exploration:
+                pick = self.random.randrange(len(remaining))
+            ordered.append(remaining.pop(pick))
+        return ordered
+
+    def url_budget(self, keyword: str, country_code: str, max_urls: int) -> int:
+        """Share of max_urls to fetch for a task, cut for tasks below the average yield per fetch"""
+        history, per_fetch, per_second = self._history()
+        totals = history.get((country_code, keyword))
+        if totals is None or not per_fetch:
+            return max_urls
+        task_per_fetch, _ = self._rates(totals, per_fetch, per_second)
+        share = min(max(task_per_fetch / per_fetch, self.min_share), 1.0)
+        return max(int(max_urls * share), 1)
+
+    def summary(self, limit: int = 10) -> List[Dict]:
+        """Best-scoring tasks with their smoothed yields"""
+        history, per_fetch, per_second = self._history()
+        rows = []
+        for (country_code, keyword), totals in history.items():
+            task_per_fetch, task_per_second = self._rates(totals, per_fetch, per_second)
+            rows.append({'country_code': country_code, 'keyword': keyword, 'fetches': round(totals[0]),
+                         'new_per_fetch': round(task_per_fetch, 3),
+                         'new_per_minute': round(task_per_second * 60, 2)})
+        rows.sort(key=lambda row: -row['new_per_minute'])
+        return rows[:limit]
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,121 @@
+import io
+import os
+import gzip
+import xml.etree.ElementTree as ET
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Paths tried on every seed domain; contact details usually live on one of these
+SEED_PATHS = ('/', '/contact', '/contact-us', '/about', '/about-us', '/impressum', '/imprint')
+
+def expand_domain(domain: str, paths: Iterable[str] = SEED_PATHS) -> List[str]:
+    """Turn a bare domain into URLs for its well-known contact pages"""
+    domain = domain.strip().strip('/').lower()
+    return [f"https://{domain}{path}" for path in paths]
+
+def is_sitemap(entry: str) -> bool:
+    """Sitemap URLs and local sitemap files, as opposed to pages and bare domains"""
+    if '://' not in entry:
+        return os.path.isfile(entry)
+    path = urlparse(entry).path.lower()
+    return path.endswith(('.xml', '.xml.gz')) or 'sitemap' in path.rsplit('/', 1)[-1]
+
+def read_seed_file(path: str) -> Iterator[str]:
+    """Yield non-empty, non-comment lines of a seed list"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+def _open_stream(raw) -> io.BufferedReader:
+    """Buffer a byte stream, unwrapping file-level gzip (sitemap.xml.gz)"""
+    stream = raw if isinstance(raw, io.BufferedReader) else io.BufferedReader(raw)
+    if stream.peek(2)[:2] == b'\x1f\x8b':
+        return io.BufferedReader(gzip.GzipFile(fileobj=stream))
+    return stream
+
+def parse_sitemap(raw) -> Iterator[Tuple[str, str]]:
+    """Stream ('url' | 'sitemap', loc) pairs from a sitemap or sitemap index"""
+    # iterparse reads incrementally; handled entries are dropped from the root
+    # so memory stays flat however many <url> elements the file holds
+    root = None
+    level = 0
+    entry = None
+    for event, elem in ET.iterparse(_open_stream(raw), events=('start', 'end')):
+        if event == 'start':
+            level += 1
+            if root is None:
+                root = elem
+            elif level == 2:
+                entry = _local_name(elem.tag)
+            continue
+
+        # Only <urlset><url><loc> and <sitemapindex><sitemap><loc>; nested
+        # extension tags such as <image:loc> are not pages
+        if level == 3 and entry in ('url', 'sitemap') and _local_name(elem.tag) == 'loc' and elem.text:
+            yield entry, elem.text.strip()
+        elif level == 2:
+            root.clear()
+        level -= 1
+
+class SitemapReader:
+    """Stream page URLs out of sitemaps and sitemap indexes, local or remote"""
+
+    def __init__(self, open_url: Callable[[str], object], max_depth: int = 3,
+                 max_urls: Optional[int] = None):
+        # open_url returns a readable byte stream for a remote sitemap
+        self.open_url = open_url
+        self.max_depth = max_depth
+        self.max_urls = max_urls
+
+    def _open(self, source: str):
+        if '://' not in source and os.path.exists(source):
+            return open(source, 'rb')
+        return self.open_url(source)
+
+    def iter_urls(self, source: str) -> Iterator[str]:
+        yielded = 0
+        pending = [(source, 0)]
+        seen = {source}
+        while pending:
+            sitemap, depth = pending.pop(0)
+            try:
+                stream = self._open(sitemap)
+            except Exception as e:
+                logger.error(f"Could not open sitemap {sitemap}: {e}")
+                continue
+
+            try:
+                for kind, loc in parse_sitemap(stream):
+                    if kind == 'url':
+                        yield loc
+                        yielded += 1
+                        if self.max_urls and yielded >= self.max_urls:
+                            return
+                    elif depth < self.max_depth and loc not in seen:
+                        seen.add(loc)
+                        pending.append((loc, depth + 1))
+            except (ET.ParseError, OSError, EOFError) as e:
+                logger.error(f"Stopped reading sitemap {sitemap}: {e}")
+            finally:
+                stream.close()
+        logger.info(f"Read {yielded} URLs from sitemap {source}")
+
+def iter_seed_urls(entries: Iterable[str], sitemap_reader: SitemapReader,
+                   paths: Iterable[str] = SEED_PATHS) -> Iterator[str]:
+    """Expand seed entries (URLs, bare domains, sitemaps) into page URLs, lazily"""
+    paths = tuple(paths)
+    for entry in entries:
+        if is_sitemap(entry):
+            yield from sitemap_reader.iter_urls(entry)
+        elif '://' in entry:
+            yield entry
+        else:
+            yield from expand_domain(entry, paths)
@@ -0,0 +1,84 @@
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Task states
+QUEUED = 'queued'
+LEASED = 'leased'
+DONE = 'done'
+DEAD = 'dead'
+
+def task_id_for(country_code: str, keyword: str) -> str:
+    return f"{country_code}\t{keyword}"
+
+def new_run_id() -> str:
+    return f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+
+@dataclass
+class Task:
+    task_id: str
+    country_code: str
+    keyword: str
+    attempts: int = 0
+    # The crawl the task was submitted for; workers drop local progress from other runs
+    run_id: str = ''
+
+class BaseTaskQueue(ABC):
+    """Shared queue of (country, keyword) tasks leased to crawl workers"""
+    # A lease is valid until its visibility timeout runs out; workers extend it
+    # with heartbeats, and expired leases are handed to the next worker.
+
+    def __init__(self, max_attempts: int = 3):
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def submit(self, tasks: Iterable[Tuple[str, str]]) -> int:
+        """Enqueue (country_code, keyword) tasks not already known; returns how many were added"""
+        pass
+
+    @abstractmethod
+    def reset(self) -> str:
+        """Drop every task and start a new run, so the same tasks can be submitted again; returns its id"""
+        pass
+
+    @abstractmethod
+    def lease(self, worker_id: str, visibility_timeout: float) -> Optional[Task]:
+        """Take the next available task, or None if there is nothing to do right now"""
+        pass
+
+    @abstractmethod
+    def heartbeat(self, task: Task, worker_id: str, visibility_timeout: float) -> bool:
+        """Extend a lease; False if the worker no longer holds it"""
+        pass
+
+    @abstractmethod
+    def complete(self, task: Task, worker_id: str) -> bool:
+        """Mark a leased task done; False if the lease had already been lost"""
+        pass
+
+    @abstractmethod
+    def fail(self, task: Task, worker_id: str, reason: str):
+        """Give a task back for another worker, or bury it after max_attempts"""
+        pass
+
+    @abstractmethod
+    def reclaim_expired(self) -> int:
+        """Requeue tasks whose lease ran out (their worker died); returns how many"""
+        pass
+
+    @abstractmethod
+    def progress(self) -> Dict[str, int]:
+        """Number of tasks in each state"""
+        pass
+
+    def is_finished(self) -> bool:
+        counts = self.progress()
+        return not counts.get(QUEUED) and not counts.get(LEASED)
+
+    def close(self):
+        pass
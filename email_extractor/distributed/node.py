@@ -0,0 +1,120 @@
+import os
+import time
+import socket
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from .base import BaseTaskQueue, Task
+from ..spider import EmailSpider
+from ..sharded import local_configs
+from ..exporters.storage import create_storage
+
+logger = logging.getLogger(__name__)
+
+class Coordinator:
+    """Fill the shared queue with (country, keyword) tasks and watch it drain"""
+
+    def __init__(self, task_queue: BaseTaskQueue, storage_config: Dict = None,
+                 poll_interval: float = 60):
+        self.task_queue = task_queue
+        self.storage_config = storage_config
+        self.poll_interval = poll_interval
+
+    def submit(self, keywords: List[str], country_codes: List[str], resume: bool = False) -> int:
+        """Queue every task; without resume, earlier runs' tasks are dropped so all of them run again"""
+        if not resume:
+            run_id = self.task_queue.reset()
+            logger.info(f"Starting crawl run {run_id}")
+        added = self.task_queue.submit((country_code, keyword)
+                                       for country_code in country_codes for keyword in keywords)
+        logger.info(f"Submitted {added} new tasks ({len(keywords) * len(country_codes)} requested)")
+        return added
+
+    def monitor(self) -> Dict[str, int]:
+        """Reclaim leases of dead workers until every task is done or dead"""
+        while True:
+            self.task_queue.reclaim_expired()
+            progress = self.task_queue.progress()
+            logger.info(f"Task progress: {progress}")
+            if self.task_queue.is_finished():
+                return progress
+            time.sleep(self.poll_interval)
+
+    def export(self, country_codes: List[str], filename: str = "extracted_emails.csv"):
+        """Export the shared store once the workers are done"""
+        storage = create_storage(self.storage_config)
+        for country_code in country_codes:
+            storage.export_unique_to_csv(f"emails_{country_code.replace('.', '')}.csv", country_code)
+        storage.export_unique_to_csv(filename)
+
+class CrawlWorker:
+    """Lease tasks from the shared queue, keep the lease alive, and crawl into the shared store"""
+
+    def __init__(self, task_queue: BaseTaskQueue, worker_id: str = None,
+                 visibility_timeout: float = 900, heartbeat_interval: float = None,
+                 poll_interval: float = 30, max_workers: int = 10,
+                 storage_config: Dict = None, fetch_config: Dict = None):
+        self.task_queue = task_queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.visibility_timeout = visibility_timeout
+        self.heartbeat_interval = heartbeat_interval or visibility_timeout / 3
+        self.poll_interval = poll_interval
+        self.max_workers = max_workers
+        self.storage_config = storage_config
+        self.fetch_config = fetch_config or {}
+        self.lock = threading.Lock()
+        self.current: Optional[Task] = None
+        self.stop_event = threading.Event()
+        self.spider: Optional[EmailSpider] = None
+
+    def _heartbeat_loop(self):
+        while not self.stop_event.wait(self.heartbeat_interval):
+            with self.lock:
+                task = self.current
+            if task and not self.task_queue.heartbeat(task, self.worker_id, self.visibility_timeout):
+                logger.warning(f"Lost the lease on {task.country_code}/{task.keyword}")
+
+    def _leased_tasks(self) -> Iterator[Tuple[str, str]]:
+        """Yield leased tasks; each is completed when the spider asks for the next one"""
+        while not self.stop_event.is_set():
+            task = self.task_queue.lease(self.worker_id, self.visibility_timeout)
+            if task is None:
+                if self.task_queue.is_finished():
+                    return
+                # Other workers hold the remaining leases; wait in case one of them dies
+                time.sleep(self.poll_interval)
+                continue
+
+            with self.lock:
+                self.current = task
+            logger.info(f"Worker {self.worker_id} leased {task.country_code}/{task.keyword}")
+            # Progress this worker kept from an earlier crawl run does not count for this one
+            if self.spider.frontier.renew_task(task.keyword, task.country_code, task.run_id):
+                logger.info(f"Starting {task.country_code}/{task.keyword} afresh for run {task.run_id}")
+            yield task.country_code, task.keyword
+
+            with self.lock:
+                self.current = None
+            if not self.task_queue.complete(task, self.worker_id):
+                logger.warning(f"Lease on {task.country_code}/{task.keyword} expired before completion")
+
+    def run(self, search_config: Dict) -> int:
+        """Work until the queue is drained; returns the number of email results"""
+        search_config, fetch_config = local_configs(search_config, self.fetch_config, self.worker_id)
+        spider = self.spider = EmailSpider(max_workers=self.max_workers, storage_config=self.storage_config,
+                                           fetch_config=fetch_config)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            # resume=True: a task this worker leases again in the same run continues where it stopped
+            return spider.crawl_tasks(self._leased_tasks(), search_config, resume=True)
+        except BaseException as e:
+            with self.lock:
+                task, self.current = self.current, None
+            if task:
+                self.task_queue.fail(task, self.worker_id, str(e) or type(e).__name__)
+            raise
+        finally:
+            self.stop_event.set()
+            heartbeat.join()
@@ -0,0 +1,195 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+from .base import BaseTaskQueue, Task, task_id_for, new_run_id
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Every state change runs as a Lua script, so it is atomic across workers.
+# Keys are derived from the prefix inside the scripts (single-node Redis only).
+
+SUBMIT_SCRIPT = """
+local prefix = KEYS[1]
+local added = 0
+for i = 1, #ARGV, 3 do
+    local task_id = ARGV[i]
+    if redis.call('SADD', prefix .. ':known', task_id) == 1 then
+        redis.call('HSET', prefix .. ':task:' .. task_id, 'country_code', ARGV[i + 1],
+                   'keyword', ARGV[i + 2], 'status', 'queued', 'attempts', 0)
+        redis.call('RPUSH', prefix .. ':queue', task_id)
+        added = added + 1
+    end
+end
+return added
+"""
+
+RESET_SCRIPT = """
+local prefix = KEYS[1]
+for _, task_id in ipairs(redis.call('SMEMBERS', prefix .. ':known')) do
+    redis.call('DEL', prefix .. ':task:' .. task_id)
+end
+redis.call('DEL', prefix .. ':known', prefix .. ':queue', prefix .. ':leases')
+redis.call('SET', prefix .. ':run_id', ARGV[1])
+return 1
+"""
+
+RECLAIM = """
+local function reclaim(prefix, now, max_attempts)
+    local expired = redis.call('ZRANGEBYSCORE', prefix .. ':leases', '-inf', '(' .. now)
+    for _, task_id in ipairs(expired) do
+        local key = prefix .. ':task:' .. task_id
+        redis.call('ZREM', prefix .. ':leases', task_id)
+        local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+        redis.call('HSET', key, 'worker_id', '', 'last_error', 'lease expired')
+        if attempts >= max_attempts then
+            redis.call('HSET', key, 'status', 'dead')
+        else
+            redis.call('HSET', key, 'status', 'queued')
+            redis.call('LPUSH', prefix .. ':queue', task_id)
+        end
+    end
+    return #expired
+end
+"""
+
+RECLAIM_SCRIPT = RECLAIM + """
+return reclaim(KEYS[1], tonumber(ARGV[1]), tonumber(ARGV[2]))
+"""
+
+LEASE_SCRIPT = RECLAIM + """
+local prefix = KEYS[1]
+local now = tonumber(ARGV[2])
+local reclaimed = reclaim(prefix, now, tonumber(ARGV[4]))
+local task_id = redis.call('LPOP', prefix .. ':queue')
+if not task_id then
+    return {reclaimed}
+end
+local key = prefix .. ':task:' .. task_id
+redis.call('HSET', key, 'status', 'leased', 'worker_id', ARGV[1])
+redis.call('ZADD', prefix .. ':leases', now + tonumber(ARGV[3]), task_id)
+local fields = redis.call('HMGET', key, 'country_code', 'keyword', 'attempts')
+local run_id = redis.call('GET', prefix .. ':run_id') or ''
+return {reclaimed, task_id, fields[1], fields[2], fields[3], run_id}
+"""
+
+HEARTBEAT_SCRIPT = """
+local key = KEYS[1] .. ':task:' .. ARGV[1]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'worker_id') ~= ARGV[2] then
+    return 0
+end
+redis.call('ZADD', KEYS[1] .. ':leases', tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+COMPLETE_SCRIPT = """
+local key = KEYS[1] .. ':task:' .. ARGV[1]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'worker_id') ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[1] .. ':leases', ARGV[1])
+redis.call('HSET', key, 'status', 'done')
+return 1
+"""
+
+FAIL_SCRIPT = """
+local key = KEYS[1] .. ':task:' .. ARGV[1]
+if redis.call('HGET', key, 'status') ~= 'leased' or redis.call('HGET', key, 'worker_id') ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[1] .. ':leases', ARGV[1])
+local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('HSET', key, 'worker_id', '', 'last_error', ARGV[3])
+if attempts >= tonumber(ARGV[4]) then
+    redis.call('HSET', key, 'status', 'dead')
+else
+    redis.call('HSET', key, 'status', 'queued')
+    redis.call('RPUSH', KEYS[1] .. ':queue', ARGV[1])
+end
+return attempts
+"""
+
+class RedisTaskQueue(BaseTaskQueue):
+    """Task queue in Redis, shared by crawl workers on several hosts"""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "email_extractor",
+                 max_attempts: int = 3):
+        if not REDIS_AVAILABLE:
+            raise ImportError("Redis task queue requires redis. Install: pip install redis")
+
+        super().__init__(max_attempts)
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self._submit = self.client.register_script(SUBMIT_SCRIPT)
+        self._reset = self.client.register_script(RESET_SCRIPT)
+        self._reclaim = self.client.register_script(RECLAIM_SCRIPT)
+        self._lease = self.client.register_script(LEASE_SCRIPT)
+        self._heartbeat = self.client.register_script(HEARTBEAT_SCRIPT)
+        self._complete = self.client.register_script(COMPLETE_SCRIPT)
+        self._fail = self.client.register_script(FAIL_SCRIPT)
+        self.client.set(f"{self.prefix}:run_id", new_run_id(), nx=True)
+
+    def reset(self) -> str:
+        run_id = new_run_id()
+        self._reset(keys=[self.prefix], args=[run_id])
+        return run_id
+
+    def submit(self, tasks: Iterable[Tuple[str, str]], chunk_size: int = 500) -> int:
+        added = 0
+        args: List[str] = []
+        for country_code, keyword in tasks:
+            args.extend((task_id_for(country_code, keyword), country_code, keyword))
+            if len(args) >= chunk_size * 3:
+                added += self._submit(keys=[self.prefix], args=args)
+                args = []
+        if args:
+            added += self._submit(keys=[self.prefix], args=args)
+        return added
+
+    def lease(self, worker_id: str, visibility_timeout: float) -> Optional[Task]:
+        reply = self._lease(keys=[self.prefix],
+                            args=[worker_id, time.time(), visibility_timeout, self.max_attempts])
+        if reply[0]:
+            logger.warning(f"Reclaimed {reply[0]} expired task leases")
+        if len(reply) == 1:
+            return None
+        _, task_id, country_code, keyword, attempts, run_id = reply
+        return Task(task_id, country_code, keyword, int(attempts), run_id)
+
+    def heartbeat(self, task: Task, worker_id: str, visibility_timeout: float) -> bool:
+        return bool(self._heartbeat(keys=[self.prefix],
+                                    args=[task.task_id, worker_id, time.time() + visibility_timeout]))
+
+    def complete(self, task: Task, worker_id: str) -> bool:
+        return bool(self._complete(keys=[self.prefix], args=[task.task_id, worker_id]))
+
+    def fail(self, task: Task, worker_id: str, reason: str):
+        attempts = self._fail(keys=[self.prefix],
+                              args=[task.task_id, worker_id, reason, self.max_attempts])
+        if attempts and attempts >= self.max_attempts:
+            logger.error(f"Giving up on {task.country_code}/{task.keyword} after {attempts} attempts: {reason}")
+
+    def reclaim_expired(self) -> int:
+        reclaimed = self._reclaim(keys=[self.prefix], args=[time.time(), self.max_attempts])
+        if reclaimed:
+            logger.warning(f"Reclaimed {reclaimed} expired task leases")
+        return reclaimed
+
+    def progress(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        pipe = self.client.pipeline(transaction=False)
+        for task_id in self.client.sscan_iter(f"{self.prefix}:known", count=1000):
+            pipe.hget(f"{self.prefix}:task:{task_id}", 'status')
+        for status in pipe.execute():
+            if status:
+                counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def close(self):
+        self.client.close()
@@ -0,0 +1,152 @@
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+from .base import BaseTaskQueue, Task, task_id_for, new_run_id, QUEUED, LEASED, DONE, DEAD
+
+logger = logging.getLogger(__name__)
+
+class SQLiteTaskQueue(BaseTaskQueue):
+    """Task queue in a SQLite file, shared by worker processes on one host"""
+
+    def __init__(self, path: str = "task_queue.db", max_attempts: int = 3):
+        super().__init__(max_attempts)
+        self.path = path
+        self.lock = threading.Lock()
+        # Autocommit mode; multi-statement changes take the write lock with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id TEXT PRIMARY KEY,
+                country_code TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker_id TEXT,
+                lease_expires_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                seq INTEGER NOT NULL,
+                updated_at REAL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, seq)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('run_id', ?)", (new_run_id(),))
+
+    def _run_id(self) -> str:
+        return self.conn.execute("SELECT value FROM meta WHERE key = 'run_id'").fetchone()[0]
+
+    def reset(self) -> str:
+        run_id = new_run_id()
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                self.conn.execute('DELETE FROM tasks')
+                self.conn.execute("UPDATE meta SET value = ? WHERE key = 'run_id'", (run_id,))
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        return run_id
+
+    def submit(self, tasks: Iterable[Tuple[str, str]]) -> int:
+        now = time.time()
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                seq = self.conn.execute('SELECT COALESCE(MAX(seq), 0) FROM tasks').fetchone()[0]
+                before = self.conn.total_changes
+                self.conn.executemany('''
+                    INSERT OR IGNORE INTO tasks (task_id, country_code, keyword, status, seq, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(task_id_for(country_code, keyword), country_code, keyword, QUEUED, seq + i, now)
+                      for i, (country_code, keyword) in enumerate(tasks, 1)])
+                added = self.conn.total_changes - before
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        return added
+
+    def lease(self, worker_id: str, visibility_timeout: float) -> Optional[Task]:
+        now = time.time()
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Leases of dead workers go back in the queue before picking
+                reclaimed = self._reclaim(now)
+                row = self.conn.execute('''
+                    SELECT task_id, country_code, keyword, attempts FROM tasks
+                    WHERE status = ? ORDER BY seq LIMIT 1
+                ''', (QUEUED,)).fetchone()
+                if row is not None:
+                    row = (*row, self._run_id())
+                    self.conn.execute('''
+                        UPDATE tasks SET status = ?, worker_id = ?, lease_expires_at = ?, updated_at = ?
+                        WHERE task_id = ?
+                    ''', (LEASED, worker_id, now + visibility_timeout, now, row[0]))
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+        if reclaimed:
+            logger.warning(f"Reclaimed {reclaimed} expired task leases")
+        return Task(*row) if row else None
+
+    def heartbeat(self, task: Task, worker_id: str, visibility_timeout: float) -> bool:
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute('''
+                UPDATE tasks SET lease_expires_at = ?, updated_at = ?
+                WHERE task_id = ? AND status = ? AND worker_id = ?
+            ''', (now + visibility_timeout, now, task.task_id, LEASED, worker_id))
+        return cursor.rowcount == 1
+
+    def complete(self, task: Task, worker_id: str) -> bool:
+        with self.lock:
+            cursor = self.conn.execute('''
+                UPDATE tasks SET status = ?, lease_expires_at = NULL, updated_at = ?
+                WHERE task_id = ? AND status = ? AND worker_id = ?
+            ''', (DONE, time.time(), task.task_id, LEASED, worker_id))
+        return cursor.rowcount == 1
+
+    def fail(self, task: Task, worker_id: str, reason: str):
+        attempts = task.attempts + 1
+        # Failed tasks go to the back of the queue
+        status = DEAD if attempts >= self.max_attempts else QUEUED
+        with self.lock:
+            self.conn.execute('''
+                UPDATE tasks SET status = ?, worker_id = NULL, lease_expires_at = NULL,
+                                 attempts = ?, last_error = ?, updated_at = ?,
+                                 seq = (SELECT MAX(seq) + 1 FROM tasks)
+                WHERE task_id = ? AND status = ? AND worker_id = ?
+            ''', (status, attempts, reason, time.time(), task.task_id, LEASED, worker_id))
+        if status == DEAD:
+            logger.error(f"Giving up on {task.country_code}/{task.keyword} after {attempts} attempts: {reason}")
+
+    def _reclaim(self, now: float) -> int:
+        cursor = self.conn.execute('''
+            UPDATE tasks SET status = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END,
+                             worker_id = NULL, lease_expires_at = NULL,
+                             attempts = attempts + 1, last_error = 'lease expired', updated_at = ?
+            WHERE status = ? AND lease_expires_at < ?
+        ''', (self.max_attempts, DEAD, QUEUED, now, LEASED, now))
+        return cursor.rowcount
+
+    def reclaim_expired(self) -> int:
+        with self.lock:
+            reclaimed = self._reclaim(time.time())
+        if reclaimed:
+            logger.warning(f"Reclaimed {reclaimed} expired task leases")
+        return reclaimed
+
+    def progress(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.conn.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
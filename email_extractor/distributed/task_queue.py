@@ -0,0 +1,21 @@
+from typing import Dict
+import logging
+
+from .base import BaseTaskQueue
+
+logger = logging.getLogger(__name__)
+
+def create_task_queue(queue_config: Dict = None) -> BaseTaskQueue:
+    """Build the task queue selected by queue_config['backend']"""
+    config = dict(queue_config or {})
+    backend = config.pop('backend', 'sqlite')
+
+    if backend == 'sqlite':
+        from .sqlite_queue import SQLiteTaskQueue
+        return SQLiteTaskQueue(**config)
+    elif backend == 'redis':
+        from .redis_queue import RedisTaskQueue
+        logger.info("Using Redis task queue")
+        return RedisTaskQueue(**config)
+    else:
+        raise ValueError(f"Unknown task queue backend: {backend}")
@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+import logging
+
+from ..core.models import EmailResult, FetchOutcome, ResultBatch
+
+logger = logging.getLogger(__name__)
+
+class BaseStorage(ABC):
+    """Base class for email storage backends"""
+
+    @staticmethod
+    def _rows(email_results: Union[Iterable[EmailResult], ResultBatch]) -> Iterator[Tuple]:
+        """Iterate (email, domain, source_url, keyword, country_code, extracted_at) rows"""
+        if isinstance(email_results, ResultBatch):
+            return email_results.rows()
+        # EmailResult is a tuple in row order already
+        return iter(email_results)
+
+    @abstractmethod
+    def save_emails(self, email_results: Union[List[EmailResult], ResultBatch]) -> int:
+        """Save email results, returning how many addresses were new"""
+        pass
+
+    @abstractmethod
+    def save_fetch_outcomes(self, outcomes: List[FetchOutcome]) -> int:
+        """Append processed URLs to the fetch ledger, returning how many were written"""
+        pass
+
+    @abstractmethod
+    def outcome_report(self, name: str, limit: int = 20, min_pages: int = 5) -> Tuple[List[str], List[Tuple]]:
+        """Run one of the OUTCOME_REPORTS over the fetch ledger; returns (header, rows)"""
+        pass
+
+    @abstractmethod
+    def count_unique(self, country_code: Optional[str] = None) -> int:
+        """Count unique email addresses, optionally for one country"""
+        pass
+
+    @abstractmethod
+    def expire_sightings(self, max_age_days: int) -> int:
+        """Delete raw sightings older than max_age_days"""
+        pass
+
+    @abstractmethod
+    def export_to_csv(self, filename: str = "extracted_emails.csv"):
+        """Export raw sightings to CSV file"""
+        pass
+
+    @abstractmethod
+    def export_country_specific(self, filename: str, country_code: str):
+        """Export raw sightings for specific country to CSV file"""
+        pass
+
+    @abstractmethod
+    def export_unique_to_csv(self, filename: str = "unique_emails.csv", country_code: Optional[str] = None):
+        """Export deduplicated emails to CSV file, optionally for one country"""
+        pass
+
+    @abstractmethod
+    def iter_unique_emails(self, inserted_from: Optional[int] = None,
+                           inserted_to: Optional[int] = None,
+                           batch_size: int = 50000) -> Iterator[List[Tuple]]:
+        """Stream unique email rows stored in [inserted_from, inserted_to) in batches"""
+        pass
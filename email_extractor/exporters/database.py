@@ -1,23 +1,57 @@
+import time
 import sqlite3
 import csv
-from typing import List
+from typing import Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
 import logging
-from ..core.models import EmailResult
+from .base import BaseStorage
+from .outcomes import OUTCOME_REPORTS
+from ..core.models import EmailResult, FetchOutcome, ResultBatch
 
 logger = logging.getLogger(__name__)
 
-class DatabaseManager:
-    """Handle database operations"""
+# Path fragments that mark a page as a deliberate contact point for an address
+CONTACT_PATH_HINTS = ('contact', 'kontakt', 'impressum', 'about', 'imprint', 'team')
+
+def _score_source(email_domain: str, source_url: str) -> int:
+    """Rank how authoritative a source page is for an email address"""
+    try:
+        parsed = urlparse(source_url)
+        host = parsed.netloc.lower().split(':')[0]
+        path = parsed.path.lower()
+    except Exception:
+        return 0
+
+    if host.startswith('www.'):
+        host = host[4:]
+
+    score = 0
+    # Addresses published on their own domain beat directory/aggregator listings
+    if host == email_domain or host.endswith('.' + email_domain) or email_domain.endswith('.' + host):
+        score += 2
+    if any(hint in path for hint in CONTACT_PATH_HINTS):
+        score += 1
+    return score
+
+class DatabaseManager(BaseStorage):
+    """Handle SQLite database operations"""
     
-    def __init__(self, db_path: str = "emails.db"):
+    def __init__(self, db_path: str = "emails.db", record_sightings: bool = True,
+                 sightings_retention_days: Optional[int] = None):
         self.db_path = db_path
+        self.record_sightings = record_sightings
+        self.sightings_retention_days = sightings_retention_days
         self.init_database()
+
+        if sightings_retention_days is not None:
+            self.expire_sightings(sightings_retention_days)
         
     def init_database(self):
         """Initialize SQLite database"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        # Raw sightings: one row per (email, page, keyword)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS emails (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -30,29 +64,225 @@ class DatabaseManager:
                 UNIQUE(email, source_url, keyword)
             )
         ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_emails_extracted_at ON emails(extracted_at)')
+
+        # Unique addresses: one row per email, upserted on every sighting
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'unique_emails'")
+        needs_backfill = cursor.fetchone() is None
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS unique_emails (
+                email TEXT PRIMARY KEY,
+                domain TEXT NOT NULL,
+                source_url TEXT NOT NULL,
+                source_score INTEGER NOT NULL DEFAULT 0,
+                keyword TEXT NOT NULL,
+                country_code TEXT NOT NULL,
+                first_seen INTEGER NOT NULL,
+                last_seen INTEGER NOT NULL,
+                sighting_count INTEGER NOT NULL DEFAULT 1,
+                inserted_at INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('PRAGMA table_info(unique_emails)')
+        if 'inserted_at' not in {row[1] for row in cursor.fetchall()}:
+            # Stores created before the column existed: first_seen is the best guess
+            cursor.execute('ALTER TABLE unique_emails ADD COLUMN inserted_at INTEGER NOT NULL DEFAULT 0')
+            cursor.execute('UPDATE unique_emails SET inserted_at = first_seen')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_unique_emails_country ON unique_emails(country_code, last_seen)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_unique_emails_domain ON unique_emails(domain)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_unique_emails_first_seen ON unique_emails(first_seen)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_unique_emails_inserted_at ON unique_emails(inserted_at)')
+
+        if needs_backfill:
+            self._backfill_unique_emails(cursor)
+        
+        # Fetch ledger: one row per processed URL (and per retry), append-only
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS fetch_outcomes (
+                url TEXT NOT NULL,
+                host TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                country_code TEXT NOT NULL,
+                outcome TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                bytes INTEGER NOT NULL,
+                fetch_ms INTEGER NOT NULL,
+                extract_ms INTEGER NOT NULL,
+                emails INTEGER NOT NULL,
+                fetched_at INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_fetch_outcomes_host ON fetch_outcomes(host)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_fetch_outcomes_domain ON fetch_outcomes(domain)')
         
         conn.commit()
         conn.close()
         
-    def save_emails(self, email_results: List[EmailResult]):
-        """Save email results to database"""
+    def _backfill_unique_emails(self, cursor: sqlite3.Cursor):
+        """Seed the unique table from sightings recorded before it existed"""
+        cursor.execute('''
+            INSERT OR IGNORE INTO unique_emails
+            (email, domain, source_url, keyword, country_code, first_seen, last_seen, sighting_count,
+             inserted_at)
+            SELECT email, domain, MIN(source_url), MIN(keyword), MIN(country_code),
+                   CAST(strftime('%s', MIN(extracted_at)) AS INTEGER),
+                   CAST(strftime('%s', MAX(extracted_at)) AS INTEGER),
+                   COUNT(*), CAST(strftime('%s', 'now') AS INTEGER)
+            FROM emails
+            GROUP BY email
+        ''')
+        if cursor.rowcount > 0:
+            logger.info(f"Backfilled {cursor.rowcount} unique emails from existing sightings")
+
+    def save_emails(self, email_results: Union[List[EmailResult], ResultBatch]) -> int:
+        """Save email results to database, returning how many addresses were new"""
+        rows = list(self._rows(email_results))
+        if not rows:
+            return 0
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        for result in email_results:
-            try:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO emails 
+        emails = list({row[0] for row in rows})
+        known = set()
+        # Stay below SQLite's bound-parameter limit
+        for i in range(0, len(emails), 500):
+            chunk = emails[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'SELECT email FROM unique_emails WHERE email IN ({placeholders})', chunk)
+            known.update(row[0] for row in cursor.fetchall())
+
+        # Pages contribute many rows each, so score every (domain, page) pair once
+        scores = {}
+        for email, domain, source_url, keyword, country_code, extracted_at in rows:
+            if (domain, source_url) not in scores:
+                scores[(domain, source_url)] = _score_source(domain, source_url)
+        # Set once, when the address is first stored; incremental exports follow it
+        inserted_at = int(time.time())
+
+        try:
+            if self.record_sightings:
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO emails
                     (email, domain, source_url, keyword, country_code)
                     VALUES (?, ?, ?, ?, ?)
-                ''', (result.email, result.domain, result.source_url, 
-                     result.keyword, result.country_code))
-            except Exception as e:
-                logger.error(f"Error saving email {result.email}: {e}")
+                ''', (row[:5] for row in rows))
                 
+            cursor.executemany('''
+                INSERT INTO unique_emails
+                (email, domain, source_url, source_score, keyword, country_code,
+                 first_seen, last_seen, sighting_count, inserted_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT(email) DO UPDATE SET
+                    first_seen = MIN(first_seen, excluded.first_seen),
+                    last_seen = MAX(last_seen, excluded.last_seen),
+                    sighting_count = sighting_count + 1,
+                    source_url = CASE WHEN excluded.source_score > source_score
+                                      THEN excluded.source_url ELSE source_url END,
+                    keyword = CASE WHEN excluded.source_score > source_score
+                                   THEN excluded.keyword ELSE keyword END,
+                    country_code = CASE WHEN excluded.source_score > source_score
+                                        THEN excluded.country_code ELSE country_code END,
+                    source_score = MAX(source_score, excluded.source_score)
+            ''', ((email, domain, source_url, scores[(domain, source_url)],
+                   keyword, country_code, extracted_at, extracted_at, inserted_at)
+                  for email, domain, source_url, keyword, country_code, extracted_at in rows))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Error saving {len(rows)} email results: {e}")
+            return 0
+        finally:
+            conn.close()
+
+        return len(set(emails) - known)
+
+    def save_fetch_outcomes(self, outcomes: List[FetchOutcome]) -> int:
+        """Append processed URLs to the fetch ledger in one transaction"""
+        if not outcomes:
+            return 0
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executemany('''
+                INSERT INTO fetch_outcomes
+                (url, host, domain, keyword, country_code, outcome, status, bytes,
+                 fetch_ms, extract_ms, emails, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', outcomes)
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error saving {len(outcomes)} fetch outcomes: {e}")
+            return 0
+        finally:
+            conn.close()
+        return len(outcomes)
+
+    def outcome_report(self, name: str, limit: int = 20, min_pages: int = 5) -> Tuple[List[str], List[Tuple]]:
+        """Run one of the OUTCOME_REPORTS over the fetch ledger; returns (header, rows)"""
+        header, query = OUTCOME_REPORTS[name]
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute(query, (min_pages, limit)).fetchall()
+        finally:
+            conn.close()
+        return header, rows
+
+    def expire_sightings(self, max_age_days: int) -> int:
+        """Delete raw sightings older than max_age_days"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            DELETE FROM emails WHERE extracted_at < datetime('now', ?)
+        ''', (f'-{int(max_age_days)} days',))
+        deleted = cursor.rowcount
+
         conn.commit()
         conn.close()
+
+        if deleted:
+            logger.info(f"Expired {deleted} sightings older than {max_age_days} days")
+        return deleted
+
+    def count_unique(self, country_code: Optional[str] = None) -> int:
+        """Count unique email addresses, optionally for one country"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        if country_code:
+            cursor.execute('SELECT COUNT(*) FROM unique_emails WHERE country_code = ?', (country_code,))
+        else:
+            cursor.execute('SELECT COUNT(*) FROM unique_emails')
+        count = cursor.fetchone()[0]
+
+        conn.close()
+        return count
         
+    def iter_unique_emails(self, inserted_from: Optional[int] = None,
+                           inserted_to: Optional[int] = None,
+                           batch_size: int = 50000) -> Iterator[List[Tuple]]:
+        """Stream unique emails stored in [inserted_from, inserted_to) in batches"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT email, domain, source_url, keyword, country_code,
+                   first_seen, last_seen, sighting_count
+            FROM unique_emails
+            WHERE inserted_at >= ? AND inserted_at < ?
+        ''', (inserted_from or 0, inserted_to if inserted_to is not None else 2 ** 62))
+
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
     def export_to_csv(self, filename: str = "extracted_emails.csv"):
         """Export emails to CSV file"""
         conn = sqlite3.connect(self.db_path)
@@ -88,4 +318,37 @@ class DatabaseManager:
             writer.writerows(rows)
                 
         conn.close()
-        logger.info(f"Exported {len(rows)} emails for {country_code} to {filename}")
\ No newline at end of file
+        logger.info(f"Exported {len(rows)} emails for {country_code} to {filename}")
+
+    def export_unique_to_csv(self, filename: str = "unique_emails.csv", country_code: Optional[str] = None):
+        """Export deduplicated emails to CSV file, optionally for one country"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        query = '''
+            SELECT email, domain, source_url, keyword, country_code,
+                   datetime(first_seen, 'unixepoch'), datetime(last_seen, 'unixepoch'),
+                   sighting_count
+            FROM unique_emails
+        '''
+        if country_code:
+            cursor.execute(query + ' WHERE country_code = ? ORDER BY last_seen DESC', (country_code,))
+        else:
+            cursor.execute(query + ' ORDER BY last_seen DESC')
+
+        count = 0
+        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Email', 'Domain', 'Source URL', 'Keyword', 'Country Code',
+                             'First Seen', 'Last Seen', 'Sightings'])
+            # Stream rows instead of materialising the whole table
+            while True:
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    break
+                writer.writerows(rows)
+                count += len(rows)
+
+        conn.close()
+        scope = f" for {country_code}" if country_code else ""
+        logger.info(f"Exported {count} unique emails{scope} to {filename}")
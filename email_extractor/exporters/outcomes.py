@@ -0,0 +1,54 @@
+from typing import Dict, List, Tuple
+
+# Reports over the fetch_outcomes ledger: name -> (column names, query).
+# Queries take (min_pages, limit) and run unchanged on SQLite and PostgreSQL
+# (with ? swapped for %s).
+OUTCOME_REPORTS: Dict[str, Tuple[List[str], str]] = {
+    # Where fetch time goes; cache hits and skipped hosts would flatter the averages
+    'slowest_hosts': (
+        ['host', 'fetches', 'avg_ms', 'max_ms', 'timeouts', 'emails'],
+        '''
+        SELECT host, COUNT(*) AS fetches, CAST(AVG(fetch_ms) AS INTEGER) AS avg_ms, MAX(fetch_ms) AS max_ms,
+               SUM(CASE WHEN outcome = 'timeout' THEN 1 ELSE 0 END) AS timeouts, SUM(emails) AS emails
+        FROM fetch_outcomes
+        WHERE outcome NOT IN ('cached', 'not_modified', 'circuit_open')
+        GROUP BY host
+        HAVING COUNT(*) >= ?
+        ORDER BY avg_ms DESC
+        LIMIT ?
+        '''),
+    # Candidates for the domain filter: visited repeatedly, never yielded an address
+    'zero_yield_domains': (
+        ['domain', 'pages', 'bytes', 'fetch_ms', 'failures'],
+        '''
+        SELECT domain, COUNT(*) AS pages, SUM(bytes) AS bytes, SUM(fetch_ms) AS fetch_ms,
+               SUM(CASE WHEN outcome NOT IN ('ok', 'cached', 'not_modified') THEN 1 ELSE 0 END) AS failures
+        FROM fetch_outcomes
+        GROUP BY domain
+        HAVING COUNT(*) >= ? AND SUM(emails) = 0
+        ORDER BY pages DESC
+        LIMIT ?
+        '''),
+    # Bytes downloaded for pages without an address, e.g. to set head_bytes or max_body_bytes
+    'wasted_bytes': (
+        ['domain', 'wasted_bytes', 'pages', 'blocked_bytes', 'avg_page_bytes'],
+        '''
+        SELECT domain, SUM(bytes) AS wasted_bytes, COUNT(*) AS pages,
+               SUM(CASE WHEN outcome <> 'ok' THEN bytes ELSE 0 END) AS blocked_bytes,
+               CAST(AVG(bytes) AS INTEGER) AS avg_page_bytes
+        FROM fetch_outcomes
+        WHERE emails = 0
+        GROUP BY domain
+        HAVING COUNT(*) >= ?
+        ORDER BY wasted_bytes DESC
+        LIMIT ?
+        '''),
+}
+
+def format_report(header: List[str], rows: List[Tuple]) -> str:
+    """Plain-text table of a report"""
+    table = [header] + [[str(value) for value in row] for row in rows]
+    widths = [max(len(row[i]) for row in table) for i in range(len(header))]
+    lines = ['  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip() for row in table]
+    lines.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(lines)
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+import logging
+
+from .base import BaseStorage
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STATE_FILENAME = "_export_state.json"
+
+class ParquetExporter:
+    """Export unique emails to Parquet, partitioned by country and extraction date"""
+    # Incremental output is insert-only: each run appends the addresses stored
+    # since the last one. Later changes to an exported address (sighting_count,
+    # last_seen, a better source, an earlier first_seen that moves it to another
+    # date partition) are not written back; a full export rebuilds the dataset.
+
+    def __init__(self, storage: BaseStorage, output_dir: str = "parquet",
+                 row_group_size: int = 100000, compression: str = "zstd",
+                 settle_seconds: int = 60):
+        if not PARQUET_AVAILABLE:
+            raise ImportError("Parquet export requires pyarrow. Install: pip install pyarrow")
+
+        self.storage = storage
+        self.output_dir = output_dir
+        self.row_group_size = row_group_size
+        self.compression = compression
+        # Rows stored less than this long ago are left for the next run, so a
+        # batch that is still being written when the export starts is not skipped
+        self.settle_seconds = settle_seconds
+        self.schema = pa.schema([
+            ('email', pa.string()),
+            ('domain', pa.string()),
+            ('source_url', pa.string()),
+            ('keyword', pa.dictionary(pa.int32(), pa.string())),
+            ('first_seen', pa.timestamp('s', tz='UTC')),
+            ('last_seen', pa.timestamp('s', tz='UTC')),
+            ('sighting_count', pa.int64()),
+        ])
+
+    def _state_path(self) -> str:
+        return os.path.join(self.output_dir, STATE_FILENAME)
+
+    def _load_watermark(self) -> int:
+        try:
+            with open(self._state_path(), 'r', encoding='utf-8') as f:
+                return int(json.load(f).get('watermark', 0))
+        except (OSError, ValueError):
+            return 0
+
+    def _save_watermark(self, watermark: int):
+        tmp_path = self._state_path() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'watermark': watermark, 'exported_at': int(time.time())}, f)
+        os.replace(tmp_path, self._state_path())
+
+    def _partition_path(self, country_code: str, extracted_date: str, run_id: int) -> str:
+        directory = os.path.join(self.output_dir, f"country_code={country_code}",
+                                 f"extracted_date={extracted_date}")
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"part-{run_id}.parquet")
+
+    def _remove_parts(self, keep: List[str]) -> int:
+        """Delete part files not in keep, and partition directories left empty"""
+        keep = {os.path.abspath(path) for path in keep}
+        removed = 0
+        for root, dirs, files in os.walk(self.output_dir, topdown=False):
+            for filename in files:
+                path = os.path.join(root, filename)
+                is_part = filename.startswith('part-') and filename.endswith('.parquet')
+                if is_part and os.path.abspath(path) not in keep:
+                    os.remove(path)
+                    removed += 1
+            if root != self.output_dir and not os.listdir(root):
+                os.rmdir(root)
+        return removed
+
+    def _to_table(self, rows: List[Tuple]) -> 'pa.Table':
+        columns = list(zip(*rows))
+        return pa.table([
+            pa.array(columns[0], pa.string()),
+            pa.array(columns[1], pa.string()),
+            pa.array(columns[2], pa.string()),
+            pa.array(columns[3], pa.string()).dictionary_encode(),
+            pa.array(columns[4], pa.int64()).cast(pa.timestamp('s', tz='UTC')),
+            pa.array(columns[5], pa.int64()).cast(pa.timestamp('s', tz='UTC')),
+            pa.array(columns[6], pa.int64()),
+        ], schema=self.schema)
+
+    def export(self, incremental: bool = True) -> int:
+        """Append emails first stored since the last export as new Parquet files; a full export replaces the dataset"""
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        watermark = self._load_watermark() if incremental else 0
+        cutoff = int(time.time()) - self.settle_seconds
+        if cutoff <= watermark:
+            logger.info("Parquet export is up to date")
+            return 0
+
+        run_id = cutoff
+        writers: Dict[Tuple[str, str], 'pq.ParquetWriter'] = {}
+        buffers: Dict[Tuple[str, str], List[Tuple]] = {}
+        paths: List[str] = []
+        total = 0
+        completed = False
+
+        def flush(partition: Tuple[str, str]):
+            rows = buffers.pop(partition, None)
+            if not rows:
+                return
+            writer = writers.get(partition)
+            if writer is None:
+                path = self._partition_path(partition[0], partition[1], run_id)
+                # Written under a temporary name so readers never see half a file
+                writer = pq.ParquetWriter(path + '.tmp', self.schema, compression=self.compression)
+                writers[partition] = writer
+                paths.append(path)
+            writer.write_table(self._to_table(rows), row_group_size=self.row_group_size)
+
+        try:
+            # The watermark follows when rows were stored, not when they were extracted:
+            # late writer batches and retries carry extraction times from before it
+            for batch in self.storage.iter_unique_emails(watermark, cutoff, self.row_group_size):
+                for email, domain, source_url, keyword, country_code, first_seen, last_seen, count in batch:
+                    extracted_date = datetime.fromtimestamp(first_seen, timezone.utc).strftime('%Y-%m-%d')
+                    partition = (country_code, extracted_date)
+                    buffers.setdefault(partition, []).append(
+                        (email, domain, source_url, keyword, first_seen, last_seen, count))
+                    if len(buffers[partition]) >= self.row_group_size:
+                        flush(partition)
+                total += len(batch)
+
+            for partition in list(buffers):
+                flush(partition)
+            completed = True
+        finally:
+            for writer in writers.values():
+                writer.close()
+            for path in paths:
+                if completed:
+                    os.replace(path + '.tmp', path)
+                else:
+                    os.remove(path + '.tmp')
+
+        if not incremental:
+            # Every address is in this run's files; earlier parts would duplicate them
+            removed = self._remove_parts(paths)
+            if removed:
+                logger.info(f"Full export replaced {removed} earlier Parquet files")
+        self._save_watermark(cutoff)
+        logger.info(f"Exported {total} emails to {len(writers)} Parquet partitions in {self.output_dir}")
+        return total
@@ -0,0 +1,320 @@
+import io
+import csv
+import time
+from typing import Iterator, List, Optional, Tuple, Union
+import logging
+
+from .base import BaseStorage
+from .database import _score_source
+from .outcomes import OUTCOME_REPORTS
+from ..core.models import EmailResult, FetchOutcome, ResultBatch
+
+try:
+    import psycopg2
+    POSTGRES_AVAILABLE = True
+except ImportError:
+    POSTGRES_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+UNIQUE_EXPORT_HEADER = ['Email', 'Domain', 'Source URL', 'Keyword', 'Country Code',
+                        'First Seen', 'Last Seen', 'Sightings']
+SIGHTINGS_EXPORT_HEADER = ['ID', 'Email', 'Domain', 'Source URL', 'Keyword', 'Country Code', 'Extracted At']
+
+def _copy_escape(value: str) -> str:
+    """Escape a value for PostgreSQL COPY text format"""
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+                 .replace('\n', '\\n').replace('\r', '\\r'))
+
+class PostgresStorage(BaseStorage):
+    """PostgreSQL storage shared by several crawl nodes, bulk-loaded with COPY"""
+
+    def __init__(self, dsn: str, record_sightings: bool = True,
+                 sightings_retention_days: Optional[int] = None):
+        if not POSTGRES_AVAILABLE:
+            raise ImportError("PostgreSQL storage requires psycopg2. Install: pip install psycopg2-binary")
+
+        self.dsn = dsn
+        self.record_sightings = record_sightings
+        self.sightings_retention_days = sightings_retention_days
+        self.init_database()
+
+        if sightings_retention_days is not None:
+            self.expire_sightings(sightings_retention_days)
+
+    def _connect(self):
+        return psycopg2.connect(self.dsn)
+
+    def init_database(self):
+        """Initialize PostgreSQL schema"""
+        conn = self._connect()
+        try:
+            with conn, conn.cursor() as cursor:
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS emails (
+                        id BIGSERIAL PRIMARY KEY,
+                        email TEXT NOT NULL,
+                        domain TEXT NOT NULL,
+                        source_url TEXT NOT NULL,
+                        keyword TEXT NOT NULL,
+                        country_code TEXT NOT NULL,
+                        extracted_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                        UNIQUE(email, source_url, keyword)
+                    )
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_emails_extracted_at ON emails(extracted_at)')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS unique_emails (
+                        email TEXT PRIMARY KEY,
+                        domain TEXT NOT NULL,
+                        source_url TEXT NOT NULL,
+                        source_score SMALLINT NOT NULL DEFAULT 0,
+                        keyword TEXT NOT NULL,
+                        country_code TEXT NOT NULL,
+                        first_seen BIGINT NOT NULL,
+                        last_seen BIGINT NOT NULL,
+                        sighting_count BIGINT NOT NULL DEFAULT 1,
+                        inserted_at BIGINT NOT NULL DEFAULT 0
+                    )
+                ''')
+                cursor.execute('''
+                    SELECT 1 FROM information_schema.columns
+                    WHERE table_name = 'unique_emails' AND column_name = 'inserted_at'
+                ''')
+                if cursor.fetchone() is None:
+                    # Stores created before the column existed: first_seen is the best guess
+                    cursor.execute('ALTER TABLE unique_emails ADD COLUMN inserted_at BIGINT NOT NULL DEFAULT 0')
+                    cursor.execute('UPDATE unique_emails SET inserted_at = first_seen')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_unique_emails_country ON unique_emails(country_code, last_seen)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_unique_emails_domain ON unique_emails(domain)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_unique_emails_first_seen ON unique_emails(first_seen)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_unique_emails_inserted_at ON unique_emails(inserted_at)')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS fetch_outcomes (
+                        url TEXT NOT NULL,
+                        host TEXT NOT NULL,
+                        domain TEXT NOT NULL,
+                        keyword TEXT NOT NULL,
+                        country_code TEXT NOT NULL,
+                        outcome TEXT NOT NULL,
+                        status SMALLINT NOT NULL,
+                        bytes BIGINT NOT NULL,
+                        fetch_ms INTEGER NOT NULL,
+                        extract_ms INTEGER NOT NULL,
+                        emails INTEGER NOT NULL,
+                        fetched_at BIGINT NOT NULL
+                    )
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_fetch_outcomes_host ON fetch_outcomes(host)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_fetch_outcomes_domain ON fetch_outcomes(domain)')
+        finally:
+            conn.close()
+
+    def save_emails(self, email_results: Union[List[EmailResult], ResultBatch]) -> int:
+        """Bulk load email results with COPY, returning how many addresses were new"""
+        buffer = io.StringIO()
+        scores = {}
+        row_count = 0
+        for email, domain, source_url, keyword, country_code, extracted_at in self._rows(email_results):
+            if (domain, source_url) not in scores:
+                scores[(domain, source_url)] = _score_source(domain, source_url)
+            buffer.write('\t'.join((
+                _copy_escape(email), _copy_escape(domain), _copy_escape(source_url),
+                str(scores[(domain, source_url)]), _copy_escape(keyword),
+                _copy_escape(country_code), str(extracted_at),
+            )))
+            buffer.write('\n')
+            row_count += 1
+        if not row_count:
+            return 0
+        buffer.seek(0)
+
+        conn = self._connect()
+        try:
+            with conn, conn.cursor() as cursor:
+                cursor.execute('''
+                    CREATE TEMP TABLE email_staging (
+                        seq BIGSERIAL, email TEXT, domain TEXT, source_url TEXT, source_score SMALLINT,
+                        keyword TEXT, country_code TEXT, seen_at BIGINT
+                    ) ON COMMIT DROP
+                ''')
+                cursor.copy_expert('''
+                    COPY email_staging (email, domain, source_url, source_score, keyword, country_code, seen_at)
+                    FROM STDIN
+                ''', buffer)
+
+                if self.record_sightings:
+                    cursor.execute('''
+                        INSERT INTO emails (email, domain, source_url, keyword, country_code)
+                        SELECT email, domain, source_url, keyword, country_code FROM email_staging
+                        ON CONFLICT (email, source_url, keyword) DO NOTHING
+                    ''')
+
+                # Collapse the batch to one row per address before upserting, since
+                # ON CONFLICT cannot touch the same row twice in one statement.
+                # Sorting by email keeps lock order stable across concurrent nodes;
+                # among equally scored sources the first one wins, as in SQLite.
+                cursor.execute('''
+                    INSERT INTO unique_emails AS u
+                    (email, domain, source_url, source_score, keyword, country_code,
+                     first_seen, last_seen, sighting_count, inserted_at)
+                    SELECT DISTINCT ON (email)
+                           email, domain, source_url, source_score, keyword, country_code,
+                           MIN(seen_at) OVER (PARTITION BY email),
+                           MAX(seen_at) OVER (PARTITION BY email),
+                           COUNT(*) OVER (PARTITION BY email),
+                           %s
+                    FROM email_staging
+                    ORDER BY email, source_score DESC, seq
+                    ON CONFLICT (email) DO UPDATE SET
+                        first_seen = LEAST(u.first_seen, EXCLUDED.first_seen),
+                        last_seen = GREATEST(u.last_seen, EXCLUDED.last_seen),
+                        sighting_count = u.sighting_count + EXCLUDED.sighting_count,
+                        source_url = CASE WHEN EXCLUDED.source_score > u.source_score
+                                          THEN EXCLUDED.source_url ELSE u.source_url END,
+                        keyword = CASE WHEN EXCLUDED.source_score > u.source_score
+                                       THEN EXCLUDED.keyword ELSE u.keyword END,
+                        country_code = CASE WHEN EXCLUDED.source_score > u.source_score
+                                            THEN EXCLUDED.country_code ELSE u.country_code END,
+                        source_score = GREATEST(u.source_score, EXCLUDED.source_score)
+                    RETURNING (xmax = 0)
+                ''', (int(time.time()),))
+                # xmax is zero only for freshly inserted rows
+                new_count = sum(1 for (inserted,) in cursor.fetchall() if inserted)
+        except Exception as e:
+            logger.error(f"Error saving {row_count} emails to PostgreSQL: {e}")
+            raise
+        finally:
+            conn.close()
+
+        return new_count
+
+    def save_fetch_outcomes(self, outcomes: List[FetchOutcome]) -> int:
+        """Bulk load processed URLs into the fetch ledger with COPY"""
+        if not outcomes:
+            return 0
+        buffer = io.StringIO()
+        for outcome in outcomes:
+            buffer.write('\t'.join(_copy_escape(str(value)) for value in outcome))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        conn = self._connect()
+        try:
+            with conn, conn.cursor() as cursor:
+                cursor.copy_expert('''
+                    COPY fetch_outcomes (url, host, domain, keyword, country_code, outcome, status, bytes,
+                                         fetch_ms, extract_ms, emails, fetched_at) FROM STDIN
+                ''', buffer)
+        except Exception as e:
+            logger.error(f"Error saving {len(outcomes)} fetch outcomes to PostgreSQL: {e}")
+            raise
+        finally:
+            conn.close()
+        return len(outcomes)
+
+    def outcome_report(self, name: str, limit: int = 20, min_pages: int = 5) -> Tuple[List[str], List[Tuple]]:
+        """Run one of the OUTCOME_REPORTS over the fetch ledger; returns (header, rows)"""
+        header, query = OUTCOME_REPORTS[name]
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(query.replace('?', '%s'), (min_pages, limit))
+                return header, cursor.fetchall()
+        finally:
+            conn.close()
+
+    def expire_sightings(self, max_age_days: int) -> int:
+        """Delete raw sightings older than max_age_days"""
+        conn = self._connect()
+        try:
+            with conn, conn.cursor() as cursor:
+                cursor.execute("DELETE FROM emails WHERE extracted_at < now() - %s * interval '1 day'",
+                               (int(max_age_days),))
+                deleted = cursor.rowcount
+        finally:
+            conn.close()
+
+        if deleted:
+            logger.info(f"Expired {deleted} sightings older than {max_age_days} days")
+        return deleted
+
+    def count_unique(self, country_code: Optional[str] = None) -> int:
+        """Count unique email addresses, optionally for one country"""
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                if country_code:
+                    cursor.execute('SELECT COUNT(*) FROM unique_emails WHERE country_code = %s', (country_code,))
+                else:
+                    cursor.execute('SELECT COUNT(*) FROM unique_emails')
+                return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def iter_unique_emails(self, inserted_from: Optional[int] = None,
+                           inserted_to: Optional[int] = None,
+                           batch_size: int = 50000) -> Iterator[List[Tuple]]:
+        """Stream unique emails stored in [inserted_from, inserted_to) in batches"""
+        conn = self._connect()
+        try:
+            # Named cursor keeps the result set on the server
+            with conn.cursor(name='unique_emails_export') as cursor:
+                cursor.itersize = batch_size
+                cursor.execute('''
+                    SELECT email, domain, source_url, keyword, country_code,
+                           first_seen, last_seen, sighting_count
+                    FROM unique_emails
+                    WHERE inserted_at >= %s AND inserted_at < %s
+                ''', (inserted_from or 0, inserted_to if inserted_to is not None else 2 ** 62))
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+        finally:
+            conn.close()
+
+    def _copy_out(self, filename: str, header: List[str], query: str, params: tuple = None) -> int:
+        """Stream a query result straight into a CSV file with COPY TO"""
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                copy_sql = cursor.mogrify(f'COPY ({query}) TO STDOUT WITH (FORMAT csv)', params).decode('utf-8')
+                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+                    csv.writer(csvfile).writerow(header)
+                    cursor.copy_expert(copy_sql, csvfile)
+                return cursor.rowcount
+        finally:
+            conn.close()
+
+    def export_to_csv(self, filename: str = "extracted_emails.csv"):
+        """Export raw sightings to CSV file"""
+        count = self._copy_out(filename, SIGHTINGS_EXPORT_HEADER,
+                               'SELECT * FROM emails ORDER BY extracted_at DESC')
+        logger.info(f"Exported {count} emails to {filename}")
+
+    def export_country_specific(self, filename: str, country_code: str):
+        """Export raw sightings for specific country to CSV file"""
+        count = self._copy_out(filename, SIGHTINGS_EXPORT_HEADER,
+                               'SELECT * FROM emails WHERE country_code = %s ORDER BY extracted_at DESC',
+                               (country_code,))
+        logger.info(f"Exported {count} emails for {country_code} to {filename}")
+
+    def export_unique_to_csv(self, filename: str = "unique_emails.csv", country_code: Optional[str] = None):
+        """Export deduplicated emails to CSV file, optionally for one country"""
+        query = '''
+            SELECT email, domain, source_url, keyword, country_code,
+                   to_char(to_timestamp(first_seen) AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS'),
+                   to_char(to_timestamp(last_seen) AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS'),
+                   sighting_count
+            FROM unique_emails
+        '''
+        if country_code:
+            count = self._copy_out(filename, UNIQUE_EXPORT_HEADER,
+                                   query + ' WHERE country_code = %s ORDER BY last_seen DESC', (country_code,))
+        else:
+            count = self._copy_out(filename, UNIQUE_EXPORT_HEADER, query + ' ORDER BY last_seen DESC')
+
+        scope = f" for {country_code}" if country_code else ""
+        logger.info(f"Exported {count} unique emails{scope} to {filename}")
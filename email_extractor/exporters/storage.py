@@ -0,0 +1,21 @@
+from typing import Dict
+import logging
+
+from .base import BaseStorage
+
+logger = logging.getLogger(__name__)
+
+def create_storage(storage_config: Dict = None) -> BaseStorage:
+    """Build the storage backend selected by storage_config['backend']"""
+    config = dict(storage_config or {})
+    backend = config.pop('backend', 'sqlite')
+
+    if backend == 'sqlite':
+        from .database import DatabaseManager
+        return DatabaseManager(**config)
+    elif backend in ('postgres', 'postgresql'):
+        from .postgres import PostgresStorage
+        logger.info("Using PostgreSQL storage backend")
+        return PostgresStorage(**config)
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,126 @@
+import os
+import time
+import logging
+import multiprocessing as mp
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .core.models import ResultBatch
+from .core.extractor import EmailExtractor
+from .core.archives import (iter_archive_files, is_warc, is_html, iter_warc_pages, iter_mapped_warc_pages,
+                            split_warc, html_source_url, decode_text, map_file)
+from .exporters.storage import create_storage
+from .utils.logging_setup import setup_logging, worker_log_config, WORKER_FORMAT
+
+logger = logging.getLogger(__name__)
+
+# Work unit: (kind, path or paths, start, stop, keyword, country_code)
+Unit = Tuple[str, object, int, int, str, str]
+
+_extractor: Optional[EmailExtractor] = None
+
+def _init_worker(log_config: Dict):
+    global _extractor
+    setup_logging(fmt=WORKER_FORMAT, **log_config)
+    _extractor = EmailExtractor()
+
+def _pages(unit: Unit) -> Iterator[Tuple[str, bytes, Optional[str]]]:
+    kind, target, start, stop = unit[:4]
+    if kind == 'warc.gz':
+        yield from iter_warc_pages(target)
+    elif kind == 'warc':
+        buf = map_file(target)
+        try:
+            yield from iter_mapped_warc_pages(buf, start, stop)
+        finally:
+            buf.close()
+    else:
+        for path in target:
+            buf = map_file(path)
+            if buf is None:
+                continue
+            try:
+                # The map itself is the body; decoding reads it without an extra copy
+                yield html_source_url(path, buf[:4096]), buf, None
+            finally:
+                buf.close()
+
+def _extract_unit(unit: Unit) -> Tuple[ResultBatch, int, int]:
+    """Worker process: extract one unit; returns its results, page count and bytes scanned"""
+    batch = ResultBatch(unit[4], unit[5])
+    pages = 0
+    scanned = 0
+    try:
+        for source_url, body, content_type in _pages(unit):
+            pages += 1
+            scanned += len(body)
+            emails = _extractor.extract_emails(decode_text(body, content_type), source_url)
+            batch.add_page(source_url, emails)
+    except (OSError, EOFError, ValueError) as e:
+        # A damaged archive keeps what was read before the damage
+        logger.error(f"Stopped reading {unit[1] if unit[0] != 'html' else unit[1][0]}: {e}")
+    return batch, pages, scanned
+
+class ArchiveIngester:
+    """Extract emails from WARC archives and saved HTML pages, without any network"""
+
+    def __init__(self, processes: int = None, storage_config: Dict = None,
+                 chunk_bytes: int = 64 * 1024 ** 2, html_batch: int = 200):
+        self.processes = processes or os.cpu_count() or 1
+        self.storage_config = storage_config
+        # Uncompressed WARCs are split into record-aligned ranges of about this size
+        self.chunk_bytes = chunk_bytes
+        self.html_batch = html_batch
+
+    def plan(self, paths: Iterable[str], keyword: str = None,
+             country_code: str = "archive") -> Iterator[Unit]:
+        """Cut the inputs into work units for the pool"""
+        for root in paths:
+            unit_keyword = keyword or os.path.basename(os.path.normpath(root))
+            html_files: List[str] = []
+            for path in iter_archive_files([root]):
+                if path.lower().endswith('.gz'):
+                    # Gzip members can only be found by decompressing; one worker per file
+                    yield ('warc.gz', path, 0, 0, unit_keyword, country_code)
+                elif is_warc(path):
+                    buf = map_file(path)
+                    if buf is None:
+                        continue
+                    try:
+                        ranges = split_warc(buf, self.chunk_bytes)
+                    finally:
+                        buf.close()
+                    for start, stop in ranges:
+                        yield ('warc', path, start, stop, unit_keyword, country_code)
+                elif is_html(path):
+                    html_files.append(path)
+                    if len(html_files) >= self.html_batch:
+                        yield ('html', html_files, 0, 0, unit_keyword, country_code)
+                        html_files = []
+            if html_files:
+                yield ('html', html_files, 0, 0, unit_keyword, country_code)
+
+    def ingest(self, paths: Iterable[str], keyword: str = None,
+               country_code: str = "archive") -> Dict[str, int]:
+        """Extract every page under paths into the store; returns totals"""
+        paths = list(paths)
+        storage = create_storage(self.storage_config)
+        totals = {'units': 0, 'pages': 0, 'bytes': 0, 'results': 0, 'new_addresses': 0}
+        started = time.time()
+
+        # spawn: workers start clean, like the sharded crawler's
+        ctx = mp.get_context('spawn')
+        with ctx.Pool(self.processes, initializer=_init_worker,
+                      initargs=(worker_log_config(),)) as pool:
+            for batch, pages, scanned in pool.imap_unordered(_extract_unit,
+                                                             self.plan(paths, keyword, country_code)):
+                totals['units'] += 1
+                totals['pages'] += pages
+                totals['bytes'] += scanned
+                if batch:
+                    totals['results'] += len(batch)
+                    totals['new_addresses'] += storage.save_emails(batch)
+
+        elapsed = max(time.time() - started, 1e-6)
+        logger.info(f"Ingested {totals['pages']} pages ({totals['bytes'] / 1024 ** 2:.0f} MiB) "
+                    f"in {elapsed:.1f}s, {totals['bytes'] / 1024 ** 2 / elapsed:.0f} MiB/s: {totals}")
+        return totals
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Callable, List, Dict
 import logging
 from urllib.parse import urlparse
 
@@ -8,14 +8,22 @@ logger = logging.getLogger(__name__)
 class BaseSearchEngine(ABC):
     """Base class for search engines"""
     
-    def __init__(self, anti_bot):
+    def __init__(self, anti_bot, result_cache=None):
         self.anti_bot = anti_bot
+        self.result_cache = result_cache
         
     @abstractmethod
     def search(self, keyword: str, country_code: str, max_results: int = 10000) -> List[str]:
         """Search for URLs"""
         pass
 
+    def _cached_search(self, provider: str, keyword: str, country_code: str, operators: Dict,
+                       max_results: int, fetch: Callable[[], List[str]]) -> List[str]:
+        """Run one provider's search through the result cache, if there is one"""
+        if self.result_cache is None:
+            return fetch()
+        return self.result_cache.search(provider, keyword, country_code, operators, max_results, fetch)
+
     def _is_valid_url(self, url: str, country_code: str) -> bool:
         """Validate URL and check if it matches country code"""
         try:
@@ -0,0 +1,152 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _operators_key(operators: Optional[Dict]) -> str:
+    # Sorted so the same operators in another order hit the same entry
+    return json.dumps(operators or {}, sort_keys=True, ensure_ascii=False)
+
+class SearchResultCache:
+    """Persistent cache of search result URLs per (provider, keyword, country, operators)"""
+
+    def __init__(self, db_path: str = "search_cache.db", ttl: int = 7 * 86400,
+                 stale_ttl: int = 30 * 86400):
+        # Entries are fresh for ttl; for stale_ttl after that they are still
+        # served while a background search refreshes them
+        self.db_path = db_path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'stores': 0,
+                      'revalidated': 0, 'revalidation_failures': 0}
+        self._refreshing = set()
+        # One refresh at a time: searches are rate-limited anyway
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-revalidate")
+
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_results (
+                cache_key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                country_code TEXT NOT NULL,
+                operators TEXT NOT NULL,
+                max_results INTEGER NOT NULL,
+                urls TEXT NOT NULL,
+                fetched_at INTEGER NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_search_results_keyword ON search_results(keyword)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_search_results_provider ON search_results(provider)')
+        self.conn.commit()
+
+    @staticmethod
+    def _key(provider: str, keyword: str, country_code: str, operators: Optional[Dict]) -> str:
+        raw = '\t'.join((provider, keyword, country_code, _operators_key(operators)))
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def store(self, provider: str, keyword: str, country_code: str, operators: Optional[Dict],
+              max_results: int, urls: List[str]):
+        """Cache a provider's result list"""
+        with self.lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO search_results
+                (cache_key, provider, keyword, country_code, operators, max_results, urls, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (self._key(provider, keyword, country_code, operators), provider, keyword, country_code,
+                  _operators_key(operators), max_results, json.dumps(urls), int(time.time())))
+            self.conn.commit()
+            self.stats['stores'] += 1
+
+    def search(self, provider: str, keyword: str, country_code: str, operators: Optional[Dict],
+               max_results: int, fetch: Callable[[], List[str]]) -> List[str]:
+        """Cached results when fresh; stale ones are returned while fetch refreshes them"""
+        cache_key = self._key(provider, keyword, country_code, operators)
+        with self.lock:
+            row = self.conn.execute('SELECT urls, max_results, fetched_at FROM search_results WHERE cache_key = ?',
+                                    (cache_key,)).fetchone()
+
+        # A list cut at a smaller max_results can't answer a larger request
+        if row is not None and row[1] >= max_results:
+            urls, _, fetched_at = row
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                with self.lock:
+                    self.stats['hits'] += 1
+                return json.loads(urls)[:max_results]
+            if age < self.ttl + self.stale_ttl:
+                with self.lock:
+                    self.stats['stale_hits'] += 1
+                    refresh = cache_key not in self._refreshing
+                    self._refreshing.add(cache_key)
+                if refresh:
+                    self._executor.submit(self._revalidate, cache_key, provider, keyword,
+                                          country_code, operators, max_results, fetch)
+                return json.loads(urls)[:max_results]
+
+        with self.lock:
+            self.stats['misses'] += 1
+        urls = fetch()
+        # Empty lists are usually blocks or provider errors, not real answers
+        if urls:
+            self.store(provider, keyword, country_code, operators, max_results, urls)
+        return urls
+
+    def _revalidate(self, cache_key: str, provider: str, keyword: str, country_code: str,
+                    operators: Optional[Dict], max_results: int, fetch: Callable[[], List[str]]):
+        try:
+            urls = fetch()
+            if urls:
+                self.store(provider, keyword, country_code, operators, max_results, urls)
+            with self.lock:
+                self.stats['revalidated' if urls else 'revalidation_failures'] += 1
+        except Exception as e:
+            logger.warning(f"Background refresh of {provider} results for '{keyword}' failed: {e}")
+            with self.lock:
+                self.stats['revalidation_failures'] += 1
+        finally:
+            with self.lock:
+                self._refreshing.discard(cache_key)
+
+    def invalidate(self, keyword: str = None, provider: str = None) -> int:
+        """Drop entries for a keyword, a provider, both, or (no arguments) everything"""
+        clauses, params = [], []
+        if keyword is not None:
+            clauses.append('keyword = ?')
+            params.append(keyword)
+        if provider is not None:
+            clauses.append('provider = ?')
+            params.append(provider)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self.lock:
+            cursor = self.conn.execute(f'DELETE FROM search_results {where}', params)
+            self.conn.commit()
+        logger.info(f"Invalidated {cursor.rowcount} cached search results")
+        return cursor.rowcount
+
+    def summary(self) -> Dict[str, int]:
+        """Entry counts by freshness"""
+        now = int(time.time())
+        with self.lock:
+            fresh, stale, expired = self.conn.execute('''
+                SELECT COALESCE(SUM(fetched_at > ?), 0),
+                       COALESCE(SUM(fetched_at <= ? AND fetched_at > ?), 0),
+                       COALESCE(SUM(fetched_at <= ?), 0)
+                FROM search_results
+            ''', (now - self.ttl, now - self.ttl, now - self.ttl - self.stale_ttl,
+                  now - self.ttl - self.stale_ttl)).fetchone()
+        return {'fresh': fresh, 'stale': stale, 'expired': expired}
+
+    def close(self):
+        """Wait for background refreshes, then close the database"""
+        self._executor.shutdown(wait=True)
+        with self.lock:
+            self.conn.close()
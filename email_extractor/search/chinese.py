@@ -1,6 +1,8 @@
 from .base import BaseSearchEngine
-from bs4 import BeautifulSoup
+from .parsing import extract_links
+from .redirects import RedirectResolver
 from urllib.parse import quote, urlparse
+from functools import partial
 from typing import List
 import logging
 
@@ -9,8 +11,9 @@ logger = logging.getLogger(__name__)
 class ChineseSearchEngine(BaseSearchEngine):
     """Chinese search engines (Baidu, Sogou, 360, Bing China)"""
     
-    def __init__(self, anti_bot):
-        super().__init__(anti_bot)
+    def __init__(self, anti_bot, result_cache=None, redirect_resolver: RedirectResolver = None):
+        super().__init__(anti_bot, result_cache)
+        self.redirect_resolver = redirect_resolver or RedirectResolver(anti_bot)
         self.search_providers = {
             'baidu': self._search_baidu,
             'sogou': self._search_sogou,
@@ -32,7 +35,10 @@ class ChineseSearchEngine(BaseSearchEngine):
             if provider in self.search_providers:
                 logger.info(f"Searching with Chinese engine: {provider}...")
                 try:
-                    urls = self.search_providers[provider](keyword, country_code, max_results)
+                    urls = self._cached_search(
+                        provider, keyword, country_code, None, max_results,
+                        partial(self.search_providers[provider], keyword, country_code, max_results)
+                    )
                     all_urls.extend(urls)
                     logger.info(f"Found {len(urls)} URLs from {provider}")
                 except Exception as e:
@@ -129,36 +135,28 @@ class ChineseSearchEngine(BaseSearchEngine):
     def _parse_baidu_results(self, html: str, country_code: str) -> List[str]:
         """Parse Baidu search results"""
         urls = []
-        soup = BeautifulSoup(html, 'html.parser')
         
         selectors = ['h3.t a', 'a[data-click]', '.result h3 a']
+        hrefs = extract_links(html, selectors)
         
-        for selector in selectors:
-            links = soup.select(selector)
-            for link in links:
-                href = link.get('href', '')
-                
-                if 'baidu.com/link?' in href:
-                    try:
-                        response = self.anti_bot.safe_request(href)
-                        if response and response.url != href:
-                            actual_url = response.url
-                            if self._is_valid_chinese_url(actual_url, country_code):
-                                urls.append(actual_url)
-                    except:
-                        continue
-                elif href.startswith('http') and self._is_valid_chinese_url(href, country_code):
-                    urls.append(href)
+        # Baidu wraps results in baidu.com/link? redirects; resolve the page's
+        # links together from their Location headers, so the target page is
+        # only downloaded once, by the spider
+        targets = self.redirect_resolver.resolve_all(href for href in hrefs if 'baidu.com/link?' in href)
+        
+        for href in hrefs:
+            if 'baidu.com/link?' in href:
+                href = targets.get(href) or ''
+            if href.startswith('http') and self._is_valid_chinese_url(href, country_code):
+                urls.append(href)
                     
         return urls
     
     def _parse_sogou_results(self, html: str, country_code: str) -> List[str]:
         """Parse Sogou search results"""
         urls = []
-        soup = BeautifulSoup(html, 'html.parser')
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
+        for href in extract_links(html, ['a[href]']):
             if href.startswith('http') and self._is_valid_chinese_url(href, country_code):
                 urls.append(href)
                 
@@ -167,10 +165,8 @@ class ChineseSearchEngine(BaseSearchEngine):
     def _parse_360_results(self, html: str, country_code: str) -> List[str]:
         """Parse 360 Search results"""
         urls = []
-        soup = BeautifulSoup(html, 'html.parser')
         
-        for link in soup.find_all('a', class_='res-title'):
-            href = link.get('href', '')
+        for href in extract_links(html, ['a.res-title']):
             if href.startswith('http') and self._is_valid_chinese_url(href, country_code):
                 urls.append(href)
                 
@@ -179,10 +175,8 @@ class ChineseSearchEngine(BaseSearchEngine):
     def _parse_bing_china_results(self, html: str, country_code: str) -> List[str]:
         """Parse Bing China search results"""
         urls = []
-        soup = BeautifulSoup(html, 'html.parser')
         
-        for link in soup.find_all('a', href=True):
-            href = link['href']
+        for href in extract_links(html, ['a[href]']):
             if href.startswith('http') and self._is_valid_chinese_url(href, country_code):
                 urls.append(href)
                 
@@ -8,10 +8,11 @@ logger = logging.getLogger(__name__)
 class GlobalSearchEngine:
     """Global search engine with region-specific providers"""
     
-    def __init__(self, anti_bot):
+    def __init__(self, anti_bot, result_cache=None, redirect_resolver=None):
         self.anti_bot = anti_bot
-        self.western_engine = WesternSearchEngine(anti_bot)
-        self.chinese_engine = ChineseSearchEngine(anti_bot)
+        self.result_cache = result_cache
+        self.western_engine = WesternSearchEngine(anti_bot, result_cache)
+        self.chinese_engine = ChineseSearchEngine(anti_bot, result_cache, redirect_resolver)
     
     def search_by_region(self, keyword: str, country_code: str, 
                         max_results: int = 10000,
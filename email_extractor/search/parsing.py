@@ -0,0 +1,125 @@
+import re
+from functools import lru_cache
+from typing import List, Sequence
+from urllib.parse import urlparse
+import logging
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('lxml', 'soup')
+_backend = 'lxml' if LXML_AVAILABLE else 'soup'
+
+# The CSS subset result pages need: descendant chains of tag, .class and [attr] parts
+SIMPLE_SELECTOR = re.compile(r'([a-zA-Z][\w-]*)?((?:\.[\w-]+)*)((?:\[[\w-]+\])*)')
+
+def _simple_to_xpath(simple: str) -> str:
+    match = SIMPLE_SELECTOR.fullmatch(simple)
+    if not match or not simple:
+        raise ValueError(f"Unsupported selector: {simple!r}")
+    tag, classes, attrs = match.groups()
+    conditions = [f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+                  for name in classes.split('.')[1:]]
+    conditions += [f"@{name}" for name in re.findall(r'\[([\w-]+)\]', attrs)]
+    return (tag or '*').lower() + ''.join(f'[{condition}]' for condition in conditions)
+
+@lru_cache(maxsize=64)
+def css_to_xpath(selector: str) -> str:
+    """'h3.t a' -> //h3[...]//a"""
+    return '//' + '//'.join(_simple_to_xpath(part) for part in selector.split())
+
+@lru_cache(maxsize=64)
+def _compiled(selector: str):
+    return etree.XPath(css_to_xpath(selector))
+
+def _parse_tree(html: str):
+    try:
+        return lxml.html.fromstring(html)
+    except ValueError:
+        # lxml refuses str input that carries an XML encoding declaration
+        return lxml.html.fromstring(html.encode('utf-8'))
+
+def _extract_lxml(html: str, selectors: Sequence[str]) -> List[str]:
+    try:
+        tree = _parse_tree(html)
+    except etree.ParserError:
+        # Empty or whitespace-only page
+        return []
+    return [link.get('href', '') for selector in selectors for link in _compiled(selector)(tree)]
+
+def _is_anchor_selector(selector: str) -> bool:
+    # A single compound selector on <a>; descendant chains need the full tree
+    match = SIMPLE_SELECTOR.fullmatch(selector)
+    return match is not None and match.group(1) == 'a'
+
+def _extract_soup(html: str, selectors: Sequence[str]) -> List[str]:
+    # Imported here so the lxml path never loads bs4
+    from bs4 import BeautifulSoup, SoupStrainer
+    if all(_is_anchor_selector(selector) for selector in selectors):
+        # Anchor-only selectors: build just the <a> elements
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('a'))
+    else:
+        soup = BeautifulSoup(html, 'html.parser')
+    return [link.get('href', '') for selector in selectors for link in soup.select(selector)]
+
+def current_backend() -> str:
+    return _backend
+
+def available_backends() -> List[str]:
+    return [name for name in BACKENDS if name != 'lxml' or LXML_AVAILABLE]
+
+def use_backend(name: str):
+    """Switch every parser to the 'lxml' or 'soup' (BeautifulSoup) backend"""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name}")
+    if name == 'lxml' and not LXML_AVAILABLE:
+        raise ImportError("lxml backend requires lxml. Install: pip install lxml")
+    _backend = name
+
+def extract_links(html: str, selectors: Sequence[str] = ('a[href]',)) -> List[str]:
+    """href of every element matching each selector, selector by selector in document order"""
+    if _backend == 'lxml':
+        return _extract_lxml(html, selectors)
+    return _extract_soup(html, selectors)
+
+# Result link selectors, newest layout first; the first one that matches wins
+GOOGLE_RESULT_SELECTORS = [
+    "div.yuRUbf a[href]",  # Modern Google
+    "div.g a[href]",
+    "div.tF2Cxc a[href]",
+    "h3 a[href]",
+    "div.r a[href]",
+]
+
+def _is_valid_result_url(url: str, country_code: str) -> bool:
+    """Check if URL is a valid search result"""
+    if not url or not url.startswith('http'):
+        return False
+    
+    parsed_url = urlparse(url)
+    domain = parsed_url.netloc.lower()
+    # Exclude Google's own URLs
+    excluded = ['google.com', 'youtube.com', 'wikipedia.org', 'facebook.com', 'twitter.com']
+    if any(domain in url for domain in excluded):
+        return False
+        
+    # Check country code
+    if country_code == ".com":
+        return ".com" in url
+    else:
+        return country_code in url
+
+def parse_google_results(html: str, country_code: str) -> List[str]:
+    """The live-DOM extraction of SeleniumGoogleSearch._extract_urls, applied to saved page source"""
+    for selector in GOOGLE_RESULT_SELECTORS:
+        urls = [href for href in extract_links(html, [selector]) if _is_valid_result_url(href, country_code)]
+        if urls:
+            return list(dict.fromkeys(urls))
+    return []
@@ -7,9 +7,11 @@ from selenium.common.exceptions import TimeoutException, WebDriverException, Inv
 import time
 import random
 import logging
-from urllib.parse import urlparse
 from typing import List, Dict
 
+# Shared with the offline result-page check, which must run without selenium
+from .parsing import GOOGLE_RESULT_SELECTORS, _is_valid_result_url
+
 logger = logging.getLogger(__name__)
 
 class SeleniumGoogleSearch:
@@ -357,15 +359,7 @@ class SeleniumGoogleSearch:
         urls = []
 
         # Extract URLs using multiple selectors
-        selectors = [ 
-            "div.yuRUbf a[href]",# Modern Google
-            "div.g a[href]", 
-            "div.tF2Cxc a[href]", 
-            "h3 a[href]",
-            "div.r a[href]"
-        ]
-            
-        for selector in selectors:
+        for selector in GOOGLE_RESULT_SELECTORS:
             try:
                 elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
                 logger.info("Selector '%s' found %d elements", selector, len(elements))
@@ -373,7 +367,7 @@ class SeleniumGoogleSearch:
                 for element in elements:
                     try:
                         href = element.get_attribute('href')
-                        if href and self._is_valid_result_url(href, country_code):
+                        if href and _is_valid_result_url(href, country_code):
                             urls.append(href)
                     except Exception as e:
                         logger.debug("Error extracting href: %s", e)
@@ -417,24 +411,6 @@ class SeleniumGoogleSearch:
         except Exception as e:
             logger.debug(f"No consent dialog found or error handling it: {e}")
     
-    def _is_valid_result_url(self, url: str, country_code: str) -> bool:
-        """Check if URL is a valid search result"""
-        if not url or not url.startswith('http'):
-            return False
-        
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc.lower()
-        # Exclude Google's own URLs
-        excluded = ['google.com', 'youtube.com', 'wikipedia.org', 'facebook.com', 'twitter.com']
-        if any(domain in url for domain in excluded):
-            return False
-            
-        # Check country code
-        if country_code == ".com":
-            return ".com" in url
-        else:
-            return country_code in url
-    
     def close(self):
         """Clean up driver"""
         if self.driver:
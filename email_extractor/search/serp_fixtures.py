@@ -0,0 +1,154 @@
+"""
+Offline check of the result-page parsers against saved pages.
+
+Fixtures live in <fixtures_dir>/<provider>/<name>.html, each next to a
+<name>.json holding {"country_code": ".de", "urls": [...]}. Providers:
+google, bing, duckduckgo, baidu, sogou, 360, bing_china.
+
+    python -m email_extractor.search.serp_fixtures            # check, exit 1 on mismatch
+    python -m email_extractor.search.serp_fixtures --record   # write expected URLs
+
+Save a new page with the browser's "save page source" (or response.text),
+record it, review the JSON, and commit both files.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+from . import parsing
+from .western import WesternSearchEngine
+from .chinese import ChineseSearchEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FIXTURES_DIR = "serp_fixtures"
+
+class _OfflineAntiBot:
+    """No network: Baidu's link?url= redirects stay unresolved"""
+
+    def safe_request(self, url: str, *args, **kwargs):
+        return None
+
+    def resolve_redirect(self, url: str, *args, **kwargs):
+        return None
+
+def parsers() -> Dict[str, Callable[[str, str], List[str]]]:
+    """Result-page parser per provider, wired up without network or browser"""
+    western = WesternSearchEngine(_OfflineAntiBot())
+    chinese = ChineseSearchEngine(_OfflineAntiBot())
+    return {
+        'google': parsing.parse_google_results,
+        'bing': western._parse_bing_results,
+        'duckduckgo': western._parse_duckduckgo_results,
+        'baidu': chinese._parse_baidu_results,
+        'sogou': chinese._parse_sogou_results,
+        '360': chinese._parse_360_results,
+        'bing_china': chinese._parse_bing_china_results,
+    }
+
+def load_fixtures(fixtures_dir: str) -> List[Tuple[str, str, str]]:
+    """(provider, page path, expectation path) for every saved page"""
+    fixtures = []
+    for provider in sorted(os.listdir(fixtures_dir)):
+        provider_dir = os.path.join(fixtures_dir, provider)
+        if not os.path.isdir(provider_dir):
+            continue
+        for filename in sorted(os.listdir(provider_dir)):
+            if filename.endswith('.html'):
+                page = os.path.join(provider_dir, filename)
+                fixtures.append((provider, page, page[:-len('.html')] + '.json'))
+    return fixtures
+
+def _read(path: str) -> str:
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+def _time_parse(parse: Callable[[str, str], List[str]], html: str, country_code: str,
+                repeat: int) -> Tuple[List[str], float]:
+    urls = parse(html, country_code)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parse(html, country_code)
+    return urls, (time.perf_counter() - started) / repeat * 1000
+
+def run(fixtures_dir: str = DEFAULT_FIXTURES_DIR, record: bool = False, repeat: int = 20,
+        country_code: str = ".com", backends: Optional[List[str]] = None) -> int:
+    """Check (or record) every fixture under every backend; returns the number of failures"""
+    provider_parsers = parsers()
+    backends = backends or parsing.available_backends()
+    previous_backend = parsing.current_backend()
+    failures = 0
+    timings: Dict[str, Dict[str, List[float]]] = {}
+
+    try:
+        for provider, page, expected_path in load_fixtures(fixtures_dir):
+            parse = provider_parsers.get(provider)
+            if parse is None:
+                logger.warning(f"No parser for provider directory '{provider}', skipping {page}")
+                continue
+            html = _read(page)
+            expected = None
+            if os.path.exists(expected_path):
+                with open(expected_path, encoding='utf-8') as f:
+                    expected = json.load(f)
+            page_country = expected['country_code'] if expected else country_code
+
+            results = {}
+            for backend in backends:
+                parsing.use_backend(backend)
+                results[backend], elapsed = _time_parse(parse, html, page_country, repeat)
+                timings.setdefault(provider, {}).setdefault(backend, []).append(elapsed)
+
+            if record:
+                # The default backend is the reference; the others must agree with it
+                urls = results[backends[0]]
+                with open(expected_path, 'w', encoding='utf-8') as f:
+                    json.dump({'country_code': page_country, 'urls': urls}, f, indent=2, ensure_ascii=False)
+                    f.write('\n')
+                expected = {'urls': urls}
+                print(f"recorded {page}: {len(urls)} URLs")
+            elif expected is None:
+                print(f"MISSING  {page}: no {os.path.basename(expected_path)}, run with --record")
+                failures += 1
+                continue
+
+            for backend, urls in results.items():
+                if urls == expected['urls']:
+                    continue
+                failures += 1
+                missing = [url for url in expected['urls'] if url not in urls]
+                extra = [url for url in urls if url not in expected['urls']]
+                print(f"FAIL     {page} [{backend}]: {len(urls)} URLs, expected {len(expected['urls'])}; "
+                      f"missing {missing[:5]}, unexpected {extra[:5]}")
+
+        print(f"\n{'provider':<12}" + ''.join(f"{backend + ' ms/page':>18}" for backend in backends))
+        for provider, by_backend in sorted(timings.items()):
+            cells = ''.join(f"{sum(by_backend[b]) / len(by_backend[b]):>18.2f}" for b in backends)
+            print(f"{provider:<12}{cells}")
+    finally:
+        parsing.use_backend(previous_backend)
+    print(f"\n{'FAILED' if failures else 'OK'}: {failures} mismatches")
+    return failures
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check result-page parsers against saved pages")
+    parser.add_argument('--dir', default=DEFAULT_FIXTURES_DIR, help="fixtures directory")
+    parser.add_argument('--record', action='store_true',
+                        help="write the current parser output as the expected URLs")
+    parser.add_argument('--repeat', type=int, default=20, help="parses per page for the timings")
+    parser.add_argument('--country-code', default=".com",
+                        help="country code for pages recorded without an expectation file")
+    parser.add_argument('--backend', action='append', choices=parsing.BACKENDS,
+                        help="parser backend(s) to run; default all available")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    failures = run(args.dir, args.record, args.repeat, args.country_code, args.backend)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
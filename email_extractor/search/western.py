@@ -1,9 +1,10 @@
 from .base import BaseSearchEngine
-from .selenium_search import SeleniumGoogleSearch
-from bs4 import BeautifulSoup
+from .parsing import extract_links
 from urllib.parse import quote
 import urllib.parse
+from functools import partial
 from typing import List, Dict
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,9 +12,11 @@ logger = logging.getLogger(__name__)
 class WesternSearchEngine(BaseSearchEngine):
     """Western search engines with hybrid approach"""
     
-    def __init__(self, anti_bot):
-        super().__init__(anti_bot)
+    def __init__(self, anti_bot, result_cache=None):
+        super().__init__(anti_bot, result_cache)
         self.selenium_search = None
+        # Cache refreshes search from a background thread; the browser is not thread-safe
+        self.selenium_lock = threading.Lock()
         self.search_providers = {
             'google': self._search_google_selenium,
             'bing': self._search_bing,
@@ -23,6 +26,8 @@ class WesternSearchEngine(BaseSearchEngine):
     def _get_selenium_search(self):
         """Lazy initialization of Selenium search"""
         if not self.selenium_search:
+            # selenium is imported only once a Google search needs the browser
+            from .selenium_search import SeleniumGoogleSearch
             self.selenium_search = SeleniumGoogleSearch()
         return self.selenium_search
     
@@ -41,8 +46,10 @@ class WesternSearchEngine(BaseSearchEngine):
             if provider in self.search_providers:
                 logger.info(f"Searching with {provider}...")
                 try:
-                    urls = self.search_providers[provider](
-                        keyword, country_code, search_operators or {}, max_results
+                    urls = self._cached_search(
+                        provider, keyword, country_code, search_operators, max_results,
+                        partial(self.search_providers[provider],
+                                keyword, country_code, search_operators or {}, max_results)
                     )
                     all_urls.extend(urls)
                     logger.info(f"Found {len(urls)} URLs from {provider}")
@@ -63,8 +70,9 @@ class WesternSearchEngine(BaseSearchEngine):
                               operators: Dict, max_results: int) -> List[str]:
         """Google search using Selenium"""
         try:
-            selenium_search = self._get_selenium_search()
-            return selenium_search.search_google(keyword, country_code, max_results)
+            with self.selenium_lock:
+                selenium_search = self._get_selenium_search()
+                return selenium_search.search_google(keyword, country_code, max_results)
         except Exception as e:
             logger.error(f"Selenium Google search failed: {e}")
             return []
@@ -87,21 +95,24 @@ class WesternSearchEngine(BaseSearchEngine):
             if not response:
                 return []
                 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # DuckDuckGo result links
-            result_links = soup.select('a.result__a')
-            
-            for link in result_links:
-                href = link.get('href', '')
-                if href.startswith('http') and self._is_valid_url(href, country_code):
-                    urls.append(href)
+            urls = self._parse_duckduckgo_results(response.text, country_code)
                     
         except Exception as e:
             logger.error(f"DuckDuckGo search error: {e}")
             
         return urls[:max_results]
     
+    def _parse_duckduckgo_results(self, html: str, country_code: str) -> List[str]:
+        """Parse DuckDuckGo (HTML version) search results"""
+        urls = []
+        
+        # DuckDuckGo result links
+        for href in extract_links(html, ['a.result__a']):
+            if href.startswith('http') and self._is_valid_url(href, country_code):
+                urls.append(href)
+                
+        return urls
+    
     def _search_bing(self, keyword: str, country_code: str, 
                      operators: Dict, max_results: int) -> List[str]:
         """Bing search (fallback)"""
@@ -118,23 +129,27 @@ class WesternSearchEngine(BaseSearchEngine):
             if not response:
                 return []
                 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Bing result selectors
-            for selector in ['h2 a[href]', '.b_title a[href]']:
-                links = soup.select(selector)
-                for link in links:
-                    href = link.get('href', '')
-                    if href.startswith('http') and self._is_valid_url(href, country_code):
-                        urls.append(href)
+            urls = self._parse_bing_results(response.text, country_code)
                         
         except Exception as e:
             logger.error(f"Bing search error: {e}")
             
         return urls[:max_results]
     
+    def _parse_bing_results(self, html: str, country_code: str) -> List[str]:
+        """Parse Bing search results"""
+        urls = []
+        
+        # Bing result selectors
+        for href in extract_links(html, ['h2 a[href]', '.b_title a[href]']):
+            if href.startswith('http') and self._is_valid_url(href, country_code):
+                urls.append(href)
+                
+        return urls
+    
     def close_selenium(self):
         """Clean up Selenium resources"""
-        if self.selenium_search:
-            self.selenium_search.close()
-            self.selenium_search = None
\ No newline at end of file
+        with self.selenium_lock:
+            if self.selenium_search:
+                self.selenium_search.close()
+                self.selenium_search = None
\ No newline at end of file
@@ -0,0 +1,161 @@
+import os
+import zlib
+import queue
+import logging
+import multiprocessing as mp
+from typing import Dict, List, Tuple
+
+from .spider import EmailSpider
+from .core.scheduler import YieldScheduler
+from .exporters.storage import create_storage
+from .utils.metrics import metrics, start_reporter
+from .utils.logging_setup import setup_logging, worker_log_config, WORKER_FORMAT
+
+logger = logging.getLogger(__name__)
+
+def shard_for(keyword: str, country_code: str, shards: int) -> int:
+    """Stable shard for a task, so a resumed run sends it back to the same worker"""
+    return zlib.crc32(f"{country_code}\t{keyword}".encode('utf-8')) % shards
+
+def suffixed_path(path: str, suffix: str) -> str:
+    """frontier.db -> frontier.<suffix>.db"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{suffix}{ext}"
+
+def local_configs(search_config: Dict, fetch_config: Dict, suffix: str) -> Tuple[Dict, Dict]:
+    """Copies of the configs with per-process frontier, retry queue, failure report and metrics files"""
+    # The HTTP and search result caches stay shared
+    fetch_config = dict(fetch_config)
+    fetch_config['retry_db'] = suffixed_path(fetch_config.get('retry_db', 'retry_queue.db'), suffix)
+    fetch_config['failed_urls_file'] = suffixed_path(fetch_config.get('failed_urls_file', 'failed_urls.csv'), suffix)
+    for key in ('metrics_json', 'metrics_prom'):
+        if fetch_config.get(key):
+            fetch_config[key] = suffixed_path(fetch_config[key], suffix)
+    search_config = dict(search_config)
+    search_config['frontier_db'] = suffixed_path(search_config.get('frontier_db', 'frontier.db'), suffix)
+    return search_config, fetch_config
+
+class _QueueWriter:
+    """Worker-side storage stand-in that ships batches to the writer process"""
+
+    def __init__(self, results_queue):
+        self.results_queue = results_queue
+
+    def save_emails(self, email_results) -> int:
+        # Slices are compacted so only their own rows are pickled
+        self.results_queue.put(('batch', email_results.compact()))
+        # Only the writer knows which addresses are new
+        return 0
+
+    def save_fetch_outcomes(self, outcomes) -> int:
+        self.results_queue.put(('outcomes', outcomes))
+        return len(outcomes)
+
+def _run_shard(shard: int, tasks: List[Tuple[str, str]], max_workers: int, search_config: Dict,
+               fetch_config: Dict, resume: bool, results_queue, log_config: Dict):
+    """Worker process entry point: crawl one shard's tasks with its own fetch pool"""
+    setup_logging(fmt=WORKER_FORMAT, **log_config)
+
+    search_config, fetch_config = local_configs(search_config, fetch_config, f"shard{shard}")
+
+    total = 0
+    try:
+        spider = EmailSpider(max_workers=max_workers, fetch_config=fetch_config,
+                             storage=_QueueWriter(results_queue))
+        total = spider.crawl_tasks(tasks, search_config, resume)
+    except Exception as e:
+        logger.error(f"Shard {shard} failed: {e}")
+    finally:
+        results_queue.put(('done', shard, total))
+
+class ShardedCrawler:
+    """Spread (country, keyword) tasks over worker processes that feed a single writer"""
+
+    def __init__(self, processes: int = None, max_workers: int = 10,
+                 storage_config: Dict = None, fetch_config: Dict = None):
+        self.processes = processes or os.cpu_count() or 1
+        self.max_workers = max_workers
+        self.storage_config = storage_config
+        self.fetch_config = fetch_config or {}
+
+    def crawl(self, keywords: List[str], country_codes: List[str],
+              search_config: Dict = None, resume: bool = False) -> Dict[str, int]:
+        """Crawl every task across the worker processes; returns result totals"""
+        search_config = search_config or {}
+        tasks = [(country_code, keyword) for country_code in country_codes for keyword in keywords]
+        # Workers add their fetches and time to the shared yield history; this
+        # process adds the new addresses, which only the writer can count
+        scheduler = None
+        if search_config.get('yield_scheduling', True):
+            scheduler = YieldScheduler(db_path=search_config.get('yield_db', 'task_yield.db'),
+                                       exploration=search_config.get('yield_exploration', 0.1))
+            if not resume:
+                scheduler.start_run()
+            tasks = scheduler.rank(tasks)
+        shards: List[List[Tuple[str, str]]] = [[] for _ in range(self.processes)]
+        for country_code, keyword in tasks:
+            shards[shard_for(keyword, country_code, self.processes)].append((country_code, keyword))
+
+        # spawn: workers start clean, without copies of the parent's threads or sockets
+        ctx = mp.get_context('spawn')
+        results_queue = ctx.Queue(maxsize=self.processes * 64)
+        workers = [
+            ctx.Process(target=_run_shard, name=f"shard-{shard}",
+                        args=(shard, tasks, self.max_workers, search_config, self.fetch_config,
+                              resume, results_queue, worker_log_config()))
+            for shard, tasks in enumerate(shards) if tasks
+        ]
+        logger.info(f"Crawling {sum(len(tasks) for tasks in shards)} tasks with {len(workers)} processes")
+        for worker in workers:
+            worker.start()
+
+        # This process is the only one writing to the store
+        storage = create_storage(self.storage_config)
+        reporter = start_reporter(self.fetch_config.get('metrics_json'), self.fetch_config.get('metrics_prom'),
+                                  self.fetch_config.get('metrics_interval', 15))
+        totals = {'results': 0, 'new_addresses': 0, 'shards_finished': 0}
+        try:
+            while totals['shards_finished'] < len(workers):
+                try:
+                    message = results_queue.get(timeout=5)
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        logger.error("All shard processes exited without reporting")
+                        break
+                    continue
+
+                if message[0] == 'batch':
+                    batch = message[1]
+                    totals['results'] += len(batch)
+                    with metrics.timer('db_commit_seconds', store='emails'):
+                        new_count = storage.save_emails(batch)
+                    totals['new_addresses'] += new_count
+                    if scheduler and new_count:
+                        scheduler.record(batch.keyword, batch.country_code, new_emails=new_count)
+                    try:
+                        metrics.set('queue_depth', results_queue.qsize(), queue='results')
+                    except NotImplementedError:
+                        # macOS has no sem_getvalue
+                        pass
+                elif message[0] == 'outcomes':
+                    with metrics.timer('db_commit_seconds', store='outcomes'):
+                        storage.save_fetch_outcomes(message[1])
+                else:
+                    _, shard, shard_total = message
+                    totals['shards_finished'] += 1
+                    logger.info(f"Shard {shard} finished with {shard_total} email results")
+        except BaseException:
+            # Workers may be blocked on a full queue nobody is draining now
+            for worker in workers:
+                worker.terminate()
+            raise
+        finally:
+            for worker in workers:
+                worker.join()
+            if reporter:
+                reporter.write()
+
+        for country_code in country_codes:
+            storage.export_unique_to_csv(f"emails_{country_code.replace('.', '')}.csv", country_code)
+        logger.info(f"Sharded crawl complete: {totals}")
+        return totals
@@ -1,37 +1,146 @@
 import time
 import random
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional, Tuple
 import logging
 
-from .core.models import EmailResult
+from .core.models import FetchOutcome, ResultBatch
+from .core.frontier import CrawlFrontier, DONE, SEARCHED
+from .core.scheduler import YieldScheduler
 from .core.filters import DomainFilter
+from .core.seeds import SitemapReader, iter_seed_urls
 from .core.extractor import EmailExtractor
 from .utils.anti_bot import AntiBot
+from .utils.http_cache import ResponseCache
+from .utils.host_health import HostHealthRegistry
+from .utils.latency import LatencyTracker
+from .utils.retry_queue import RetryQueue
+from .utils.metrics import metrics, start_reporter
 from .search.global_search import GlobalSearchEngine
-from .exporters.database import DatabaseManager
+from .search.cache import SearchResultCache
+from .search.redirects import RedirectResolver
+from .exporters.base import BaseStorage
+from .exporters.storage import create_storage
 
 logger = logging.getLogger(__name__)
 
 class EmailSpider:
     """Main email extraction spider"""
     
-    def __init__(self, max_workers: int = 100):
-        self.anti_bot = AntiBot()
+    def __init__(self, max_workers: int = 100, storage_config: Dict = None,
+                 fetch_config: Dict = None, storage: BaseStorage = None):
+        fetch_config = fetch_config or {}
+        self.response_cache = None
+        if fetch_config.get('cache_dir'):
+            self.response_cache = ResponseCache(
+                cache_dir=fetch_config['cache_dir'],
+                ttl=fetch_config.get('cache_ttl', 86400),
+                max_bytes=fetch_config.get('cache_max_bytes', 2 * 1024 ** 3)
+            )
+        host_health = HostHealthRegistry(
+            failure_threshold=fetch_config.get('breaker_threshold', 5),
+            cooldown=fetch_config.get('breaker_cooldown', 300)
+        )
+        latency = LatencyTracker(
+            connect_floor=fetch_config.get('connect_timeout_floor', 2.0),
+            connect_cap=fetch_config.get('connect_timeout_cap', 10.0),
+            read_floor=fetch_config.get('read_timeout_floor', 4.0),
+            read_cap=fetch_config.get('read_timeout_cap', 30.0)
+        )
+        self.anti_bot = AntiBot(response_cache=self.response_cache, pool_size=max_workers,
+                                host_health=host_health, latency=latency,
+                                max_body_bytes=fetch_config.get('max_body_bytes', 5 * 1024 ** 2),
+                                head_bytes=fetch_config.get('head_bytes'),
+                                delay_scale=fetch_config.get('delay_scale', 1.0))
+        self.delay_scale = fetch_config.get('delay_scale', 1.0)
+        # Failed URLs are retried behind fresh work, including across restarts
+        self.retry_queue = RetryQueue(
+            db_path=fetch_config.get('retry_db', 'retry_queue.db'),
+            max_attempts=fetch_config.get('retry_max_attempts', 4),
+            base_delay=fetch_config.get('retry_base_delay', 60)
+        )
+        self.retry_drain_wait = fetch_config.get('retry_drain_wait', 600)
+        self.failed_urls_file = fetch_config.get('failed_urls_file', 'failed_urls.csv')
+        # Every processed URL goes to the storage's fetch ledger with the next checkpoint
+        self.record_outcomes = fetch_config.get('fetch_ledger', True)
+        self._outcomes: List[FetchOutcome] = []
+        metrics.gauge_callback('queue_depth', self.retry_queue.pending_count, queue='retry')
+        metrics.gauge_collector('latency', latency.gauges)
+        # Periodic JSON snapshot and Prometheus text file of the per-stage metrics
+        self.metrics_reporter = start_reporter(fetch_config.get('metrics_json'),
+                                               fetch_config.get('metrics_prom'),
+                                               fetch_config.get('metrics_interval', 15))
         self.domain_filter = DomainFilter()
         self.email_extractor = EmailExtractor()
-        self.search_engine = GlobalSearchEngine(self.anti_bot)
-        self.db_manager = DatabaseManager()
+        # Search engines and storage are built on first use: seed and
+        # retry-only runs never search, and a spider may never save
+        self.fetch_config = fetch_config
+        self.storage_config = storage_config
+        self.search_cache = None
+        self.redirect_resolver = None
+        self._search_engine: Optional[GlobalSearchEngine] = None
+        self._db_manager = storage
+        self.frontier: Optional[CrawlFrontier] = None
+        self.scheduler: Optional[YieldScheduler] = None
+        # New addresses reported by the storage, for the scheduler's yield history
+        self._new_addresses = 0
         self.max_workers = max_workers
     
+    @property
+    def search_engine(self) -> GlobalSearchEngine:
+        """Search engines with their result and redirect caches, built on the first search"""
+        if self._search_engine is None:
+            # Result lists per provider/query are reused across runs
+            if self.fetch_config.get('search_cache_db'):
+                self.search_cache = SearchResultCache(
+                    db_path=self.fetch_config['search_cache_db'],
+                    ttl=self.fetch_config.get('search_cache_ttl', 7 * 86400),
+                    stale_ttl=self.fetch_config.get('search_cache_stale_ttl', 30 * 86400)
+                )
+            self.redirect_resolver = RedirectResolver(
+                self.anti_bot,
+                db_path=self.fetch_config.get('redirect_cache_db', ':memory:'),
+                max_workers=self.fetch_config.get('redirect_workers', 8)
+            )
+            self._search_engine = GlobalSearchEngine(self.anti_bot, self.search_cache, self.redirect_resolver)
+        return self._search_engine
+    
+    @property
+    def db_manager(self) -> BaseStorage:
+        """Storage backend, opened on first use"""
+        if self._db_manager is None:
+            self._db_manager = create_storage(self.storage_config)
+        return self._db_manager
+    
+    def _close_selenium(self):
+        # Never builds the search engines just to close them
+        if self._search_engine is not None and hasattr(self._search_engine, 'close_selenium'):
+            self._search_engine.close_selenium()
+    
+    def _close_search(self):
+        """Close the search caches, then the browser; the next search builds them again"""
+        # Caches first: a stale-while-revalidate refresh still queued may run a Selenium search
+        if self.search_cache:
+            self.search_cache.close()
+            self.search_cache = None
+        if self.redirect_resolver:
+            self.redirect_resolver.close()
+            self.redirect_resolver = None
+        self._close_selenium()
+        self._search_engine = None
+    
+    def _write_metrics(self):
+        if self.metrics_reporter:
+            self.metrics_reporter.write()
+    
     def __del__(self):
         """Clean up resources"""
-        if hasattr(self.search_engine, 'close_selenium'):
-            self.search_engine.close_selenium()
+        if getattr(self, '_search_engine', None) is not None:
+            self._close_selenium()
         
     def crawl(self, keywords: List[str], country_codes: List[str], 
-              search_config: Dict = None) -> List[EmailResult]:
-        """Main crawling method"""
+              search_config: Dict = None, resume: bool = False) -> List[ResultBatch]:
+        """Main crawling method; with resume=True, completed tasks and fetched URLs are skipped"""
         
         if search_config is None:
             search_config = {
@@ -44,114 +153,348 @@ class EmailSpider:
                 }
             }
         
+        self._open_frontier(search_config, resume)
+        tasks = [(country_code, keyword) for country_code in country_codes for keyword in keywords]
+        if self.scheduler:
+            if not resume:
+                self.scheduler.start_run()
+            tasks = self.scheduler.rank(tasks)
+            logger.info(f"Best-yielding tasks so far: {self.scheduler.summary(5)}")
+        self.frontier.plan(tasks)
+        
+        # Countries in the order of their best task, each with its keywords best first
+        country_keywords: Dict[str, List[str]] = {}
+        for country_code, keyword in tasks:
+            country_keywords.setdefault(country_code, []).append(keyword)
+        last_country = list(country_keywords)[-1] if country_keywords else None
+        
         try:
         
             all_results = []
 
-            for country_code in country_codes:
+            for country_code, ordered_keywords in country_keywords.items():
                 logger.info(f"=== Starting extraction for country: {country_code} ===")
-                country_results = []
+                country_results: List[ResultBatch] = []
             
-                for keyword in keywords:
-                    # for country_code in country_codes:
-                    logger.info(f"Processing keyword '{keyword}' for country '{country_code}'")
-                        
-                    # Search for URLs
-                    urls = self.search_engine.search_by_region(
-                        keyword=keyword,
-                        country_code=country_code,
-                        max_results=search_config.get('max_urls_per_keyword', 10000),
-                        search_operators=search_config.get('operators', {})
-                    )
-                        
-                    # Filter allowed URLs
-                    allowed_urls = [url for url in urls if self.domain_filter.is_allowed_domain(url)]
-                        
-                    logger.info(f"Found {len(urls)} total URLs, {len(allowed_urls)} allowed after filtering")
-                    logger.info(f"Found {len(urls)} URLs for '{keyword}' in {country_code}")
-                        
-                        
-                    # Extract emails
-                    results = self._extract_from_urls(allowed_urls, keyword, country_code)
-                    country_results.extend(results)
-                    # all_results.extend(results)
-                        
-                    # Save results
-                    if results:
-                        self.db_manager.save_emails(results)
-                        logger.info(f"Saved {len(results)} email results")
+                for keyword in ordered_keywords:
+                    results = self._crawl_task(keyword, country_code, search_config)
+                    if results is None:
+                        continue
+                    country_results.append(results)
                         
                     # Add delay between keywords for the same country
-                    time.sleep(random.uniform(5, 10))
+                    time.sleep(random.uniform(5, 10) * self.delay_scale)
                     
-                    all_results.extend(country_results)
-                    logger.info(f"=== Completed {country_code}: Found {len(country_results)} total emails ===")
+                if not country_results:
+                    logger.info(f"=== {country_code} already completed, skipping ===")
+                    continue
+                all_results.extend(country_results)
+                country_total = sum(len(batch) for batch in country_results)
+                logger.info(f"=== Completed {country_code}: Found {country_total} total emails ===")
                 
-                    # Export country-specific results
-                    country_filename = f"emails_{country_code.replace('.', '')}.csv"
-                    self.db_manager.export_country_specific(country_filename, country_code)
+                # Export country-specific results
+                country_filename = f"emails_{country_code.replace('.', '')}.csv"
+                self.db_manager.export_unique_to_csv(country_filename, country_code)
 
-                    # longer delay betweeen countries
-                    if country_code != country_codes[-1]:
-                        delay = random.uniform(30, 60)
-                        logger.info(f"Waiting {delay:.2f} seconds before next country...")
-                        time.sleep(delay)
+                # longer delay betweeen countries
+                if country_code != last_country:
+                    delay = random.uniform(30, 60) * self.delay_scale
+                    logger.info(f"Waiting {delay:.2f} seconds before next country...")
+                    time.sleep(delay)
+            
+            all_results.extend(self._drain_retries(keywords, country_codes))
             return all_results
         except Exception as e:
             logger.error(f"Error during crawling: {e}")
             raise e
     
         finally:
-            if hasattr(self.search_engine, 'close_selenium'):
-                self.search_engine.close_selenium()
-                logger.info("Crawling completed. All resources cleaned up.")
+            logger.info(f"Connection reuse: {self.anti_bot.sessions.stats.snapshot()}")
+            logger.info(f"Fetch latency: {self.anti_bot.latency.snapshot()}")
+            logger.info(f"Page bodies: {self.anti_bot.body_stats.snapshot()}")
+            open_hosts = [host for host, state in self.anti_bot.host_health.snapshot().items()
+                          if state['state'] != 'closed']
+            if open_hosts:
+                logger.info(f"Hosts with open circuit breakers: {open_hosts}")
+            if self.response_cache:
+                logger.info(f"Response cache: {self.response_cache.stats}")
+            if self.search_cache:
+                logger.info(f"Search cache: {self.search_cache.stats} {self.search_cache.summary()}")
+            if self.redirect_resolver:
+                logger.info(f"Search redirects: {self.redirect_resolver.stats}")
+            logger.info(f"Retry queue: {self.retry_queue.stats}")
+            self._write_metrics()
+            self._close_search()
+            logger.info("Crawling completed. All resources cleaned up.")
+    
+    def crawl_tasks(self, tasks: Iterable[Tuple[str, str]], search_config: Dict,
+                    resume: bool = False) -> int:
+        """Crawl (country, keyword) tasks without per-country exports; returns the result count"""
+        # tasks may be a lazy iterator: the next task is only requested once the
+        # previous one has been extracted and saved
+        self._open_frontier(search_config, resume)
+        total = 0
+        keywords: Dict[str, None] = {}
+        country_codes: Dict[str, None] = {}
+        try:
+            for country_code, keyword in tasks:
+                keywords[keyword] = country_codes[country_code] = None
+                self.frontier.plan([(country_code, keyword)])
+                results = self._crawl_task(keyword, country_code, search_config)
+                if results is None:
+                    continue
+                total += len(results)
+                time.sleep(random.uniform(5, 10) * self.delay_scale)
+            
+            total += sum(len(batch) for batch in self._drain_retries(list(keywords), list(country_codes)))
+            return total
+        finally:
+            self._write_metrics()
+            self._close_search()
+    
+    def crawl_seeds(self, seeds: Iterable[str], keyword: str = "seed-list", country_code: str = "seed",
+                    search_config: Dict = None, resume: bool = False, chunk_size: int = 1000) -> int:
+        """Fetch known URLs, domains and sitemaps directly, skipping search; returns the result count"""
+        search_config = search_config or {}
+        self._open_frontier(search_config, resume)
+        self.frontier.plan([(country_code, keyword)])
+        sitemap_reader = SitemapReader(self.anti_bot.open_stream,
+                                       max_urls=search_config.get('max_sitemap_urls'))
+        
+        total = 0
+        seen = set()
+        chunk: List[str] = []
+        # Sitemaps are consumed as they stream in, one chunk of URLs at a time
+        for url in iter_seed_urls(seeds, sitemap_reader):
+            if url in seen or not self.domain_filter.is_allowed_domain(url):
+                continue
+            seen.add(url)
+            chunk.append(url)
+            if len(chunk) >= chunk_size:
+                total += self._extract_seed_chunk(chunk, keyword, country_code)
+                chunk = []
+        if chunk:
+            total += self._extract_seed_chunk(chunk, keyword, country_code)
+        
+        self.frontier.complete_task(keyword, country_code)
+        total += sum(len(batch) for batch in self._drain_retries([keyword], [country_code]))
+        logger.info(f"Seed crawl complete: {len(seen)} URLs, {total} email results")
+        self._write_metrics()
+        return total
+    
+    def _extract_seed_chunk(self, urls: List[str], keyword: str, country_code: str) -> int:
+        # Skip URLs a previous (resumed) run already fetched
+        urls = self.frontier.add_urls(keyword, country_code, urls)
+        logger.info(f"Fetching {len(urls)} seed URLs")
+        return len(self._extract_from_urls(urls, keyword, country_code))
     
-    def _extract_from_urls(self, urls: List[str], keyword: str, country_code: str) -> List[EmailResult]:
-        """Extract emails from URLs with threading"""
-        results = []
+    def _open_frontier(self, search_config: Dict, resume: bool):
+        self.frontier = CrawlFrontier(
+            db_path=search_config.get('frontier_db', 'frontier.db'),
+            checkpoint_interval=search_config.get('checkpoint_interval', 100)
+        )
+        if resume:
+            logger.info(f"Resuming crawl, task progress: {self.frontier.progress()}")
+        else:
+            self.frontier.reset()
+        # Unlike the frontier, yield history carries over between runs
+        if self.scheduler is None and search_config.get('yield_scheduling', True):
+            self.scheduler = YieldScheduler(
+                db_path=search_config.get('yield_db', 'task_yield.db'),
+                exploration=search_config.get('yield_exploration', 0.1),
+                min_share=search_config.get('yield_min_share', 0.2)
+            )
+    
+    def _crawl_task(self, keyword: str, country_code: str, search_config: Dict) -> Optional[ResultBatch]:
+        """Search and extract one (country, keyword) task; None if the frontier has it done"""
+        status = self.frontier.task_status(keyword, country_code)
+        if status == DONE:
+            logger.debug(f"Skipping completed task '{keyword}' in {country_code}")
+            return None
+        started = time.perf_counter()
+        new_before = self._new_addresses
+        
+        if status == SEARCHED:
+            # Interrupted mid-extraction: reuse the recorded search results
+            allowed_urls = self.frontier.pending_urls(keyword, country_code)
+            logger.info(f"Resuming keyword '{keyword}' for country '{country_code}': "
+                        f"{len(allowed_urls)} URLs left")
+        else:
+            logger.info(f"Processing keyword '{keyword}' for country '{country_code}'")
+            max_urls = search_config.get('max_urls_per_keyword', 10000)
+            if self.scheduler:
+                # Tasks that yielded few new addresses per fetch get a smaller share
+                budget = self.scheduler.url_budget(keyword, country_code, max_urls)
+                if budget < max_urls:
+                    logger.info(f"Low past yield for '{keyword}' in {country_code}: "
+                                f"searching {budget} of {max_urls} URLs")
+                max_urls = budget
+                
+            # Search for URLs
+            with metrics.timer('stage_seconds', stage='search'):
+                urls = self.search_engine.search_by_region(
+                    keyword=keyword,
+                    country_code=country_code,
+                    max_results=max_urls,
+                    search_operators=search_config.get('operators', {})
+                )
+            metrics.inc('search_urls_total', len(urls))
+                
+            # Filter allowed URLs
+            with metrics.timer('stage_seconds', stage='filter'):
+                allowed_urls = [url for url in urls if self.domain_filter.is_allowed_domain(url)]
+                
+            logger.info(f"Found {len(urls)} total URLs, {len(allowed_urls)} allowed after filtering")
+            logger.info(f"Found {len(urls)} URLs for '{keyword}' in {country_code}")
+            self.frontier.record_search(keyword, country_code, allowed_urls)
+            
+        # Extract emails; URLs due for a retry go after the fresh ones
+        retry_urls = self.retry_queue.due(keyword, country_code)
+        results = self._extract_from_urls(allowed_urls, keyword, country_code, retry_urls)
+        self.frontier.complete_task(keyword, country_code)
+        if self.scheduler:
+            self.scheduler.record(keyword, country_code, len(allowed_urls) + len(retry_urls),
+                                  time.perf_counter() - started, self._new_addresses - new_before)
+        return results
+    
+    def _drain_retries(self, keywords: List[str], country_codes: List[str]) -> List[ResultBatch]:
+        """Retry failed URLs as they come due, then report what is still failing"""
+        drained: List[ResultBatch] = []
+        deadline = time.time() + self.retry_drain_wait
+        
+        while True:
+            retried = False
+            next_due = None
+            for country_code in country_codes:
+                for keyword in keywords:
+                    retry_urls = self.retry_queue.due(keyword, country_code)
+                    if retry_urls:
+                        retried = True
+                        logger.info(f"Retrying {len(retry_urls)} failed URLs for '{keyword}' in {country_code}")
+                        drained.append(self._extract_from_urls([], keyword, country_code, retry_urls))
+                    due_at = self.retry_queue.next_due_at(keyword, country_code)
+                    if due_at is not None and (next_due is None or due_at < next_due):
+                        next_due = due_at
+            
+            # Checked on every pass: a URL that keeps coming due must not hold the drain open
+            if time.time() > deadline:
+                break
+            if retried:
+                continue
+            if next_due is None or next_due > deadline:
+                break
+            wait = max(next_due - time.time(), 0)
+            logger.info(f"Waiting {wait:.0f}s for the next retry to come due...")
+            time.sleep(wait)
+        
+        report = self.retry_queue.report()
+        if report:
+            logger.warning(f"URLs still failing after retries: {report}")
+            self.retry_queue.export_failures(self.failed_urls_file)
+        return drained
+    
+    def _extract_from_urls(self, urls: List[str], keyword: str, country_code: str,
+                           retry_urls: List[str] = ()) -> ResultBatch:
+        """Extract emails from URLs with threading, saving results at each frontier checkpoint"""
+        results = ResultBatch(keyword, country_code)
+        saved = 0
+        retrying = set(retry_urls)
+        # Fresh work is submitted first so retries never hold up a worker
+        work = [(url, False) for url in urls if url not in retrying]
+        work.extend((url, True) for url in retry_urls)
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             future_to_url = {
-                executor.submit(self._process_url, url, keyword, country_code): url 
-                for url in urls
+                executor.submit(self._process_url, url, keyword, country_code, is_retry): url 
+                for url, is_retry in work
             }
             
+            pending = len(future_to_url)
+            metrics.set('queue_depth', pending, queue='fetch')
             for future in as_completed(future_to_url):
                 url = future_to_url[future]
+                pending -= 1
+                metrics.set('queue_depth', pending, queue='fetch')
                 try:
-                    url_results = future.result()
+                    url_results, failure, outcome = future.result()
                     if url_results:
                         results.extend(url_results)
-                        logger.info(f"Extracted {len(url_results)} emails from {url}")
+                        logger.debug("Extracted %d emails from %s", len(url_results), url, extra={'sample': True})
                 except Exception as e:
-                    logger.error(f"Error processing {url}: {e}")
+                    logger.error("Error processing %s: %s", url, e)
+                    url_results, failure = (), "error"
+                    outcome = FetchOutcome.create(url, keyword, country_code, failure) if self.record_outcomes else None
+                if outcome:
+                    self._outcomes.append(outcome)
+                    
+                if self.frontier.mark_urls(keyword, country_code, [(url, len(url_results), failure)]):
+                    saved = self._checkpoint(results, saved)
                     
+        self._checkpoint(results, saved)
         return results
     
-    def _process_url(self, url: str, keyword:str, country_code: str) -> List[EmailResult]:
-        """Process a single URL and extract emails"""
+    def _checkpoint(self, results: ResultBatch, saved: int) -> int:
+        """Save results gathered since the last checkpoint, then commit the frontier"""
+        # Emails are stored before their URLs are marked done, so a resume never loses any
+        if len(results) > saved:
+            with metrics.timer('db_commit_seconds', store='emails'):
+                new_count = self.db_manager.save_emails(results[saved:])
+            self._new_addresses += new_count
+            logger.info(f"Saved {len(results) - saved} email results ({new_count} new addresses)")
+        if self._outcomes:
+            # One batched write per checkpoint, through the same storage as the emails
+            with metrics.timer('db_commit_seconds', store='outcomes'):
+                self.db_manager.save_fetch_outcomes(self._outcomes)
+            self._outcomes = []
+        with metrics.timer('db_commit_seconds', store='frontier'):
+            self.frontier.checkpoint()
+        return len(results)
+    
+    def _outcome(self, url: str, keyword: str, country_code: str, extract_seconds: float = 0.0,
+                 emails: int = 0, outcome: str = None) -> Optional[FetchOutcome]:
+        """Ledger entry for url from this thread's last fetch"""
+        if not self.record_outcomes:
+            return None
+        fetch_outcome, status, body_bytes, fetch_seconds = self.anti_bot.last_fetch
+        return FetchOutcome.create(url, keyword, country_code, outcome or fetch_outcome or 'error', status,
+                                   body_bytes, fetch_seconds, extract_seconds, emails)
+    
+    def _process_url(self, url: str, keyword:str, country_code: str,
+                     is_retry: bool = False) -> Tuple[ResultBatch, Optional[str], Optional[FetchOutcome]]:
+        """Process a single URL and extract emails; also returns the failure reason, if any, and its ledger entry"""
         try:
-            response = self.anti_bot.safe_request(url)
+            response = self.anti_bot.safe_request(url, use_cache=True, limit_body=True)
             if not response:
-                return []
-                
-            emails = self.email_extractor.extract_emails(response.text, url)
+                reason = self.anti_bot.last_failure
+                # Non-text pages are skipped on purpose, not failures
+                if reason == 'content_type':
+                    if is_retry:
+                        self.retry_queue.record_success(url, keyword, country_code)
+                elif reason or is_retry:
+                    # Every retried URL is closed out; non-retryable reasons end up FAILED
+                    self.retry_queue.record_failure(url, keyword, country_code, reason or 'error')
+                return ResultBatch(keyword, country_code), reason, self._outcome(url, keyword, country_code)
+            # Unchanged cached pages reuse the emails found the last time
+            extract_seconds = 0.0
+            emails = getattr(response, 'cached_emails', None)
+            if emails is None:
+                with metrics.timer('stage_seconds', stage='decode'):
+                    text = response.text
+                started = time.perf_counter()
+                emails = self.email_extractor.extract_emails(text, url)
+                extract_seconds = time.perf_counter() - started
+                metrics.observe('stage_seconds', extract_seconds, stage='extract')
+                if self.response_cache:
+                    self.response_cache.save_extraction(url, emails)
+            # Also clears a URL that gave up in an earlier crawl and works again
+            self.retry_queue.record_success(url, keyword, country_code)
             
-            results = []
-            for email in emails:
-                domain = email.split('@')[1]
-                result = EmailResult(
-                    email=email,
-                    domain=domain,
-                    source_url=url,
-                    keyword=keyword,
-                    country_code=country_code,
-                    extracted_at=time.strftime('%Y-%m-%d %H:%M:%S')
-                )
-                results.append(result)
-                
-            return results
+            # One timestamp per page; formatting is left to the exporters
+            return (ResultBatch.from_page(emails, url, keyword, country_code), None,
+                    self._outcome(url, keyword, country_code, extract_seconds, len(emails)))
             
         except Exception as e:
-            logger.error(f"Error processing URL {url}: {e}")
-            return []
\ No newline at end of file
+            logger.error("Error processing URL %s: %s", url, e)
+            if is_retry:
+                self.retry_queue.record_failure(url, keyword, country_code, 'error')
+            return ResultBatch(keyword, country_code), "error", self._outcome(url, keyword, country_code, outcome="error")
\ No newline at end of file
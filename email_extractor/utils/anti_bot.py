@@ -1,43 +1,89 @@
+import re
 import requests
 import time
 import random
 import threading
-from fake_useragent import UserAgent
-from typing import Dict
+import importlib.util
+from typing import Dict, Optional, Tuple
+from urllib.parse import urljoin
 import logging
 
-try:
-    from .advanced_anti_bot import AdvancedAntiBot
-    ADVANCED_FEATURES = True
-except ImportError:
-    ADVANCED_FEATURES = False
-    logging.warning("Advanced anti-bot features not available. Install: pip install selenium")
+from .http_cache import ResponseCache
+from .transport import SessionPool, BodyStats, is_text_content_type, read_limited
+from .host_health import HostHealthRegistry
+from .latency import LatencyTracker
+from .metrics import metrics
+
+# selenium is only imported when the advanced bot is actually requested
+ADVANCED_FEATURES = importlib.util.find_spec('selenium') is not None
 
 logger = logging.getLogger(__name__)
 
+# Trackers that answer 200 redirect with a meta refresh or location.replace() instead
+BODY_REDIRECT_PATTERN = re.compile(
+    rb'''(?:url\s*=\s*['"]?|location\.replace\(\s*['"])(https?://[^'"\s)>]+)''', re.IGNORECASE)
+
 class AntiBot:
     """Handle anti-bot protection and human-like behavior"""
     
-    def __init__(self, use_advanced: bool = False, captcha_api_key: str = None):
+    def __init__(self, use_advanced: bool = False, captcha_api_key: str = None,
+                 response_cache: ResponseCache = None, pool_size: int = 10,
+                 host_health: HostHealthRegistry = None, latency: LatencyTracker = None,
+                 max_body_bytes: int = 5 * 1024 ** 2, head_bytes: int = None,
+                 delay_scale: float = 1.0):
+        if use_advanced and not ADVANCED_FEATURES:
+            logger.warning("Advanced anti-bot features not available. Install: pip install selenium")
         self.use_advanced = use_advanced and ADVANCED_FEATURES
+        self.response_cache = response_cache
+        # Lives as long as the AntiBot, so breaker state carries across keywords
+        self.host_health = host_health or HostHealthRegistry()
+        self.latency = latency or LatencyTracker()
+        # Gated fetches stop reading here; head_bytes keeps only the top of each page
+        self.max_body_bytes = min(max_body_bytes, head_bytes) if head_bytes else max_body_bytes
+        self.body_stats = BodyStats()
+        # Multiplies the human-like delays; 0 only for local benchmarks
+        self.delay_scale = delay_scale
+        # Why the calling thread's last safe_request returned None
+        self._local = threading.local()
         
         if self.use_advanced:
+            from .advanced_anti_bot import AdvancedAntiBot
             self.advanced_bot = AdvancedAntiBot(captcha_api_key)
             logger.info("Advanced anti-bot system enabled (CAPTCHA + Proxy rotation)")
         else:
             logger.info("Basic anti-bot system enabled (no CAPTCHA or proxy rotation)")
-        # Initialize user agent and session
-            self.ua = UserAgent()
-            self.session = requests.Session()
-            self.request_count = 0
-            self.lock = threading.Lock()
-            self.country_sessions = {}
+            
+        # Initialize session; the user agent database loads on first use
+        self._ua = None
+        self.request_count = 0
+        self.lock = threading.Lock()
+        # Shared across worker threads; pools sized so each worker keeps its connection
+        self.sessions = SessionPool(pool_size)
+        self.session = self.sessions.get()
+    
+    @property
+    def ua(self):
+        """fake_useragent's UserAgent, loaded on first use"""
+        if self._ua is None:
+            from fake_useragent import UserAgent
+            self._ua = UserAgent()
+        return self._ua
+    
+    @property
+    def last_failure(self) -> str:
+        """Failure class of this thread's last safe_request, None if it succeeded"""
+        return getattr(self._local, 'failure', None)
+    
+    @property
+    def last_fetch(self) -> Tuple[str, int, int, float]:
+        """(outcome, HTTP status, body bytes, fetch seconds) of this thread's last safe_request"""
+        local = self._local
+        return (getattr(local, 'outcome', None), getattr(local, 'status', 0),
+                getattr(local, 'bytes', 0), getattr(local, 'elapsed', 0.0))
     
     def get_session_for_country(self, country_code: str):
         """Get or create a session for specific country"""
-        if country_code not in self.country_sessions:
-            session = requests.Session()
-            
+        if country_code not in self.sessions:
             # Initialize session by visiting the appropriate Google homepage
             homepage_map = {
                 ".com": "https://www.google.com",
@@ -62,18 +108,17 @@ class AntiBot:
             }
             homepage = homepage_map.get(country_code, "https://www.google.com")
             
-            try:
-                # Visit homepage first to establish session
+            def visit_homepage(session):
+                # Visit homepage first to establish session; a failed visit
+                # still leaves the session usable
                 logger.info(f"Initializing session for {country_code} via {homepage}")
                 session.get(homepage, headers=self.get_headers(country_code), timeout=10)
                 time.sleep(random.uniform(1, 3))
-                self.country_sessions[country_code] = session
                 logger.info(f"Session initialized for {country_code}")
-            except Exception as e:
-                logger.error(f"Failed to initialize session for {country_code}: {e}")
-                self.country_sessions[country_code] = session  # Use it anyway
                 
-        return self.country_sessions[country_code]
+            return self.sessions.get(country_code, visit_homepage)
+                
+        return self.sessions.get(country_code)
         
     def get_headers(self, country_code: str = None) -> Dict[str, str]:
         """Generate realistic headers with country-specific settings"""
@@ -116,8 +161,11 @@ class AntiBot:
             base_delay *= 1.5
         if self.request_count > 50:
             base_delay *= 2
+        base_delay *= self.delay_scale
+        if not base_delay:
+            return
             
-        logger.debug(f"Delaying {base_delay:.1f}s (request #{self.request_count})")
+        logger.debug("Delaying %.1fs (request #%d)", base_delay, self.request_count)
         time.sleep(base_delay)
     
     def detect_anti_bot_measures(self, response: requests.Response) -> bool:
@@ -141,25 +189,63 @@ class AntiBot:
         
         for indicator in bot_indicators:
             if indicator in content:
-                logger.warning(f"Bot detection indicator found: '{indicator}'")
+                logger.warning("Bot detection indicator found: '%s'", indicator, extra={'sample': True})
                 return True
                 
         # Check problematic status codes
         if response.status_code in [403, 429, 503, 402, 406]:
-            logger.warning(f"Suspicious status code: {response.status_code}")
+            logger.warning("Suspicious status code: %d", response.status_code, extra={'sample': True})
             return True
             
         # Check for redirect loops or minimal content
         if len(content) < 1000 and response.status_code == 200:
-            logger.warning("Suspiciously small response content")
+            logger.warning("Suspiciously small response content (%d characters)", len(content), extra={'sample': True})
             return True
             
         return False
     
-    def safe_request(self, url: str, country_code: str = None, timeout: int = 15) -> requests.Response:
+    def _record_outcome(self, outcome: str):
+        self._local.outcome = outcome
+        metrics.inc('pages_fetched_total', outcome=outcome)
+    
+    def _failed(self, reason: str) -> None:
+        """Record why this thread's safe_request gave up; returns its None result"""
+        self._local.failure = reason
+        started = self._local.started
+        if started is not None and not self._local.elapsed:
+            # Time until the failure surfaced (not including any backoff)
+            self._local.elapsed = time.perf_counter() - started
+        self._record_outcome(reason)
+        return None
+    
+    def safe_request(self, url: str, country_code: str = None, timeout=None,
+                     use_cache: bool = False, limit_body: bool = False) -> requests.Response:
         """Make a safe request with comprehensive anti-bot measures"""
+        local = self._local
+        local.failure = local.outcome = local.started = None
+        local.status = local.bytes = 0
+        local.elapsed = 0.0
+        cache = self.response_cache if use_cache else None
+        cached = cache.lookup(url) if cache else None
+        if cached and cached.is_fresh:
+            response = cache.to_response(cached)
+            if response is not None:
+                logger.debug("Cache hit for %s", url, extra={'sample': True})
+                local.status = response.status_code
+                self._record_outcome('cached')
+                return response
+            cached = None
+        
+        if not self.host_health.allow_request(url):
+            logger.debug("Circuit open, skipping %s", url, extra={'sample': True})
+            return self._failed('circuit_open')
+        
         self.human_delay()
         
+        # (connect, read) from the host's observed latency unless the caller fixed one
+        if timeout is None:
+            timeout = self.latency.timeout_for(url)
+        
         try:
             # Get appropriate session and headers
             if country_code:
@@ -194,45 +280,176 @@ class AntiBot:
                 session = self.session
                 headers = self.get_headers()
             
-            logger.info(f"Making request to {url} [{country_code or 'default'}]")
+            if cached and cached.can_revalidate:
+                headers.update(cache.conditional_headers(cached))
+            
+            logger.debug("Making request to %s [%s]", url, country_code or 'default', extra={'sample': True})
             
             # Make the request using the appropriate session
+            local.started = time.perf_counter()
             response = session.get(
                 url, 
                 headers=headers, 
                 timeout=timeout, 
                 allow_redirects=True,
-                verify=True  # Enable SSL verification
+                verify=True,  # Enable SSL verification
+                stream=limit_body
             )
             
+            self.latency.record(url, response.elapsed.total_seconds())
+            local.status = response.status_code
+            
+            if response.status_code >= 500:
+                self.host_health.record_failure(url, f"http_{response.status_code}")
+            else:
+                self.host_health.record_success(url)
+            
+            if response.status_code == 304 and cached:
+                response.content  # empty; releases a streamed connection back to the pool
+                local.elapsed = time.perf_counter() - local.started
+                cache.refresh(url, response)
+                self._record_outcome('not_modified')
+                logger.debug("Not modified since last crawl: %s", url, extra={'sample': True})
+                return cache.to_response(cached, not_modified=True)
+            
+            if limit_body and not self._read_gated_body(url, response):
+                return self._failed('content_type')
+            # Headers and body; the latency tracker above only sees time to headers
+            local.elapsed = time.perf_counter() - local.started
+            local.bytes = len(response.content)
+            metrics.observe('stage_seconds', local.elapsed, stage='fetch')
+            
             # Check for bot detection
             if self.detect_anti_bot_measures(response):
-                logger.warning(f"Bot detection triggered for {url}")
+                logger.warning("Bot detection triggered for %s", url, extra={'sample': True})
                 # Exponential backoff
                 backoff_time = random.uniform(45, 90)
-                logger.info(f"Backing off for {backoff_time:.1f} seconds...")
+                logger.info("Backing off for %.1f seconds...", backoff_time, extra={'sample': True})
                 time.sleep(backoff_time)
-                return None
+                return self._failed('bot_detected')
                 
-            logger.info(f"✓ Successfully fetched {url} [{response.status_code}]")
+            if cache:
+                cache.store(url, response)
+                
+            self._record_outcome('ok')
+            metrics.inc('fetch_bytes_total', local.bytes)
+            logger.debug("Fetched %s [%d]", url, response.status_code, extra={'sample': True})
             return response
             
-        except requests.exceptions.Timeout:
-            logger.error(f"Request timeout for {url}")
-            return None
+        except requests.exceptions.Timeout as e:
+            logger.warning("Request timeout for %s", url, extra={'sample': True})
+            # Censored sample: the host took at least this long
+            connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            is_connect = isinstance(e, requests.exceptions.ConnectTimeout)
+            self.latency.record(url, connect_timeout if is_connect else read_timeout)
+            self.host_health.record_failure(url, "timeout")
+            return self._failed('timeout')
         except requests.exceptions.ConnectionError:
-            logger.error(f"Connection error for {url}")
-            return None
+            logger.warning("Connection error for %s", url, extra={'sample': True})
+            self.host_health.record_failure(url, "connection")
+            return self._failed('connection')
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {url}: {e}")
-            return None
+            logger.warning("Request failed for %s: %s", url, e, extra={'sample': True})
+            self.host_health.record_failure(url, "request_error")
+            return self._failed('request_error')
         except Exception as e:
-            logger.error(f"Unexpected error for {url}: {e}")
+            logger.error("Unexpected error for %s: %s", url, e)
+            self.host_health.record_failure(url, "error")
+            return self._failed('error')
+    
+    def open_stream(self, url: str, country_code: str = None):
+        """Open a streamed GET for bodies too large to hold in memory (sitemaps); returns the raw stream"""
+        if not self.host_health.allow_request(url):
+            raise requests.exceptions.ConnectionError(f"Circuit open for {url}")
+        timeout = self.latency.timeout_for(url)
+        # Every outcome is reported to the breaker, which may have let this through as its probe
+        try:
+            response = self.session.get(url, headers=self.get_headers(country_code),
+                                        timeout=timeout, stream=True)
+            self.latency.record(url, response.elapsed.total_seconds())
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            response.close()
+            self.host_health.record_failure(url, f"http_{e.response.status_code}")
+            raise
+        except requests.exceptions.Timeout as e:
+            connect_timeout, read_timeout = timeout
+            is_connect = isinstance(e, requests.exceptions.ConnectTimeout)
+            self.latency.record(url, connect_timeout if is_connect else read_timeout)
+            self.host_health.record_failure(url, "timeout")
+            raise
+        except requests.exceptions.ConnectionError:
+            self.host_health.record_failure(url, "connection")
+            raise
+        except Exception:
+            self.host_health.record_failure(url, "error")
+            raise
+        self.host_health.record_success(url)
+        # Undo Content-Encoding on the fly; file-level gzip is left to the reader
+        response.raw.decode_content = True
+        # Stay readable at EOF, so buffered readers can wrap the stream
+        response.raw.auto_close = False
+        return response.raw
+    
+    def resolve_redirect(self, url: str, country_code: str = None) -> Optional[str]:
+        """Target of a redirecting link (search result trackers), read from the Location header without following it"""
+        if not self.host_health.allow_request(url):
+            return None
+        try:
+            response = self.session.get(url, headers=self.get_headers(country_code),
+                                        timeout=self.latency.timeout_for(url),
+                                        allow_redirects=False, stream=True)
+        except requests.exceptions.RequestException as e:
+            logger.debug("Could not resolve %s: %s", url, e)
+            self.host_health.record_failure(url, "connection")
             return None
+        
+        try:
+            self.latency.record(url, response.elapsed.total_seconds())
+            if response.status_code >= 500:
+                self.host_health.record_failure(url, f"http_{response.status_code}")
+                return None
+            if response.is_redirect:
+                self.host_health.record_success(url)
+                return urljoin(url, response.headers['Location'])
+            # Only the first few KB, where a refresh tag or script redirect sits
+            try:
+                body, _ = read_limited(response, 16 * 1024)
+            except requests.exceptions.RequestException as e:
+                logger.debug("Could not read %s: %s", url, e)
+                self.host_health.record_failure(url, "connection")
+                return None
+            self.host_health.record_success(url)
+            match = BODY_REDIRECT_PATTERN.search(body)
+            return match.group(1).decode('utf-8', 'replace') if match else None
+        finally:
+            response.close()
+    
+    def _read_gated_body(self, url: str, response: requests.Response) -> bool:
+        """Read a streamed body unless it is not text; stop at max_body_bytes"""
+        try:
+            content_length = int(response.headers.get('Content-Length', ''))
+        except ValueError:
+            content_length = None
+        
+        content_type = response.headers.get('Content-Type')
+        if not is_text_content_type(content_type):
+            # Closing without reading drops the connection, not the bandwidth
+            response.close()
+            self.body_stats.record(skipped=content_length or 0, rejected=True)
+            logger.debug("Skipping %s: non-text content type %s", url, content_type, extra={'sample': True})
+            return False
+        
+        body, truncated = read_limited(response, self.max_body_bytes)
+        skipped = max(content_length - len(body), 0) if truncated and content_length else 0
+        self.body_stats.record(read=len(body), skipped=skipped, truncated=truncated)
+        if truncated:
+            logger.debug("Truncated %s at %d bytes", url, len(body), extra={'sample': True})
+        return True
     
     def reset_sessions(self):
         """Reset all sessions to clear cookies/state"""
         logger.info("Resetting all sessions...")
-        self.country_sessions.clear()
-        self.session = requests.Session()
+        self.sessions.reset()
+        self.session = self.sessions.get()
         self.request_count = 0
\ No newline at end of file
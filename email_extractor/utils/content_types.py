@@ -0,0 +1,11 @@
+from typing import Optional
+
+# Content types worth running email extraction on
+TEXT_CONTENT_TYPES = ('text/', 'application/xhtml+xml', 'application/xml', 'application/json')
+
+def is_text_content_type(content_type: Optional[str]) -> bool:
+    """True for text-like bodies; a missing header is given the benefit of the doubt"""
+    if not content_type:
+        return True
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return media_type.startswith(TEXT_CONTENT_TYPES) or media_type.endswith('+xml')
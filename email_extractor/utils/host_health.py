@@ -0,0 +1,111 @@
+import time
+import threading
+from typing import Dict
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """Failure state for a single host"""
+
+    __slots__ = ('state', 'consecutive_failures', 'opened_at', 'cooldown',
+                 'probe_in_flight', 'fast_failed', 'last_reason')
+
+    def __init__(self, cooldown: float):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.cooldown = cooldown
+        self.probe_in_flight = False
+        self.fast_failed = 0
+        self.last_reason = None
+
+class HostHealthRegistry:
+    """Open a circuit breaker for hosts that keep timing out, refusing or erroring"""
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 300,
+                 max_cooldown: float = 3600):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    @staticmethod
+    def host_for(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def allow_request(self, url: str) -> bool:
+        """Return False to fast-fail a URL whose host breaker is open"""
+        host = self.host_for(url)
+        with self.lock:
+            breaker = self.breakers.get(host)
+            if breaker is None or breaker.state == CLOSED:
+                return True
+
+            if breaker.state == OPEN and time.time() - breaker.opened_at >= breaker.cooldown:
+                # Cool-down over: let a single probe through
+                breaker.state = HALF_OPEN
+                breaker.probe_in_flight = False
+
+            if breaker.state == HALF_OPEN and not breaker.probe_in_flight:
+                breaker.probe_in_flight = True
+                logger.info(f"Probing {host} after {breaker.cooldown:.0f}s cool-down")
+                return True
+
+            breaker.fast_failed += 1
+            return False
+
+    def record_success(self, url: str):
+        host = self.host_for(url)
+        with self.lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                return
+            if breaker.state != CLOSED:
+                logger.info(f"Circuit closed for {host}")
+            breaker.state = CLOSED
+            breaker.consecutive_failures = 0
+            breaker.probe_in_flight = False
+            breaker.cooldown = self.cooldown
+
+    def record_failure(self, url: str, reason: str):
+        host = self.host_for(url)
+        with self.lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = self.breakers[host] = CircuitBreaker(self.cooldown)
+            breaker.consecutive_failures += 1
+            breaker.last_reason = reason
+
+            if breaker.state == HALF_OPEN:
+                # Failed probe: back off harder before the next one
+                breaker.cooldown = min(breaker.cooldown * 2, self.max_cooldown)
+                breaker.state = OPEN
+                breaker.opened_at = time.time()
+                breaker.probe_in_flight = False
+                logger.warning(f"Probe failed for {host} ({reason}), circuit re-opened for {breaker.cooldown:.0f}s")
+            elif breaker.state == CLOSED and breaker.consecutive_failures >= self.failure_threshold:
+                breaker.state = OPEN
+                breaker.opened_at = time.time()
+                logger.warning(f"Circuit opened for {host} after {breaker.consecutive_failures} "
+                               f"consecutive failures ({reason})")
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """State of every host that has failed at least once"""
+        with self.lock:
+            return {
+                host: {
+                    'state': breaker.state,
+                    'consecutive_failures': breaker.consecutive_failures,
+                    'fast_failed': breaker.fast_failed,
+                    'last_reason': breaker.last_reason,
+                }
+                for host, breaker in self.breakers.items()
+                if breaker.consecutive_failures or breaker.state != CLOSED
+            }
@@ -0,0 +1,244 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import logging
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping; the body is stored already decoded
+CACHED_HEADERS = ('content-type', 'etag', 'last-modified', 'cache-control')
+
+@dataclass
+class CacheEntry:
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: int
+    expires_at: int
+    blob_path: str
+    emails: Optional[List[str]] = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    @property
+    def can_revalidate(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+class ResponseCache:
+    """On-disk page cache: SQLite metadata plus zlib-compressed body files"""
+
+    def __init__(self, cache_dir: str = "http_cache", ttl: int = 86400,
+                 max_bytes: int = 2 * 1024 ** 3, evict_every: int = 500):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._stores_since_evict = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url_hash TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at INTEGER NOT NULL,
+                expires_at INTEGER NOT NULL,
+                last_access INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                emails TEXT
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)')
+        self.conn.commit()
+
+    @staticmethod
+    def _hash(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _blob_path(self, url_hash: str) -> str:
+        return os.path.join(self.cache_dir, url_hash[:2], url_hash + ".z")
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the cache entry for url, if any"""
+        url_hash = self._hash(url)
+        with self.lock:
+            row = self.conn.execute('''
+                SELECT status_code, headers, encoding, etag, last_modified,
+                       fetched_at, expires_at, emails
+                FROM responses WHERE url_hash = ?
+            ''', (url_hash,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self.conn.execute('UPDATE responses SET last_access = ? WHERE url_hash = ?',
+                              (int(time.time()), url_hash))
+            self.conn.commit()
+
+        status_code, headers, encoding, etag, last_modified, fetched_at, expires_at, emails = row
+        return CacheEntry(
+            url=url, status_code=status_code, headers=json.loads(headers), encoding=encoding,
+            etag=etag, last_modified=last_modified, fetched_at=fetched_at, expires_at=expires_at,
+            blob_path=self._blob_path(url_hash),
+            emails=json.loads(emails) if emails is not None else None,
+        )
+
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        """Request headers that let the server answer 304 Not Modified"""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def to_response(self, entry: CacheEntry, not_modified: bool = False) -> Optional[requests.Response]:
+        """Rebuild a requests.Response from a cache entry"""
+        try:
+            with open(entry.blob_path, 'rb') as f:
+                body = zlib.decompress(f.read())
+        except (OSError, zlib.error) as e:
+            logger.debug(f"Cache blob unreadable for {entry.url}: {e}")
+            self.invalidate(entry.url)
+            return None
+
+        response = requests.Response()
+        response._content = body
+        response.status_code = entry.status_code
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = entry.encoding
+        response.url = entry.url
+        response.from_cache = True
+        response.not_modified = not_modified
+        response.cached_emails = entry.emails
+
+        with self.lock:
+            self.stats['revalidated' if not_modified else 'hits'] += 1
+        return response
+
+    def store(self, url: str, response: requests.Response):
+        """Cache a successful response body and its validators"""
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if response.status_code != 200 or 'no-store' in cache_control:
+            return
+
+        url_hash = self._hash(url)
+        blob_path = self._blob_path(url_hash)
+        compressed = zlib.compress(response.content, 6)
+
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, blob_path)
+
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        now = int(time.time())
+        with self.lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO responses
+                (url_hash, url, status_code, headers, encoding, etag, last_modified,
+                 fetched_at, expires_at, last_access, size, emails)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)
+            ''', (url_hash, url, response.status_code, json.dumps(headers), response.encoding,
+                  response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                  now, now + self.ttl, now, len(compressed)))
+            self.conn.commit()
+            self.stats['stores'] += 1
+            self._stores_since_evict += 1
+            run_eviction = self._stores_since_evict >= self.evict_every
+            if run_eviction:
+                self._stores_since_evict = 0
+
+        if run_eviction:
+            self.evict()
+
+    def refresh(self, url: str, response: requests.Response):
+        """Extend an entry's lifetime after a 304 Not Modified"""
+        now = int(time.time())
+        with self.lock:
+            self.conn.execute('''
+                UPDATE responses
+                SET fetched_at = ?, expires_at = ?, last_access = ?,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url_hash = ?
+            ''', (now, now + self.ttl, now, response.headers.get('ETag'),
+                  response.headers.get('Last-Modified'), self._hash(url)))
+            self.conn.commit()
+
+    def save_extraction(self, url: str, emails):
+        """Remember the emails extracted from the cached body"""
+        with self.lock:
+            self.conn.execute('UPDATE responses SET emails = ? WHERE url_hash = ?',
+                              (json.dumps(sorted(emails)), self._hash(url)))
+            self.conn.commit()
+
+    def invalidate(self, url: str):
+        url_hash = self._hash(url)
+        with self.lock:
+            self.conn.execute('DELETE FROM responses WHERE url_hash = ?', (url_hash,))
+            self.conn.commit()
+        try:
+            os.remove(self._blob_path(url_hash))
+        except OSError:
+            pass
+
+    def evict(self):
+        """Drop expired entries that cannot be revalidated, then the least recently used over max_bytes"""
+        now = int(time.time())
+        removed = []
+        with self.lock:
+            removed.extend(row[0] for row in self.conn.execute('''
+                SELECT url_hash FROM responses
+                WHERE expires_at < ? AND etag IS NULL AND last_modified IS NULL
+            ''', (now,)))
+
+            total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total > self.max_bytes:
+                expired = set(removed)
+                for url_hash, size in self.conn.execute(
+                        'SELECT url_hash, size FROM responses ORDER BY last_access'):
+                    if total <= self.max_bytes:
+                        break
+                    if url_hash not in expired:
+                        removed.append(url_hash)
+                    total -= size
+
+            self.conn.executemany('DELETE FROM responses WHERE url_hash = ?',
+                                  [(url_hash,) for url_hash in removed])
+            self.conn.commit()
+            self.stats['evictions'] += len(removed)
+
+        for url_hash in removed:
+            try:
+                os.remove(self._blob_path(url_hash))
+            except OSError:
+                pass
+
+        if removed:
+            logger.info(f"Evicted {len(removed)} cached responses")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
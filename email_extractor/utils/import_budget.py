@@ -0,0 +1,86 @@
+"""
+Import-time budget check, from `python -X importtime` in a fresh interpreter.
+
+Each entry point must import within its budget and must not pull in the
+heavy optional dependencies its runs never use (selenium, bs4, ...).
+
+    python -m email_extractor.utils.import_budget             # check, exit 1 over budget
+    python -m email_extractor.utils.import_budget --repeat 5  # median of 5 imports
+"""
+
+import sys
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# module -> (budget in ms, modules it must not import)
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    'email_extractor': (25, ('requests', 'selenium', 'bs4', 'fake_useragent', 'lxml')),
+    'email_extractor.exporters.storage': (50, ('requests', 'selenium', 'bs4', 'fake_useragent')),
+    'email_extractor.ingest': (150, ('requests', 'selenium', 'bs4', 'fake_useragent')),
+    'email_extractor.search.cache': (50, ('requests', 'selenium', 'bs4', 'fake_useragent')),
+    'email_extractor.spider': (500, ('selenium', 'bs4', 'fake_useragent')),
+}
+
+def measure(module: str) -> Tuple[float, Set[str]]:
+    """Milliseconds `import module` takes in a fresh interpreter, and the modules it loaded"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise ImportError(f"import {module} failed:\n{completed.stderr.strip()[-2000:]}")
+
+    total_us = 0
+    loaded = set()
+    for line in completed.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        loaded.add(name.strip())
+        # Top-level lines for the module and its parent packages hold the whole import
+        if not name.startswith('  ') and (module == name.strip() or module.startswith(name.strip() + '.')):
+            total_us += int(cumulative)
+    return total_us / 1000, loaded
+
+def run(budgets: Dict[str, Tuple[float, Tuple[str, ...]]] = None, repeat: int = 3) -> int:
+    """Check every module against its budget; returns the number of failures"""
+    budgets = budgets or BUDGETS
+    failures = 0
+    print(f"{'module':<40}{'ms':>10}{'budget':>10}")
+    for module, (budget_ms, forbidden) in budgets.items():
+        # The first run also warms the bytecode cache; the median ignores it
+        timings, loaded = [], set()
+        for _ in range(repeat):
+            elapsed, loaded = measure(module)
+            timings.append(elapsed)
+        elapsed = statistics.median(timings)
+        heavy = sorted(name for name in forbidden if name in loaded)
+
+        status = 'ok'
+        if elapsed > budget_ms:
+            status = 'OVER BUDGET'
+        if heavy:
+            status = f"imports {', '.join(heavy)}"
+        failures += status != 'ok'
+        print(f"{module:<40}{elapsed:>10.1f}{budget_ms:>10.0f}  {status}")
+
+    print(f"\n{'FAILED' if failures else 'OK'}: {failures} over budget")
+    return failures
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check package import times against their budgets")
+    parser.add_argument('--repeat', type=int, default=3, help="imports per module; the median is used")
+    parser.add_argument('--module', action='append', choices=list(BUDGETS),
+                        help="module(s) to check; default all")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    budgets = {module: BUDGETS[module] for module in args.module} if args.module else BUDGETS
+    failures = run(budgets, max(args.repeat, 1))
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Second-level labels under which registrations happen one level deeper (example.co.uk)
+SECOND_LEVEL_LABELS = {'co', 'com', 'net', 'org', 'gov', 'edu', 'ac', 'or', 'ne', 'go', 'gob', 'mil'}
+
+def registered_domain(host: str) -> str:
+    """Approximate the registrable domain of a host (www.shop.example.co.uk -> example.co.uk)"""
+    host = host.split(':')[0].lower()
+    labels = host.split('.')
+    if len(labels) <= 2 or host.replace('.', '').isdigit():
+        return host
+    if labels[-2] in SECOND_LEVEL_LABELS and len(labels[-1]) == 2:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+class LatencyHistogram:
+    """Rolling window of recent request latencies"""
+
+    __slots__ = ('samples',)
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        index = min(int(round(p / 100.0 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {'count': 0}
+        last = len(ordered) - 1
+        return {
+            'count': len(ordered),
+            'p50': round(ordered[int(round(0.50 * last))], 3),
+            'p90': round(ordered[int(round(0.90 * last))], 3),
+            'p99': round(ordered[int(round(0.99 * last))], 3),
+            'max': round(ordered[-1], 3),
+        }
+
+class LatencyTracker:
+    """Derive per-host connect/read timeouts from observed latency percentiles"""
+
+    def __init__(self, default_timeout: Tuple[float, float] = (5.0, 15.0),
+                 connect_floor: float = 2.0, connect_cap: float = 10.0,
+                 read_floor: float = 4.0, read_cap: float = 30.0,
+                 min_samples: int = 5, window: int = 200, max_hosts: int = 10000):
+        self.default_timeout = default_timeout
+        self.connect_floor = connect_floor
+        self.connect_cap = connect_cap
+        self.read_floor = read_floor
+        self.read_cap = read_cap
+        self.min_samples = min_samples
+        self.window = window
+        self.max_hosts = max_hosts
+        self.lock = threading.Lock()
+        self.hosts: 'OrderedDict[str, LatencyHistogram]' = OrderedDict()
+        self.domains: 'OrderedDict[str, LatencyHistogram]' = OrderedDict()
+        self.overall = LatencyHistogram(window * 10)
+
+    def _histogram(self, table: 'OrderedDict[str, LatencyHistogram]', key: str) -> LatencyHistogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = LatencyHistogram(self.window)
+            # Crawls touch many one-off hosts; keep memory bounded
+            if len(table) > self.max_hosts:
+                table.popitem(last=False)
+        else:
+            table.move_to_end(key)
+        return histogram
+
+    def record(self, url: str, seconds: float):
+        """Record how long a request to url took (time to response headers)"""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            self._histogram(self.hosts, host).record(seconds)
+            self._histogram(self.domains, registered_domain(host)).record(seconds)
+            self.overall.record(seconds)
+
+    def timeout_for(self, url: str) -> Tuple[float, float]:
+        """(connect, read) timeout for url from the host's, else the domain's, latency history"""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            histogram: Optional[LatencyHistogram] = self.hosts.get(host)
+            if histogram is None or len(histogram) < self.min_samples:
+                histogram = self.domains.get(registered_domain(host))
+            if histogram is None or len(histogram) < self.min_samples:
+                return self.default_timeout
+            p90 = histogram.percentile(90)
+            p99 = histogram.percentile(99)
+
+        connect = min(max(p90 * 2, self.connect_floor), self.connect_cap)
+        read = min(max(p99 * 3, self.read_floor), self.read_cap)
+        return connect, read
+
+    def gauges(self, top: int = 20) -> List[Tuple[str, Dict[str, str], float]]:
+        """Percentiles overall and of the slowest hosts and domains, with the hosts' derived timeouts"""
+        with self.lock:
+            overall = self.overall.summary()
+            tables = {
+                'host': [(key, histogram.summary()) for key, histogram in self.hosts.items()
+                         if len(histogram) >= self.min_samples],
+                'domain': [(key, histogram.summary()) for key, histogram in self.domains.items()
+                           if len(histogram) >= self.min_samples],
+            }
+        quantiles = (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99'))
+        gauges = []
+        if overall['count']:
+            gauges.extend(('fetch_latency_seconds', {'quantile': quantile}, overall[key])
+                          for quantile, key in quantiles)
+        for scope, summaries in tables.items():
+            # Bounded label sets: only the slowest few are exported
+            summaries.sort(key=lambda item: item[1]['p90'], reverse=True)
+            for name, summary in summaries[:top]:
+                gauges.extend((f'{scope}_latency_seconds', {scope: name, 'quantile': quantile}, summary[key])
+                              for quantile, key in quantiles)
+                if scope == 'host':
+                    connect, read = self.timeout_for(f"http://{name}/")
+                    gauges.append(('host_timeout_seconds', {'host': name, 'kind': 'connect'}, connect))
+                    gauges.append(('host_timeout_seconds', {'host': name, 'kind': 'read'}, read))
+        return gauges
+
+    def snapshot(self, top: int = 20) -> Dict[str, Dict]:
+        """Overall distribution plus the slowest hosts by p90"""
+        with self.lock:
+            hosts = [(host, histogram.summary()) for host, histogram in self.hosts.items()
+                     if len(histogram) >= self.min_samples]
+            overall = self.overall.summary()
+        hosts.sort(key=lambda item: item[1]['p90'], reverse=True)
+        return {'overall': overall, 'slowest_hosts': dict(hosts[:top])}
@@ -0,0 +1,116 @@
+import json
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+DEFAULT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+WORKER_FORMAT = '%(asctime)s - %(processName)s - %(levelname)s - %(message)s'
+
+class SamplingFilter(logging.Filter):
+    """Sample per-item events: the first `first` records of each message template, then one in `every`"""
+
+    # Sampling is opt-in per call, logger.warning("Timeout for %s", url, extra={'sample': True}),
+    # and never applies above WARNING: errors always get through
+
+    def __init__(self, first: int = 20, every: int = 1000):
+        super().__init__()
+        self.first = first
+        self.every = max(every, 1)
+        self.lock = threading.Lock()
+        self.seen: Dict[Tuple[str, int, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, 'sample', False) or record.levelno > logging.WARNING:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        with self.lock:
+            seen = self.seen.get(key, 0) + 1
+            self.seen[key] = seen
+        if seen <= self.first:
+            return True
+        if (seen - self.first) % self.every:
+            return False
+        # This line stands in for the ones dropped since the last
+        record.sampled = self.every
+        return True
+
+class TextFormatter(logging.Formatter):
+    """The usual text lines, marking sampled ones"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        sampled = getattr(record, 'sampled', None)
+        return f"{line} [1 of {sampled} logged]" if sampled else line
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; per-item events carry their template as 'event' for grouping"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'process': record.processName,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.args:
+            entry['event'] = str(record.msg)
+        sampled = getattr(record, 'sampled', None)
+        if sampled:
+            entry['sampled'] = sampled
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _DeferredQueueHandler(QueueHandler):
+    # The stock prepare() formats in the logging thread; the listener does it instead
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+_listener: Optional[QueueListener] = None
+_config: Dict = {}
+
+def setup_logging(level: int = logging.INFO, log_file: str = None, json_output: bool = False,
+                  fmt: str = DEFAULT_FORMAT, sample_first: int = 20, sample_every: int = 1000,
+                  stream: bool = True) -> QueueListener:
+    """Route all logging through a queue; file and console writes happen on a background thread"""
+    global _listener
+    formatter = JsonFormatter() if json_output else TextFormatter(fmt)
+    handlers = []
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    if stream:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # Unbounded, so logging never blocks a fetch thread
+    log_queue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(sample_first, sample_every))
+
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    if not _config:
+        # Drains the queue before logging's own shutdown closes the handlers
+        atexit.register(lambda: _listener.stop() if _listener else None)
+    _config.update(level=level, json_output=json_output,
+                   sample_first=sample_first, sample_every=sample_every)
+    return _listener
+
+def worker_log_config() -> Dict:
+    """Settings for setup_logging in spawned worker processes, matching this process"""
+    return dict(_config) or {'level': logging.getLogger().getEffectiveLevel()}
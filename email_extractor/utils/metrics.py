@@ -0,0 +1,315 @@
+import os
+import json
+import time
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "email_extractor_"
+
+# Upper bounds in seconds, from a SQLite commit to a slow page fetch
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# What each metric measures; also the HELP line of the Prometheus file
+DESCRIPTIONS = {
+    'stage_seconds': "Time spent per pipeline stage (search, filter, fetch, decode, extract)",
+    'pages_fetched_total': "Page fetches by outcome (ok, cached, not_modified or the failure class)",
+    'fetch_bytes_total': "Body bytes of fetched pages",
+    'search_urls_total': "Result URLs returned by searches, before domain filtering",
+    'urls_filtered_total': "URLs dropped by the domain filter, by excluded pattern or keyword",
+    'emails_found_total': "Addresses found per extraction strategy, before merging",
+    'db_commit_seconds': "Latency of storage writes and frontier commits",
+    'queue_depth': "Items waiting per queue",
+    'fetch_latency_seconds': "Time to response headers over recent fetches, by quantile",
+    'host_latency_seconds': "Time to response headers of the slowest hosts, by quantile",
+    'domain_latency_seconds': "Time to response headers of the slowest registered domains, by quantile",
+    'host_timeout_seconds': "Connect and read timeouts currently derived for the slowest hosts",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+# (name, labels, value) gauges a collector reports at snapshot time
+GaugeSample = Tuple[str, Dict[str, object], float]
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    if not labels:
+        return ()
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(labels: Labels, extra: str = '') -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+class Histogram:
+    """Fixed-bucket latency histogram; cheap to record, mergeable, Prometheus-shaped"""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        # One slot per bound plus +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def record(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def summary(self) -> Dict[str, float]:
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6),
+            'p50': self.quantile(0.50),
+            'p90': self.quantile(0.90),
+            'p99': self.quantile(0.99),
+        }
+
+class _Timer:
+    # A plain class: a generator-based context manager costs twice as much per use
+    __slots__ = ('registry', 'name', 'labels', 'started')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, labels: Dict[str, object]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+class MetricsRegistry:
+    """Counters, gauges and histograms keyed by name and labels"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        # Gauges read at snapshot time (queue lengths kept in SQLite, for example)
+        self.gauge_callbacks: Dict[Tuple[str, Labels], Callable[[], float]] = {}
+        # Gauges whose label sets change between snapshots (the slowest hosts, for example)
+        self.gauge_collectors: Dict[str, Callable[[], Iterable[GaugeSample]]] = {}
+        self.started_at = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            self.gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _labels(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.record(value)
+
+    def timer(self, name: str, **labels) -> '_Timer':
+        """Context manager observing the duration of its block, also when it raises"""
+        return _Timer(self, name, labels)
+
+    def gauge_callback(self, name: str, callback: Optional[Callable[[], float]], **labels):
+        """Read a gauge from callback at every snapshot; None unregisters it"""
+        key = (name, _labels(labels))
+        with self.lock:
+            if callback is None:
+                self.gauge_callbacks.pop(key, None)
+            else:
+                self.gauge_callbacks[key] = callback
+
+    def gauge_collector(self, key: str, collector: Optional[Callable[[], Iterable[GaugeSample]]]):
+        """Read (name, labels, value) gauges from collector at every snapshot; None unregisters it"""
+        with self.lock:
+            if collector is None:
+                self.gauge_collectors.pop(key, None)
+            else:
+                self.gauge_collectors[key] = collector
+
+    def _read_callbacks(self) -> Dict[Tuple[str, Labels], float]:
+        with self.lock:
+            callbacks = list(self.gauge_callbacks.items())
+            collectors = list(self.gauge_collectors.items())
+        values = {}
+        # Outside the lock: callbacks may query a database
+        for key, callback in callbacks:
+            try:
+                values[key] = callback()
+            except Exception as e:
+                logger.debug(f"Gauge {key[0]} unavailable: {e}")
+        for key, collector in collectors:
+            try:
+                for name, labels, value in collector():
+                    values[(name, _labels(labels))] = value
+            except Exception as e:
+                logger.debug(f"Gauges from {key} unavailable: {e}")
+        return values
+
+    def _collect(self) -> Tuple[Dict, Dict, Dict]:
+        callback_values = self._read_callbacks()
+        with self.lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            histograms = {}
+            for key, histogram in self.histograms.items():
+                copy = Histogram(histogram.bounds)
+                copy.counts = list(histogram.counts)
+                copy.count, copy.sum = histogram.count, histogram.sum
+                histograms[key] = copy
+        gauges.update(callback_values)
+        return counters, gauges, histograms
+
+    def snapshot(self) -> Dict:
+        """Every metric as plain JSON-ready data"""
+        counters, gauges, histograms = self._collect()
+
+        def grouped(items, convert) -> Dict[str, List[Dict]]:
+            out: Dict[str, List[Dict]] = {}
+            for (name, labels), value in sorted(items.items(), key=lambda item: item[0]):
+                out.setdefault(name, []).append({'labels': dict(labels), 'value': convert(value)})
+            return out
+
+        return {
+            'timestamp': round(time.time(), 3),
+            'uptime_seconds': round(time.time() - self.started_at, 3),
+            'pid': os.getpid(),
+            'counters': grouped(counters, lambda value: value),
+            'gauges': grouped(gauges, lambda value: value),
+            'histograms': grouped(histograms, Histogram.summary),
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (for node_exporter's textfile collector)"""
+        counters, gauges, histograms = self._collect()
+        lines: List[str] = []
+
+        def header(name: str, kind: str):
+            if name in DESCRIPTIONS:
+                lines.append(f"# HELP {PREFIX}{name} {DESCRIPTIONS[name]}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for kind, items in (('counter', counters), ('gauge', gauges)):
+            last = None
+            for (name, labels), value in sorted(items.items(), key=lambda item: item[0]):
+                if name != last:
+                    header(name, kind)
+                    last = name
+                lines.append(f"{PREFIX}{name}{_format_labels(labels)} {value}")
+
+        last = None
+        for (name, labels), histogram in sorted(histograms.items(), key=lambda item: item[0]):
+            if name != last:
+                header(name, 'histogram')
+                last = name
+            cumulative = 0
+            for bound, count in zip(histogram.bounds + (float('inf'),), histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                bucket_labels = _format_labels(labels, f'le="{le}"')
+                lines.append(f"{PREFIX}{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {histogram.sum}")
+            lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {histogram.count}")
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.started_at = time.time()
+
+# Process-wide registry the pipeline records into
+metrics = MetricsRegistry()
+
+def _write_atomic(path: str, text: str):
+    # Readers (Prometheus, dashboards) never see a half-written file
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+class MetricsReporter:
+    """Write the registry to a JSON snapshot and/or a Prometheus text file every interval"""
+
+    def __init__(self, registry: MetricsRegistry = None, json_path: str = None,
+                 prometheus_path: str = None, interval: float = 15):
+        self.registry = registry or metrics
+        self.json_path = json_path
+        self.prometheus_path = prometheus_path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+
+    def start(self) -> 'MetricsReporter':
+        self._thread.start()
+        return self
+
+    def write(self):
+        """Write both files now"""
+        try:
+            if self.json_path:
+                _write_atomic(self.json_path, json.dumps(self.registry.snapshot(), indent=2) + '\n')
+            if self.prometheus_path:
+                _write_atomic(self.prometheus_path, self.registry.to_prometheus())
+        except OSError as e:
+            logger.warning(f"Could not write metrics: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def stop(self):
+        """Stop the periodic writes and write a final snapshot"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.write()
+
+_reporter: Optional[MetricsReporter] = None
+_reporter_lock = threading.Lock()
+
+def start_reporter(json_path: str = None, prometheus_path: str = None,
+                   interval: float = 15) -> Optional[MetricsReporter]:
+    """Start the process's reporter once; later calls return the running one"""
+    global _reporter
+    if not json_path and not prometheus_path:
+        return None
+    with _reporter_lock:
+        if _reporter is None:
+            _reporter = MetricsReporter(metrics, json_path, prometheus_path, interval).start()
+            logger.info(f"Writing metrics every {interval}s to {json_path or ''} {prometheus_path or ''}")
+        return _reporter
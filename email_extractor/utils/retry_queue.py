@@ -0,0 +1,158 @@
+import csv
+import time
+import random
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Failures worth another attempt later; anything else is final on the first try
+RETRYABLE_FAILURES = {'timeout', 'connection', 'bot_detected', 'circuit_open'}
+
+PENDING = 'pending'
+FAILED = 'failed'
+
+class RetryQueue:
+    """Persistent queue of failed URLs with per-URL attempts and exponential backoff"""
+
+    def __init__(self, db_path: str = "retry_queue.db", max_attempts: int = 4,
+                 base_delay: float = 60, max_delay: float = 3600):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.stats = {'queued': 0, 'recovered': 0, 'gave_up': 0}
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS retries (
+                url TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                country_code TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                next_attempt_at INTEGER NOT NULL,
+                last_reason TEXT,
+                status TEXT NOT NULL,
+                first_failed_at INTEGER NOT NULL,
+                updated_at INTEGER NOT NULL,
+                PRIMARY KEY (url, keyword, country_code)
+            )
+        ''')
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_retries_due
+            ON retries(status, keyword, country_code, next_attempt_at)
+        ''')
+        self.conn.commit()
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+        # Jitter so URLs that failed together are not retried together
+        return delay * random.uniform(0.8, 1.2)
+
+    def record_failure(self, url: str, keyword: str, country_code: str, reason: str) -> bool:
+        """Schedule url for another attempt; returns False once it has run out of attempts"""
+        now = int(time.time())
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT attempts, status FROM retries WHERE url = ? AND keyword = ? AND country_code = ?',
+                (url, keyword, country_code)).fetchone()
+            # FAILED rows are never due, so this is a fresh fetch in a later crawl: count from scratch
+            fresh = row is not None and row[1] == FAILED
+            attempts = 1 if fresh else (row[0] if row else 0) + 1
+            retryable = reason in RETRYABLE_FAILURES and attempts < self.max_attempts
+            status = PENDING if retryable else FAILED
+            self.conn.execute('''
+                INSERT INTO retries (url, keyword, country_code, attempts, next_attempt_at,
+                                     last_reason, status, first_failed_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url, keyword, country_code) DO UPDATE SET
+                    attempts = excluded.attempts,
+                    next_attempt_at = excluded.next_attempt_at,
+                    last_reason = excluded.last_reason,
+                    status = excluded.status,
+                    first_failed_at = CASE WHEN ? THEN excluded.first_failed_at ELSE first_failed_at END,
+                    updated_at = excluded.updated_at
+            ''', (url, keyword, country_code, attempts, now + int(self._backoff(attempts)),
+                  reason, status, now, now, fresh))
+            self.conn.commit()
+            if retryable:
+                if row is None or fresh:
+                    self.stats['queued'] += 1
+            elif row is None or row[1] != FAILED or fresh:
+                self.stats['gave_up'] += 1
+        return retryable
+
+    def record_success(self, url: str, keyword: str, country_code: str):
+        """Drop url from the queue once a fetch of it succeeds"""
+        with self.lock:
+            # Called for every fetched page; most were never queued, and a read takes no write lock
+            if self.conn.execute('SELECT 1 FROM retries WHERE url = ? AND keyword = ? AND country_code = ?',
+                                 (url, keyword, country_code)).fetchone() is None:
+                return
+            cursor = self.conn.execute(
+                'DELETE FROM retries WHERE url = ? AND keyword = ? AND country_code = ?',
+                (url, keyword, country_code))
+            self.conn.commit()
+            if cursor.rowcount:
+                self.stats['recovered'] += 1
+
+    def due(self, keyword: str, country_code: str, limit: Optional[int] = None) -> List[str]:
+        """Pending URLs for keyword/country whose backoff has elapsed"""
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT url FROM retries
+                WHERE status = ? AND keyword = ? AND country_code = ? AND next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                LIMIT ?
+            ''', (PENDING, keyword, country_code, int(time.time()),
+                  -1 if limit is None else limit)).fetchall()
+        return [row[0] for row in rows]
+
+    def pending_count(self) -> int:
+        """URLs still waiting for another attempt"""
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM retries WHERE status = ?', (PENDING,)).fetchone()[0]
+
+    def next_due_at(self, keyword: str, country_code: str) -> Optional[int]:
+        """Epoch time the next pending URL for keyword/country becomes due"""
+        with self.lock:
+            row = self.conn.execute('''
+                SELECT MIN(next_attempt_at) FROM retries
+                WHERE status = ? AND keyword = ? AND country_code = ?
+            ''', (PENDING, keyword, country_code)).fetchone()
+        return row[0]
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        """Outstanding URLs counted by status and last failure reason"""
+        summary: Dict[str, Dict[str, int]] = {}
+        with self.lock:
+            for status, reason, count in self.conn.execute(
+                    'SELECT status, last_reason, COUNT(*) FROM retries GROUP BY status, last_reason'):
+                summary.setdefault(status, {})[reason] = count
+        return summary
+
+    def export_failures(self, filename: str) -> int:
+        """Write every outstanding URL (given up or still pending) to CSV"""
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT url, keyword, country_code, attempts, last_reason, status,
+                       datetime(first_failed_at, 'unixepoch'), datetime(updated_at, 'unixepoch')
+                FROM retries ORDER BY status, country_code, keyword
+            ''').fetchall()
+
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['url', 'keyword', 'country_code', 'attempts', 'last_reason',
+                             'status', 'first_failed_at', 'last_attempt_at'])
+            writer.writerows(rows)
+
+        logger.info(f"Exported {len(rows)} failed URLs to {filename}")
+        return len(rows)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
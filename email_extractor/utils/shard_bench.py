@@ -0,0 +1,162 @@
+"""
+Offline scaling benchmark for the sharded crawl (ShardedCrawler).
+
+Pages come from a local HTTP server in its own process, and search results
+are pre-seeded in the search cache, so nothing leaves the machine. Human-like
+delays are off (delay_scale=0), which leaves fetch, decode, extraction and
+the single writer. Each process count gets a fresh working directory.
+
+    python -m email_extractor.utils.shard_bench                        # 1, 2, 4, ... up to the core count
+    python -m email_extractor.utils.shard_bench --processes 1 2 4 8 --tasks 32
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing as mp
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+COUNTRY_CODE = '.de'
+# Every provider the Western search asks; all of them must hit the cache
+PROVIDERS = ('google', 'bing', 'duckduckgo')
+FILLER = ("Marine anchors, chains and mooring equipment for commercial fleets and harbours. "
+          "Lieferung ab Lager, Preise auf Anfrage, technische Datenblätter zum Download. ")
+
+def page_body(path: str, page_bytes: int, emails_per_page: int) -> bytes:
+    """Synthetic company page: filler text with addresses, mailto links and an obfuscated one"""
+    slug = path.strip('/').replace('/', '-') or 'index'
+    step = max(page_bytes // max(emails_per_page, 1), len(FILLER))
+    parts = ['<html><head><title>Contact</title></head><body>']
+    size = 0
+    i = 0
+    while size < page_bytes:
+        block = FILLER * (step // len(FILLER) + 1)
+        if i < emails_per_page:
+            block += (f'<a href="mailto:sales{i}@{slug}.example.de">sales{i}@{slug}.example.de</a> '
+                      f'info{i} [at] {slug} [dot] de ')
+        parts.append(f'<p>{block}</p>')
+        size += len(block)
+        i += 1
+    parts.append('</body></html>')
+    return ''.join(parts).encode('utf-8')
+
+def _serve(port_queue, page_bytes: int, emails_per_page: int):
+    """Page server process entry point"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            body = page_body(self.path, page_bytes, emails_per_page)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    port_queue.put(httpd.server_address[1])
+    httpd.serve_forever()
+
+def seed_search_cache(db_path: str, base_url: str, keywords: List[str], pages_per_task: int):
+    """Store each task's local URLs as every provider's search result"""
+    from ..search.cache import SearchResultCache
+    cache = SearchResultCache(db_path=db_path)
+    try:
+        for keyword in keywords:
+            urls = [f"{base_url}/{keyword}/{i}" for i in range(pages_per_task)]
+            for provider in PROVIDERS:
+                cache.store(provider, keyword, COUNTRY_CODE, {}, pages_per_task, urls)
+    finally:
+        cache.close()
+
+def run_once(processes: int, base_url: str, keywords: List[str], pages_per_task: int,
+             max_workers: int) -> Dict[str, float]:
+    """Time one sharded crawl of every task in a fresh working directory"""
+    from ..sharded import ShardedCrawler
+
+    workdir = tempfile.mkdtemp(prefix=f"shard_bench_{processes}_")
+    cwd = os.getcwd()
+    # Per-country CSV exports are written to the working directory
+    os.chdir(workdir)
+    try:
+        seed_search_cache('search_cache.db', base_url, keywords, pages_per_task)
+        fetch_config = {'delay_scale': 0, 'search_cache_db': 'search_cache.db',
+                        'retry_drain_wait': 0}
+        search_config = {'max_urls_per_keyword': pages_per_task, 'yield_scheduling': False}
+        crawler = ShardedCrawler(processes=processes, max_workers=max_workers,
+                                 storage_config={'db_path': 'emails.db'}, fetch_config=fetch_config)
+        started = time.perf_counter()
+        totals = crawler.crawl(keywords, [COUNTRY_CODE], search_config)
+        elapsed = time.perf_counter() - started
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    pages = len(keywords) * pages_per_task
+    return {'processes': processes, 'seconds': elapsed, 'pages_per_second': pages / elapsed,
+            'results': totals['results'], 'new_addresses': totals['new_addresses']}
+
+def run(process_counts: List[int], tasks: int = 16, pages_per_task: int = 50, page_kb: int = 100,
+        emails_per_page: int = 20, max_workers: int = 10) -> List[Dict[str, float]]:
+    """Benchmark each process count against one local page server; prints a table"""
+    ctx = mp.get_context('spawn')
+    port_queue = ctx.Queue()
+    server = ctx.Process(target=_serve, args=(port_queue, page_kb * 1024, emails_per_page), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{port_queue.get(timeout=30)}"
+    keywords = [f"bench-{i}" for i in range(tasks)]
+
+    rows = []
+    try:
+        print(f"{tasks} tasks x {pages_per_task} pages of {page_kb} KB, {max_workers} threads per process, "
+              f"{os.cpu_count()} CPUs")
+        print(f"{'processes':>10}{'seconds':>10}{'pages/s':>10}{'speedup':>10}{'results':>10}")
+        for processes in process_counts:
+            row = run_once(processes, base_url, keywords, pages_per_task, max_workers)
+            row['speedup'] = row['pages_per_second'] / rows[0]['pages_per_second'] if rows else 1.0
+            rows.append(row)
+            print(f"{processes:>10}{row['seconds']:>10.1f}{row['pages_per_second']:>10.1f}"
+                  f"{row['speedup']:>10.2f}{row['results']:>10}")
+    finally:
+        server.terminate()
+        server.join()
+    return rows
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline scaling benchmark for the sharded crawl")
+    parser.add_argument('--processes', type=int, nargs='+',
+                        help="process counts to run; default 1, 2, 4, ... up to the core count")
+    parser.add_argument('--tasks', type=int, default=16, help="(keyword, country) tasks per run")
+    parser.add_argument('--pages', type=int, default=50, help="pages per task")
+    parser.add_argument('--page-kb', type=int, default=100, help="size of each page")
+    parser.add_argument('--workers', type=int, default=10, help="fetch threads per process")
+    args = parser.parse_args(argv)
+
+    process_counts = args.processes
+    if not process_counts:
+        cores = os.cpu_count() or 1
+        process_counts = [1]
+        while process_counts[-1] * 2 <= cores:
+            process_counts.append(process_counts[-1] * 2)
+        if process_counts[-1] != cores:
+            process_counts.append(cores)
+
+    logging.basicConfig(level=logging.WARNING)
+    run(process_counts, tasks=args.tasks, pages_per_task=args.pages, page_kb=args.page_kb,
+        max_workers=args.workers)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
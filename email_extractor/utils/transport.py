@@ -0,0 +1,166 @@
+import threading
+from typing import Callable, Dict, Optional, Tuple
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .content_types import TEXT_CONTENT_TYPES, is_text_content_type
+
+logger = logging.getLogger(__name__)
+
+class TransportStats:
+    """Count requests against newly opened connections to measure keep-alive reuse"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def record_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def record_connection(self):
+        with self.lock:
+            self.connections += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self.lock:
+            requests_sent, connections = self.requests, self.connections
+        reused = max(requests_sent - connections, 0)
+        return {
+            'requests': requests_sent,
+            'connections_opened': connections,
+            'reuse_ratio': round(reused / requests_sent, 3) if requests_sent else 0.0,
+        }
+
+def _counting_pool_class(pool_cls, stats: TransportStats):
+    """Subclass a urllib3 connection pool so every new socket is counted"""
+    def _new_conn(self):
+        stats.record_connection()
+        return pool_cls._new_conn(self)
+    return type(f"Counting{pool_cls.__name__}", (pool_cls,), {'_new_conn': _new_conn})
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that reports requests and connection churn to TransportStats"""
+
+    def __init__(self, stats: TransportStats, **kwargs):
+        # Must exist before HTTPAdapter.__init__ builds the pool manager
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool_class(pool_cls, self.stats)
+            for scheme, pool_cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+    def send(self, request, **kwargs):
+        self.stats.record_request()
+        return super().send(request, **kwargs)
+
+class SessionPool:
+    """Thread-safe keyed requests sessions with connection pools sized to the worker count"""
+
+    def __init__(self, pool_size: int = 10, max_hosts: int = 256):
+        # One keep-alive slot per worker thread, so busy hosts never discard sockets
+        self.pool_size = max(pool_size, 10)
+        # Host pools kept per session; crawls spread over many hosts
+        self.max_hosts = max(max_hosts, self.pool_size)
+        self.stats = TransportStats()
+        self.lock = threading.Lock()
+        self.sessions: Dict[Optional[str], requests.Session] = {}
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = CountingHTTPAdapter(
+            self.stats,
+            pool_connections=self.max_hosts,
+            pool_maxsize=self.pool_size,
+            pool_block=False,
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get(self, key: Optional[str] = None,
+            initializer: Callable[[requests.Session], None] = None) -> requests.Session:
+        """Get or create the session for key, running initializer once on creation"""
+        session = self.sessions.get(key)
+        if session is not None:
+            return session
+
+        # Built outside the lock: the initializer may make a slow request, and
+        # other threads creating sessions for other keys must not wait on it
+        session = self._new_session()
+        if initializer:
+            try:
+                initializer(session)
+            except Exception as e:
+                logger.error(f"Failed to initialize session {key}: {e}")
+        with self.lock:
+            pooled = self.sessions.setdefault(key, session)
+        if pooled is not session:
+            # Another thread created this key's session first
+            session.close()
+        return pooled
+
+    def __contains__(self, key: Optional[str]) -> bool:
+        return key in self.sessions
+
+    def reset(self):
+        """Close and forget all sessions"""
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions = {}
+        for session in sessions:
+            session.close()
+
+class BodyStats:
+    """Bytes read, skipped and truncated by gated (streamed) fetches"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bytes_read = 0
+        self.bytes_skipped = 0
+        self.rejected = 0
+        self.truncated = 0
+
+    def record(self, read: int = 0, skipped: int = 0, rejected: bool = False, truncated: bool = False):
+        with self.lock:
+            self.bytes_read += read
+            self.bytes_skipped += skipped
+            self.rejected += rejected
+            self.truncated += truncated
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'bytes_read': self.bytes_read,
+                'bytes_skipped': self.bytes_skipped,
+                'rejected_content_type': self.rejected,
+                'truncated': self.truncated,
+            }
+
+def read_limited(response: requests.Response, max_bytes: int,
+                 chunk_size: int = 16384) -> Tuple[bytes, bool]:
+    """Read a streamed body up to max_bytes; returns (body, truncated)"""
+    chunks = []
+    received = 0
+    truncated = False
+    for chunk in response.iter_content(chunk_size):
+        chunks.append(chunk)
+        received += len(chunk)
+        if received > max_bytes:
+            truncated = True
+            break
+    body = b''.join(chunks)
+    if truncated:
+        body = body[:max_bytes]
+    # Populate the response as if it had been read normally
+    response._content = body
+    response._content_consumed = True
+    response.close()
+    return body, truncated
@@ -10,6 +10,11 @@ setup(
         "fake-useragent>=1.1.0",
         "lxml>=4.9.0"
     ],
+    extras_require={
+        "postgres": ["psycopg2-binary>=2.9"],
+        "parquet": ["pyarrow>=10.0"],
+        "redis": ["redis>=4.0"],
+    },
     author="Your Name",
     description="A comprehensive email extraction tool with anti-bot protection",
     python_requires=">=3.7",
@@ -0,0 +1,125 @@
+import csv
+import os
+import sqlite3
+import uuid
+
+import pytest
+
+from email_extractor.core.models import EmailResult
+from email_extractor.exporters.database import DatabaseManager
+
+PG_DSN = os.environ.get('PG_DSN')
+pytestmark = pytest.mark.skipif(not PG_DSN, reason="PG_DSN is not set")
+
+UNIQUE_COLUMNS = ('email, domain, source_url, keyword, country_code, '
+                  'first_seen, last_seen, sighting_count')
+
+FIRST_BATCH = [
+    EmailResult('info@acme.de', 'acme.de', 'https://directory.example/list', 'anchors', 'de', 1000),
+    # Same address twice in one batch: the better source wins, sightings add up
+    EmailResult('info@acme.de', 'acme.de', 'https://acme.de/kontakt', 'anchors', 'de', 1010),
+    EmailResult('sales@acme.de', 'acme.de', 'https://directory.example/list', 'anchors', 'de', 1000),
+    # Equally scored source: the first one is kept
+    EmailResult('sales@acme.de', 'acme.de', 'https://directory.example/other', 'anchors', 'de', 1005),
+    # Values that need escaping in COPY text format
+    EmailResult('x@weird.fr', 'weird.fr', 'https://weird.fr/a\tb\\c', 'tab\tkey\nline', 'fr', 1000),
+]
+SECOND_BATCH = [
+    # Earlier sighting from a worse source: only first_seen and the count move
+    EmailResult('info@acme.de', 'acme.de', 'https://directory.example/list', 'chains', 'nl', 900),
+    # Better source than the stored one: source, keyword and country are replaced
+    EmailResult('sales@acme.de', 'acme.de', 'https://acme.de/', 'chandlers', 'nl', 2000),
+    EmailResult('new@other.com', 'other.com', 'https://other.com/contact', 'anchors', 'us', 2000),
+    EmailResult('new@other.com', 'other.com', 'https://other.com/contact', 'anchors', 'us', 2000),
+]
+
+@pytest.fixture
+def postgres():
+    psycopg2 = pytest.importorskip('psycopg2')
+    from psycopg2.extensions import make_dsn
+    from email_extractor.exporters.postgres import PostgresStorage
+
+    # A throwaway schema keeps the tests away from real data in the same database
+    schema = f"test_storage_{uuid.uuid4().hex[:12]}"
+    conn = psycopg2.connect(PG_DSN)
+    conn.autocommit = True
+    conn.cursor().execute(f'CREATE SCHEMA {schema}')
+    try:
+        yield PostgresStorage(make_dsn(PG_DSN, options=f'-c search_path={schema}'))
+    finally:
+        conn.cursor().execute(f'DROP SCHEMA {schema} CASCADE')
+        conn.close()
+
+@pytest.fixture
+def sqlite(tmp_path):
+    return DatabaseManager(str(tmp_path / "emails.db"))
+
+def _pg_rows(storage, query):
+    conn = storage._connect()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(query)
+            return sorted(cursor.fetchall())
+    finally:
+        conn.close()
+
+def _sqlite_rows(storage, query):
+    conn = sqlite3.connect(storage.db_path)
+    try:
+        return sorted(conn.execute(query).fetchall())
+    finally:
+        conn.close()
+
+def test_new_address_counts_match_sqlite(postgres, sqlite):
+    for batch, expected in ((FIRST_BATCH, 3), (SECOND_BATCH, 1), (SECOND_BATCH, 0)):
+        assert postgres.save_emails(batch) == sqlite.save_emails(batch) == expected
+
+def test_dedup_and_sighting_counts_match_sqlite(postgres, sqlite):
+    for storage in (postgres, sqlite):
+        storage.save_emails(FIRST_BATCH)
+        storage.save_emails(SECOND_BATCH)
+
+    query = f'SELECT {UNIQUE_COLUMNS} FROM unique_emails'
+    rows = _pg_rows(postgres, query)
+    assert rows == _sqlite_rows(sqlite, query)
+    assert rows == [
+        ('info@acme.de', 'acme.de', 'https://acme.de/kontakt', 'anchors', 'de', 900, 1010, 3),
+        ('new@other.com', 'other.com', 'https://other.com/contact', 'anchors', 'us', 2000, 2000, 2),
+        ('sales@acme.de', 'acme.de', 'https://acme.de/', 'chandlers', 'nl', 1000, 2000, 3),
+        ('x@weird.fr', 'weird.fr', 'https://weird.fr/a\tb\\c', 'tab\tkey\nline', 'fr', 1000, 1000, 1),
+    ]
+    for country_code in (None, 'de', 'nl'):
+        assert postgres.count_unique(country_code) == sqlite.count_unique(country_code)
+
+def test_sightings_match_sqlite(postgres, sqlite):
+    for storage in (postgres, sqlite):
+        storage.save_emails(FIRST_BATCH)
+        storage.save_emails(SECOND_BATCH)
+
+    query = 'SELECT email, source_url, keyword, country_code FROM emails'
+    assert _pg_rows(postgres, query) == _sqlite_rows(sqlite, query)
+
+def test_iter_unique_emails_matches_sqlite(postgres, sqlite):
+    for storage in (postgres, sqlite):
+        storage.save_emails(FIRST_BATCH)
+
+    def streamed(storage):
+        return sorted(row for rows in storage.iter_unique_emails(batch_size=2) for row in rows)
+
+    assert streamed(postgres) == streamed(sqlite)
+    assert len(streamed(postgres)) == 3
+
+def test_copy_out_exports_match_sqlite(postgres, sqlite, tmp_path):
+    for storage in (postgres, sqlite):
+        storage.save_emails(FIRST_BATCH)
+        storage.save_emails(SECOND_BATCH)
+
+    def exported(storage, name, country_code=None):
+        filename = str(tmp_path / name)
+        storage.export_unique_to_csv(filename, country_code)
+        with open(filename, newline='', encoding='utf-8') as csvfile:
+            header, *rows = csv.reader(csvfile)
+        return header, sorted(rows)
+
+    for country_code in (None, 'de'):
+        assert exported(postgres, 'pg.csv', country_code) == exported(sqlite, 'sqlite.csv', country_code)
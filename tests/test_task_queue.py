@@ -0,0 +1,123 @@
+import time
+import uuid
+
+import pytest
+
+from email_extractor.distributed.base import QUEUED, LEASED, DONE, DEAD
+from email_extractor.distributed.sqlite_queue import SQLiteTaskQueue
+
+TASKS = [('de', 'marine anchors'), ('fr', 'marine anchors'), ('de', 'ship chandlers')]
+
+def _redis_queue(max_attempts: int):
+    redis = pytest.importorskip('redis')
+    from email_extractor.distributed.redis_queue import RedisTaskQueue
+    url = "redis://localhost:6379/15"
+    try:
+        redis.Redis.from_url(url, socket_connect_timeout=0.5).ping()
+    except redis.exceptions.ConnectionError:
+        pytest.skip("redis-server is not running on localhost:6379")
+    return RedisTaskQueue(url, prefix=f"test_task_queue:{uuid.uuid4().hex}", max_attempts=max_attempts)
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def make_queue(request, tmp_path):
+    queues = []
+
+    def make(max_attempts: int = 3):
+        if request.param == 'sqlite':
+            queue = SQLiteTaskQueue(str(tmp_path / f"queue{len(queues)}.db"), max_attempts=max_attempts)
+        else:
+            queue = _redis_queue(max_attempts)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        if request.param == 'redis':
+            queue.reset()
+            queue.client.delete(f"{queue.prefix}:run_id")
+        queue.close()
+
+def test_lease_hands_out_each_task_once_in_order(make_queue):
+    queue = make_queue()
+    assert queue.submit(TASKS) == 3
+    assert queue.submit(TASKS[:1]) == 0
+
+    leased = [queue.lease(f"worker-{i}", 60) for i in range(3)]
+    assert [(task.country_code, task.keyword) for task in leased] == TASKS
+    assert queue.lease('worker-3', 60) is None
+    assert queue.progress() == {LEASED: 3}
+    assert len({task.run_id for task in leased}) == 1
+
+def test_heartbeat_only_extends_the_holders_lease(make_queue):
+    queue = make_queue()
+    queue.submit(TASKS[:1])
+    task = queue.lease('worker-a', 0.2)
+
+    assert queue.heartbeat(task, 'worker-a', 60)
+    assert not queue.heartbeat(task, 'worker-b', 60)
+    time.sleep(0.3)
+    assert queue.reclaim_expired() == 0
+    assert queue.complete(task, 'worker-a')
+    assert not queue.heartbeat(task, 'worker-a', 60)
+    assert queue.progress() == {DONE: 1}
+    assert queue.is_finished()
+
+def test_expired_lease_is_reclaimed_for_another_worker(make_queue):
+    queue = make_queue()
+    queue.submit(TASKS[:1])
+    task = queue.lease('worker-a', 0.1)
+    time.sleep(0.2)
+
+    assert queue.reclaim_expired() == 1
+    assert queue.progress() == {QUEUED: 1}
+    retry = queue.lease('worker-b', 60)
+    assert retry.task_id == task.task_id
+    assert retry.attempts == 1
+    # The first worker lost its lease and cannot finish the task any more
+    assert not queue.complete(task, 'worker-a')
+    assert queue.complete(retry, 'worker-b')
+
+def test_lease_reclaims_expired_leases_before_picking(make_queue):
+    queue = make_queue()
+    queue.submit(TASKS[:1])
+    task = queue.lease('worker-a', 0.1)
+    time.sleep(0.2)
+
+    retry = queue.lease('worker-b', 60)
+    assert retry is not None and retry.task_id == task.task_id
+
+def test_failed_task_is_retried_then_buried(make_queue):
+    queue = make_queue(max_attempts=2)
+    queue.submit(TASKS[:2])
+
+    task = queue.lease('worker-a', 60)
+    queue.fail(task, 'worker-a', 'blocked')
+    # Failed tasks go to the back of the queue
+    assert queue.lease('worker-a', 60).task_id != task.task_id
+    retry = queue.lease('worker-b', 60)
+    assert retry.task_id == task.task_id and retry.attempts == 1
+
+    queue.fail(retry, 'worker-b', 'blocked again')
+    assert queue.progress() == {LEASED: 1, DEAD: 1}
+    assert queue.lease('worker-c', 60) is None
+
+def test_expired_leases_count_towards_max_attempts(make_queue):
+    queue = make_queue(max_attempts=1)
+    queue.submit(TASKS[:1])
+    queue.lease('worker-a', 0.1)
+    time.sleep(0.2)
+
+    assert queue.reclaim_expired() == 1
+    assert queue.progress() == {DEAD: 1}
+    assert queue.is_finished()
+
+def test_reset_starts_a_new_run(make_queue):
+    queue = make_queue()
+    queue.submit(TASKS)
+    old_run = queue.lease('worker-a', 60).run_id
+
+    new_run = queue.reset()
+    assert new_run != old_run
+    assert queue.progress() == {}
+    assert queue.submit(TASKS) == 3
+    assert queue.lease('worker-a', 60).run_id == new_run
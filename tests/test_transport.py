@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from email_extractor.utils.transport import SessionPool
+
+REQUESTS_PER_WORKER = 20
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    body = b'<html><body>info@example.com</body></html>'
+
+    def do_GET(self):
+        # Long enough that the workers' requests overlap
+        time.sleep(0.01)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def _crawl(pool: SessionPool, base_url: str, max_workers: int):
+    session = pool.get()
+
+    def worker(worker_id):
+        for i in range(REQUESTS_PER_WORKER):
+            response = session.get(f"{base_url}/page/{worker_id}/{i}", timeout=10)
+            assert response.status_code == 200
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(worker, range(max_workers)))
+
+def _discards(caplog):
+    return [record for record in caplog.records if 'pool is full' in record.getMessage()]
+
+@pytest.mark.parametrize('max_workers', [10, 32])
+def test_pool_sized_to_workers_reuses_connections(server, caplog, max_workers):
+    pool = SessionPool(pool_size=max_workers)
+    with caplog.at_level(logging.WARNING, logger='urllib3.connectionpool'):
+        _crawl(pool, server, max_workers)
+    pool.reset()
+
+    stats = pool.stats.snapshot()
+    assert stats['requests'] == max_workers * REQUESTS_PER_WORKER
+    # At most one socket per worker; every other request rides on a kept-alive one
+    assert stats['connections_opened'] <= max_workers
+    assert stats['reuse_ratio'] >= 1 - 1 / REQUESTS_PER_WORKER
+    assert not _discards(caplog)
+
+def test_undersized_pool_discards_connections(server, caplog):
+    # The check above would notice churn: a pool smaller than the worker count drops sockets
+    pool = SessionPool(pool_size=10)
+    with caplog.at_level(logging.WARNING, logger='urllib3.connectionpool'):
+        _crawl(pool, server, 32)
+    pool.reset()
+
+    assert _discards(caplog)
+    assert pool.stats.snapshot()['connections_opened'] > 10